@@ -1,7 +1,8 @@
+import hashlib
 import streamlit as st
-from PIL import Image
-from utils.supabase_client import upload_image, create_booth_request
-from utils.image_processor import validate_image
+from utils.supabase_client import upload_image, create_booth_request, get_status_counts
+from utils.wait_estimator import get_wait_estimator, format_wait
+from utils.image_processor import prepare_upload, InvalidImageError, thumbnail_path
 from datetime import datetime
 
 # 페이지 설정
@@ -22,6 +23,26 @@ STYLES = {
     "figure": {"name": "🧸 책상 위 피규어 스타일"},
 }
 
+def get_prepared_upload(uploaded_file):
+    """
+    업로드 사진을 한 번만 검증/디코딩/정규화하고 세션에 보관합니다.
+    스타일 체크박스를 누를 때마다 스크립트가 다시 실행되어도 이미지는 다시 처리하지 않습니다.
+    (세션에는 현재 업로드 1건만 보관)
+    """
+    cached = st.session_state.get('prepared_upload')
+    file_id = getattr(uploaded_file, 'file_id', None)
+    if cached and file_id and cached['file_id'] == file_id:
+        return cached['upload']
+    
+    # 같은 사진을 다시 올린 경우(파일 ID만 다름)에는 원본 바이트 해시만 비교하고 검증/디코딩/정규화는 생략
+    raw = uploaded_file.getvalue()
+    if cached and cached['upload'].digest == hashlib.sha256(raw).hexdigest():
+        prepared = cached['upload']
+    else:
+        prepared = prepare_upload(raw)
+    st.session_state.prepared_upload = {"file_id": file_id, "upload": prepared}
+    return prepared
+
 def main():
     # 세션 상태 초기화
     if 'selected_styles' not in st.session_state:
@@ -36,15 +57,18 @@ def main():
     uploaded_file = st.file_uploader("얼굴이 잘 나온 사진을 선택해주세요 (JPG, PNG)", type=['jpg', 'jpeg', 'png'])
 
     if uploaded_file is not None:
-        # 이미지 유효성 검사
-        if not validate_image(uploaded_file):
+        # 이미지 유효성 검사 (헤더만 확인) 및 미리보기
+        # 검증/축소 디코딩/정규화는 업로드당 한 번만 하고 재실행 시에는 세션에 보관된 결과 사용
+        try:
+            prepared = get_prepared_upload(uploaded_file)
+            st.image(prepared.preview, caption="업로드된 사진", use_column_width=True)
+        except InvalidImageError as e:
+            st.error(f"❌ {e}")
+            return
+        except Exception:
             st.error("❌ 올바르지 않은 이미지 파일입니다. JPG 또는 PNG 파일을 업로드해주세요.")
             return
 
-        # 이미지 미리보기
-        image = Image.open(uploaded_file)
-        st.image(image, caption="업로드된 사진", use_column_width=True)
-
         # 2. 스타일 선택 (4개 선택)
         st.markdown("#### 2. 스타일 선택")
         st.info("💡 **인생네컷 스타일**로 제작됩니다! 원하는 스타일을 **4개** 선택해주세요.")
@@ -103,19 +127,26 @@ def main():
             else:
                 with st.spinner("이미지를 업로드하고 요청을 등록 중입니다..."):
                     try:
-                        # 파일 포인터 리셋
-                        uploaded_file.seek(0)
-                        file_bytes = uploaded_file.read()
+                        # 회전 적용 + 축소 + 메타데이터 제거 후 재인코딩 (업로드 시 미리 계산됨)
+                        ingest = prepared.ingest
+                        print(
+                            f"📦 업로드 정규화: {ingest.bytes_in/1024:.1f}KB → {ingest.bytes_out/1024:.1f}KB "
+                            f"({ingest.size[0]}x{ingest.size[1]})"
+                        )
                         
                         # 고유 파일명 생성
                         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                         import uuid
                         file_uuid = str(uuid.uuid4())
-                        ext = uploaded_file.name.split('.')[-1]
-                        file_path = f"{file_uuid}_{timestamp}.{ext}"
+                        file_path = f"{file_uuid}_{timestamp}.{ingest.ext}"
                         
                         # 1. Storage에 업로드
-                        uploaded_path = upload_image(file_bytes, "input_images", file_path)
+                        uploaded_path = upload_image(ingest.data, "input_images", file_path, content_type=ingest.content_type)
+                        # 관리자 대기열/작업 화면용 썸네일 (실패해도 관리자 화면은 원본으로 대체)
+                        try:
+                            upload_image(ingest.thumbnail.data, "input_images", thumbnail_path(uploaded_path), content_type=ingest.thumbnail.content_type)
+                        except Exception as e:
+                            print(f"썸네일 업로드 실패: {e}")
                         
                         # 2. DB에 요청 등록 (4개 스타일 배열로)
                         request_data = create_booth_request(
@@ -130,6 +161,19 @@ def main():
                             # 대기 번호 포맷팅
                             queue_num = request_data.get('queue_number', 0)
                             
+                            # 예상 대기 시간 (상태별 개수 + 최근 생성 소요 시간, 실패하면 안내 문구만 표시)
+                            wait_text = ""
+                            try:
+                                counts = get_status_counts()
+                                estimator = get_wait_estimator()
+                                estimator.refresh()
+                                wait_seconds = estimator.estimate_new(
+                                    request_data, max(0, counts.get('pending', 0) - 1), counts.get('processing', 0)
+                                )
+                                wait_text = f'<p style="font-size: 20px; font-weight: bold;">⏳ 예상 대기 시간: {format_wait(wait_seconds)}</p>'
+                            except Exception as e:
+                                print(f"대기 시간 예측 실패: {e}")
+                            
                             # 결과 안내
                             st.markdown(f"""
                             <div style="padding: 30px; background-color: #f0f2f6; border-radius: 10px; margin-top: 20px; text-align: center;">
@@ -137,6 +181,7 @@ def main():
                                 <div style="font-size: 72px; font-weight: bold; color: #FF4B4B; margin: 20px 0;">
                                     {queue_num:03d}
                                 </div>
+                                {wait_text}
                                 <p style="font-size: 18px; margin-top: 20px;">부스 앞에서 잠시만 기다려주세요.</p>
                                 <p style="font-size: 16px;">곧 멋진 인생네컷 AI 이미지를 받아보실 수 있습니다!</p>
                             </div>
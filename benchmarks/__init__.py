@@ -0,0 +1,5 @@
+# Benchmarks package
+import os
+
+# 측정 루프에서 구간마다 출력하지 않도록 계측 로그를 끔 (계측 자체는 그대로 실행)
+os.environ.setdefault("METRICS_LOG", "false")
@@ -0,0 +1,93 @@
+"""
+4컷 템플릿 합성 벤치마크.
+
+Gemini 출력 크기의 합성 이미지(RGB/RGBA/P)로 레이아웃별 합성 시간을 측정하고,
+기존 방식(전체 해상도 LANCZOS 리사이즈 후 크롭)과 비교합니다.
+
+    python -m benchmarks.bench_compose --rounds 20
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from PIL import Image
+
+
+def legacy_fit(img: Image.Image, cell_width: int, cell_height: int) -> Image.Image:
+    """이전 구현: 비율 유지 전체 리사이즈 후 중앙 크롭."""
+    img_ratio = img.width / img.height
+    target_ratio = cell_width / cell_height
+    if img_ratio > target_ratio:
+        new_height = cell_height
+        new_width = int(new_height * img_ratio)
+    else:
+        new_width = cell_width
+        new_height = int(new_width / img_ratio)
+    resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    left = (new_width - cell_width) // 2
+    top = (new_height - cell_height) // 2
+    return resized.crop((left, top, left + cell_width, top + cell_height))
+
+
+def legacy_compose(images):
+    """이전 create_four_cut_template (2x2 고정, 매 호출마다 좌표 계산)."""
+    cell_width, cell_height, margin = 472, 709, 10
+    canvas = Image.new('RGB', (cell_width * 2 + margin, cell_height * 2 + margin), 'white')
+    for idx, img in enumerate(images):
+        cell = legacy_fit(img, cell_width, cell_height)
+        if cell.mode != 'RGB':
+            cell = cell.convert('RGB')
+        canvas.paste(cell, ((idx % 2) * (cell_width + margin), (idx // 2) * (cell_height + margin)))
+    return canvas
+
+
+def make_inputs(size):
+    """모드별 테스트 입력 4장 (노이즈로 채워 압축/캐시 효과 배제)."""
+    base = Image.effect_noise(size, 64).convert('RGB')
+    return {
+        "RGB": [base.copy() for _ in range(4)],
+        "RGBA": [base.convert('RGBA') for _ in range(4)],
+        "P": [base.convert('P') for _ in range(4)],
+    }
+
+
+def time_it(fn, rounds: int):
+    fn()  # 워밍업 (프레임 배경 캐시 포함)
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="4컷 템플릿 합성 벤치마크")
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--width", type=int, default=1024)
+    parser.add_argument("--height", type=int, default=1536)
+    args = parser.parse_args(argv)
+
+    from utils.image_processor import LAYOUTS, create_four_cut_template
+
+    inputs = make_inputs((args.width, args.height))
+    print(f"입력 {args.width}x{args.height}, {args.rounds}회 중앙값 (ms)")
+    print(f"{'layout':<10}" + "".join(f"{mode:>10}" for mode in inputs))
+
+    row = f"{'legacy':<10}"
+    for images in inputs.values():
+        row += f"{time_it(lambda: legacy_compose(images), args.rounds):>10.1f}"
+    print(row)
+
+    for name in LAYOUTS:
+        row = f"{name:<10}"
+        for images in inputs.values():
+            row += f"{time_it(lambda: create_four_cut_template(images, name), args.rounds):>10.1f}"
+        print(row)
+    print("※ legacy의 P 모드는 Pillow가 NEAREST로 대체하므로 빠르지만 화질이 떨어집니다.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""
+출력 인코더 프로필 벤치마크.
+
+4컷 결과물 크기(954x1428)의 사진과 비슷한 합성 이미지(또는 --image로 지정한 실제 사진)를
+프로필별로 인코딩하여 인코딩 시간과 파일 크기를 비교합니다.
+
+    python -m benchmarks.bench_encode --rounds 5
+    python -m benchmarks.bench_encode --image test_results/sample.png
+"""
+import argparse
+import statistics
+import sys
+import time
+
+from PIL import Image, ImageFilter
+
+
+def make_photo_like(size):
+    """그라데이션 + 블러 처리된 노이즈 + 미세 노이즈로 사진과 비슷한 압축 특성의 이미지를 만듭니다."""
+    width, height = size
+    gradient = Image.linear_gradient('L').resize(size)
+    blobs = Image.effect_noise((width // 8, height // 8), 90).resize(size, Image.Resampling.BICUBIC)
+    grain = Image.effect_noise(size, 12)
+    r = Image.blend(gradient, blobs, 0.5)
+    g = blobs.filter(ImageFilter.GaussianBlur(3))
+    b = Image.blend(gradient.transpose(Image.Transpose.FLIP_TOP_BOTTOM), grain, 0.3)
+    return Image.merge('RGB', (r, g, b))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="출력 인코더 프로필 벤치마크")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--image", help="측정할 이미지 경로 (생략 시 합성 이미지)")
+    args = parser.parse_args(argv)
+
+    from utils.image_processor import ENCODER_PROFILES, ARTIFACT_PROFILES, encode_image
+
+    if args.image:
+        image = Image.open(args.image).convert('RGB')
+    else:
+        image = make_photo_like((954, 1428))
+
+    used_by = {}
+    for artifact, profile in ARTIFACT_PROFILES.items():
+        used_by.setdefault(profile, []).append(artifact)
+
+    print(f"입력 {image.width}x{image.height}, {args.rounds}회 중앙값")
+    print(f"{'profile':<18}{'format':>7}{'ms':>9}{'KB':>9}  사용처")
+    for name, profile in ENCODER_PROFILES.items():
+        samples = []
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            encoded = encode_image(image, name)
+            samples.append(time.perf_counter() - start)
+        print(
+            f"{name:<18}{profile.format:>7}{statistics.median(samples) * 1000:>9.1f}"
+            f"{len(encoded.data) / 1024:>9.1f}  {', '.join(used_by.get(name, []))}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+이미지 작업 프로세스 풀 벤치마크.
+
+여러 세션이 동시에 4컷 합성 + 인쇄용 인코딩을 실행하는 상황을 흉내 내어
+호출한 스레드에서 바로 실행(IMAGE_WORKERS=0)할 때와 작업 프로세스 수별 처리량(합성/초)을 비교합니다.
+함께 도는 하트비트 스레드의 최대 지연으로 Streamlit 스크립트 스레드가 얼마나 멈추는지도 확인합니다.
+프로세스 풀은 코어 수만큼만 빨라지므로 코어가 1개인 PC에서는 차이가 나지 않습니다.
+
+    python -m benchmarks.bench_image_pool --jobs 8 --workers 0 1 2 4
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Heartbeat:
+    """interval마다 깨어나는 스레드. 예정보다 늦게 깨어난 최대 시간(ms)을 기록합니다."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.max_delay_ms = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            time.sleep(self.interval)
+            delay = (time.perf_counter() - start - self.interval) * 1000
+            self.max_delay_ms = max(self.max_delay_ms, delay)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_jobs(executor, inputs, jobs: int, layout: str):
+    """jobs개 세션이 동시에 합성 + 인코딩. (소요 시간(초), 하트비트 최대 지연(ms))"""
+
+    def one(_):
+        final = executor.compose(inputs, layout)
+        return len(executor.encode(final, "print").data)
+
+    with Heartbeat() as heartbeat:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=jobs) as sessions:
+            list(sessions.map(one, range(jobs)))
+        elapsed = time.perf_counter() - start
+    return elapsed, heartbeat.max_delay_ms
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="이미지 작업 프로세스 풀 벤치마크")
+    parser.add_argument("--jobs", type=int, default=8, help="동시에 실행할 합성 수")
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4], help="작업 프로세스 수 (0: 스레드에서 바로 실행)")
+    parser.add_argument("--layout", default="grid")
+    parser.add_argument("--width", type=int, default=1024)
+    parser.add_argument("--height", type=int, default=1536)
+    args = parser.parse_args(argv)
+
+    from benchmarks.bench_encode import make_photo_like
+    from utils.image_executor import ImageExecutor
+
+    inputs = [make_photo_like((args.width, args.height)) for _ in range(4)]
+    print(f"CPU 코어 {os.cpu_count()}개, 동시 합성 {args.jobs}건 (입력 {args.width}x{args.height} x4, {args.layout}, print 인코딩)")
+    print(f"{'workers':<10}{'총 시간(s)':>12}{'합성/초':>10}{'배속':>8}{'스크립트 스레드 최대 지연(ms)':>30}")
+
+    baseline = None
+    for workers in args.workers:
+        executor = ImageExecutor(max_workers=workers)
+        try:
+            # 워밍업 (작업 프로세스 시작, 프레임 배경 캐시)
+            run_jobs(executor, inputs, max(1, workers), args.layout)
+            elapsed, stall = run_jobs(executor, inputs, args.jobs, args.layout)
+        finally:
+            executor.shutdown()
+        throughput = args.jobs / elapsed
+        baseline = baseline or throughput
+        label = "inline" if workers == 0 else str(workers)
+        print(f"{label:<10}{elapsed:>12.2f}{throughput:>10.2f}{throughput / baseline:>7.2f}x{stall:>30.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""
+콜드 스타트 import 시간 벤치마크.
+
+Streamlit 재시작 직후처럼 새 프로세스에서 키오스크(app.py), 관리자 로그인 화면, 관리자 대시보드가
+불러오는 모듈의 import 시간을 측정합니다. import 목록은 각 페이지 파일의 최상위 import 문에서 읽으므로
+페이지에 import를 추가하면 자동으로 반영됩니다.
+키오스크/로그인 화면이 Supabase/Gemini SDK를 불러오거나 --budget-ms를 넘으면 실패(종료 코드 1)합니다.
+
+    python -m benchmarks.bench_import --rounds 5
+    python -m benchmarks.bench_import --budget-ms 800
+"""
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 로그인 전 화면에서 불러오면 안 되는 무거운 SDK
+HEAVY_MODULES = ("supabase", "google.generativeai")
+
+MEASURE = """
+import json, sys, time
+start = time.perf_counter()
+exec(compile(sys.argv[1], "<imports>", "exec"))
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({"ms": elapsed, "heavy": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+def page_imports(path: str, before_first_if: bool = False) -> str:
+    """페이지 파일의 최상위 import 문 (before_first_if면 첫 최상위 if 문 이전 것만, 예: 로그인 확인 전)."""
+    with open(os.path.join(ROOT, path), encoding="utf-8") as f:
+        source = f.read()
+    lines = []
+    for node in ast.parse(source).body:
+        if before_first_if and isinstance(node, ast.If):
+            break
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            lines.append(ast.get_source_segment(source, node))
+    return "\n".join(lines)
+
+
+def measure(code: str, rounds: int) -> dict:
+    """새 프로세스에서 code를 rounds번 실행하여 import 시간 중앙값(ms)과 불러온 무거운 SDK를 반환합니다."""
+    env = dict(os.environ, METRICS_LOG="false", PYTHONPATH=ROOT)
+    samples, heavy = [], []
+    for _ in range(rounds):
+        out = subprocess.run(
+            [sys.executable, "-c", MEASURE, code],
+            cwd=ROOT, env=env, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        samples.append(result["ms"])
+        heavy = result["heavy"]
+    return {"ms": statistics.median(samples), "heavy": heavy}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="콜드 스타트 import 시간 벤치마크")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=None, help="키오스크/로그인 화면 import 시간 상한")
+    args = parser.parse_args(argv)
+
+    # (이름, import 코드, 로그인 전 화면 여부)
+    targets = [
+        ("streamlit", "import streamlit", False),
+        ("kiosk (app.py)", page_imports("app.py"), True),
+        ("admin login", page_imports("pages/Admin.py", before_first_if=True), True),
+        ("admin dashboard", page_imports("pages/Admin.py"), False),
+        ("supabase SDK", "import supabase", False),
+        ("gemini SDK", "import google.generativeai", False),
+    ]
+
+    print(f"새 프로세스 {args.rounds}회 중앙값")
+    print(f"{'target':<18}{'ms':>10}  불러온 SDK")
+    failures = []
+    for name, code, before_login in targets:
+        result = measure(code, args.rounds)
+        print(f"{name:<18}{result['ms']:>10.1f}  {', '.join(result['heavy']) or '-'}")
+        if before_login and result["heavy"]:
+            failures.append(f"{name}: {', '.join(result['heavy'])}을(를) 불러옴")
+        if before_login and args.budget_ms is not None and result["ms"] > args.budget_ms:
+            failures.append(f"{name}: {result['ms']:.0f}ms > {args.budget_ms:.0f}ms")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
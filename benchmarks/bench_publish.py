@@ -0,0 +1,85 @@
+"""
+결과 게시 단계 벤치마크.
+
+업로드 지연(왕복 시간 + 대역폭)을 흉내 낸 로컬 백엔드로 4컷 결과물을 게시하여
+변형별로 차례대로 올리는 방식과 publish_output(동시 업로드 + DB 1회 기록)의 소요 시간을 비교합니다.
+
+    python -m benchmarks.bench_publish --rtt-ms 150 --mbps 20
+"""
+import argparse
+import statistics
+import sys
+import time
+
+
+class SlowBackend:
+    """LocalBackend 앞에 네트워크 지연을 더한 백엔드."""
+
+    def __init__(self, backend, rtt_ms: float, mbps: float):
+        self.backend = backend
+        self.rtt = rtt_ms / 1000
+        self.bytes_per_sec = mbps * 1024 * 1024 / 8
+
+    def upload(self, file_bytes, bucket_name, file_path, content_type="image/png"):
+        time.sleep(self.rtt + len(file_bytes) / self.bytes_per_sec)
+        return self.backend.upload(file_bytes, bucket_name, file_path, content_type)
+
+    def set_output(self, *args, **kwargs):
+        time.sleep(self.rtt)
+        return self.backend.set_output(*args, **kwargs)
+
+    def update_status(self, *args, **kwargs):
+        time.sleep(self.rtt)
+        return self.backend.update_status(*args, **kwargs)
+
+
+def publish_sequential(request_id, final_image, backend):
+    """이전 방식: 변형마다 인코딩 → 업로드를 차례대로, 경로 저장과 상태 기록은 각각 한 번씩."""
+    from utils.publisher import output_paths
+    from utils.image_processor import encode_image
+
+    paths = output_paths(request_id)
+    for artifact in ("print", "download", "thumbnail"):
+        encoded = encode_image(final_image, artifact)
+        backend.upload(encoded.data, "output_images", paths[artifact], encoded.content_type)
+    backend.set_output(request_id, paths["print"], paths["download"])
+    backend.update_status(request_id, "processing")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="결과 게시 단계 벤치마크")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--rtt-ms", type=float, default=150)
+    parser.add_argument("--mbps", type=float, default=20, help="업로드 대역폭 (Mbit/s)")
+    args = parser.parse_args(argv)
+
+    from benchmarks.bench_encode import make_photo_like
+    from utils.backends import LocalBackend
+    from utils.publisher import publish_output
+
+    local = LocalBackend()
+    backend = SlowBackend(local, args.rtt_ms, args.mbps)
+    request_id = local.add_request(b"", style_types=["lego", "anime", "pixel", "clay"])["id"]
+    final_image = make_photo_like((954, 1428))
+
+    def measure(fn):
+        samples = []
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - start)
+        return statistics.median(samples) * 1000
+
+    sequential_ms = measure(lambda: publish_sequential(request_id, final_image, backend))
+    last = {}
+    concurrent_ms = measure(lambda: last.update(result=publish_output(request_id, final_image, backend)))
+
+    print(f"업로드 지연: RTT {args.rtt_ms:.0f}ms, {args.mbps:.0f}Mbit/s, {args.rounds}회 중앙값")
+    print(f"순차 게시: {sequential_ms:.0f}ms")
+    print(f"동시 게시: {concurrent_ms:.0f}ms ({sequential_ms / concurrent_ms:.1f}배)")
+    print(f"단계별 (마지막 회): {last['result'].summary()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
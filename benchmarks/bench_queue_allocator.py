@@ -0,0 +1,105 @@
+"""
+대기 번호 할당기 동시성 벤치마크.
+
+여러 스레드에서 동시에 요청을 제출하여 번호가 중복/누락 없이 할당되는지 확인하고
+제출 지연 시간(p50/p95/p99)을 측정합니다.
+
+    python -m benchmarks.bench_queue_allocator --threads 16 --per-thread 50
+    python -m benchmarks.bench_queue_allocator --supabase   # 실제 Supabase RPC 대상 (데이터가 쌓이므로 주의)
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def hammer(allocator, threads: int, per_thread: int):
+    """threads개 스레드가 각각 per_thread번 제출하고 (번호 목록, 지연 목록)을 반환합니다."""
+    numbers = []
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def submit(worker_id: int):
+        barrier.wait()  # 모든 스레드가 동시에 시작
+        for i in range(per_thread):
+            start = time.perf_counter()
+            try:
+                row = allocator.create_request({
+                    "input_image_url": f"bench/{worker_id}_{i}.jpg",
+                    "style_types": ["lego", "anime", "pixel", "clay"],
+                    "style_type": "lego",
+                })
+            except Exception as e:
+                with lock:
+                    errors.append(e)
+                continue
+            elapsed = time.perf_counter() - start
+            with lock:
+                numbers.append(row["queue_number"])
+                latencies.append(elapsed)
+
+    workers = [threading.Thread(target=submit, args=(n,)) for n in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return numbers, latencies, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="queue_number 할당기 동시성 벤치마크")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--per-thread", type=int, default=50)
+    parser.add_argument("--daily-reset", action="store_true")
+    parser.add_argument("--supabase", action="store_true", help="SQLite 대신 실제 Supabase RPC 사용")
+    args = parser.parse_args(argv)
+
+    from utils.queue_allocator import SQLiteQueueAllocator, SupabaseQueueAllocator
+
+    if args.supabase:
+        from utils.supabase_client import get_supabase
+        allocator = SupabaseQueueAllocator(get_supabase(), daily_reset=args.daily_reset)
+        target = "supabase"
+    else:
+        tmp_dir = tempfile.mkdtemp(prefix="queue_bench_")
+        allocator = SQLiteQueueAllocator(os.path.join(tmp_dir, "queue.db"), daily_reset=args.daily_reset)
+        target = "sqlite"
+
+    total = args.threads * args.per_thread
+    started = time.perf_counter()
+    numbers, latencies, errors = hammer(allocator, args.threads, args.per_thread)
+    wall = time.perf_counter() - started
+
+    unique = len(set(numbers))
+    print(f"대상: {target} | 스레드 {args.threads} x {args.per_thread} = {total}건")
+    print(f"성공 {len(numbers)}건, 오류 {len(errors)}건, 고유 번호 {unique}개, 소요 {wall:.2f}s ({len(numbers) / wall:.0f} req/s)")
+    if latencies:
+        print(
+            "지연(ms): "
+            f"p50={percentile(latencies, 50) * 1000:.2f} "
+            f"p95={percentile(latencies, 95) * 1000:.2f} "
+            f"p99={percentile(latencies, 99) * 1000:.2f} "
+            f"mean={statistics.mean(latencies) * 1000:.2f}"
+        )
+
+    ok = not errors and unique == len(numbers) == total
+    if ok and target == "sqlite":
+        # 빈 DB에서 시작했으므로 0..total-1이 빠짐없이 할당되어야 함
+        ok = sorted(numbers) == list(range(total))
+    print("✅ 번호 중복/누락 없음" if ok else "❌ 번호 중복 또는 누락 발생")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
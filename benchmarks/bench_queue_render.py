@@ -0,0 +1,81 @@
+"""
+관리자 대기열 렌더링 벤치마크.
+
+누적 요청 수(history)를 늘려 가며 전체 목록을 그릴 때와 window_rows로 한 페이지만 그릴 때의
+Streamlit 스크립트 실행 시간을 비교합니다. 대기열 행은 Admin 페이지와 같은 위젯 구성
+(테두리 컨테이너 + 3열 + 버튼 2개)으로 그립니다.
+
+    python -m benchmarks.bench_queue_render --history 100 1000 3000
+"""
+import argparse
+import statistics
+import sys
+import time
+
+
+def render_queue(rows, windowed: bool, page_size: int):
+    """Admin 대기열과 같은 위젯 구성으로 목록을 그리는 스크립트 (AppTest에서 실행)."""
+    import streamlit as st
+    from utils.queue_store import window_rows
+
+    if windowed:
+        rows, _, _ = window_rows(rows, "open", 1, page_size)
+    for req in rows:
+        with st.container(border=True):
+            c1, c2, c3 = st.columns([3, 1, 1])
+            with c1:
+                st.markdown(f"**번호:** `{req['queue_number']:03d}`")
+                st.caption(f"상태: {req['status']} | 요청 시간: {req['created_at']}")
+            with c2:
+                st.button("처리", key=f"btn_{req['id']}", use_container_width=True)
+            with c3:
+                st.button("🗑️", key=f"del_{req['id']}", use_container_width=True)
+
+
+def make_history(total: int, open_count: int):
+    """완료된 요청 total - open_count건 + 대기 중 open_count건."""
+    rows = []
+    for n in range(total):
+        rows.append({
+            "id": f"req-{n}",
+            "queue_number": n % 1000,
+            "status": "pending" if n >= total - open_count else "completed",
+            "created_at": f"2026-05-01T{n // 3600 % 24:02d}:{n // 60 % 60:02d}:{n % 60:02d}+00:00",
+        })
+    return rows
+
+
+def time_render(rows, windowed: bool, page_size: int, rounds: int) -> float:
+    from streamlit.testing.v1 import AppTest
+
+    samples = []
+    for _ in range(rounds):
+        app = AppTest.from_function(render_queue, args=(rows, windowed, page_size), default_timeout=600)
+        start = time.perf_counter()
+        app.run()
+        samples.append(time.perf_counter() - start)
+        if app.exception:
+            raise RuntimeError(app.exception[0].message)
+    return statistics.median(samples) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="관리자 대기열 렌더링 벤치마크")
+    parser.add_argument("--history", type=int, nargs="+", default=[100, 500, 2000])
+    parser.add_argument("--open", type=int, default=5, help="대기 중인 요청 수")
+    parser.add_argument("--page-size", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"대기 중 {args.open}건, 페이지 크기 {args.page_size}, {args.rounds}회 중앙값 (ms)")
+    print(f"{'history':>8}{'전체 목록':>12}{'페이지':>10}")
+    for total in args.history:
+        rows = make_history(total, args.open)
+        full_ms = time_render(rows, False, args.page_size, args.rounds)
+        windowed_ms = time_render(rows, True, args.page_size, args.rounds)
+        print(f"{total:>8}{full_ms:>12.0f}{windowed_ms:>10.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""
+업로드 검증/미리보기/정규화 벤치마크.
+
+12~48MP 휴대폰 사진 크기의 JPEG(EXIF 회전 포함)로
+이전 방식(verify → 재오픈 → 전체 디코딩 회전 → 미리보기용 재오픈/디코딩 → 정규화용 재디코딩)과
+open_validated_image(헤더 검증 → 축소 디코딩 1회를 미리보기와 정규화가 공유)를 비교합니다.
+
+    python -m benchmarks.bench_validate --megapixels 12 24 48
+"""
+import argparse
+import io
+import statistics
+import sys
+import time
+
+from PIL import Image, ImageOps
+
+
+def make_phone_jpeg(megapixels: int) -> bytes:
+    """4:3 비율, EXIF Orientation=6(세로 촬영)인 JPEG를 만듭니다."""
+    from benchmarks.bench_encode import make_photo_like
+
+    height = int((megapixels * 1_000_000 * 3 / 4) ** 0.5)
+    width = int(height * 4 / 3)
+    image = make_photo_like((width, height))
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    buf = io.BytesIO()
+    image.save(buf, format='JPEG', quality=92, exif=exif)
+    return buf.getvalue()
+
+
+def legacy_flow(raw: bytes):
+    """이전 app.py 흐름: validate_image + Image.open 미리보기 + normalize_upload(파일 재디코딩)."""
+    from utils.image_processor import INGEST_MAX_EDGE
+
+    file = io.BytesIO(raw)
+    img = Image.open(file)
+    img.verify()
+    file.seek(0)
+    img = Image.open(file)
+    ImageOps.exif_transpose(img)              # validate_image: 전체 디코딩
+    file.seek(0)
+    preview = Image.open(file)
+    preview.load()                            # 미리보기: 전체 디코딩 (st.image)
+    file.seek(0)
+    img = Image.open(file)                    # normalize_upload: 다시 열어 축소 디코딩
+    img.draft('RGB', (INGEST_MAX_EDGE, INGEST_MAX_EDGE))
+    img = ImageOps.exif_transpose(img).convert('RGB')
+    img.thumbnail((INGEST_MAX_EDGE, INGEST_MAX_EDGE), Image.Resampling.LANCZOS)
+    img.save(io.BytesIO(), format='JPEG', quality=88, optimize=True)
+
+
+def new_flow(raw: bytes):
+    from utils.image_processor import open_validated_image, normalize_upload
+
+    validated = open_validated_image(raw)
+    validated.image                           # 미리보기
+    normalize_upload(validated)
+
+
+def measure(fn, raw: bytes, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn(raw)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="업로드 검증/미리보기/정규화 벤치마크")
+    parser.add_argument("--megapixels", type=int, nargs="+", default=[12, 24, 48])
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    from utils.image_processor import open_validated_image
+
+    print(f"{args.rounds}회 중앙값 (ms)")
+    print(f"{'MP':>4}{'파일 KB':>10}{'헤더 검증':>10}{'이전':>10}{'현재':>10}")
+    for megapixels in args.megapixels:
+        raw = make_phone_jpeg(megapixels)
+        header_ms = measure(open_validated_image, raw, args.rounds)
+        legacy_ms = measure(legacy_flow, raw, args.rounds)
+        new_ms = measure(new_flow, raw, args.rounds)
+        print(f"{megapixels:>4}{len(raw) / 1024:>10.0f}{header_ms:>10.2f}{legacy_ms:>10.0f}{new_ms:>10.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+병렬 생성 경로 부하 테스트.
+
+가짜 Gemini(utils/fake_gemini.py)를 상대로 N건의 4컷 요청을 동시에 generate_multiple_styles_async로 보내
+재시도, 동시 호출 제어기(AIMD), 스레드 풀이 부하에서 어떻게 동작하는지 측정합니다.
+처리량, 요청 지연 p50/p95/p99, 헛된 호출(최종 셀이 되지 못한 API 호출) 수를 출력합니다.
+
+    python -m benchmarks.load_generation --requests 20 --latency 2
+    python -m benchmarks.load_generation --mode http --quota-rate 0.05 --burst-every 30 --burst-length 3
+    python -m benchmarks.load_generation --text-only-rate 0.1 --error-rate 0.05 --workers 16
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import math
+import os
+import random
+import sys
+import time
+
+# 같은 입력/스타일이 캐시에 적중하면 API를 호출하지 않으므로 부하 측정에서는 끔
+os.environ["GENERATION_CACHE_ENABLED"] = "false"
+
+from PIL import Image
+
+STYLES = ["lego", "anime", "pixel", "clay", "business", "figure"]
+
+
+def percentile(values, pct: float) -> float:
+    """nearest-rank 백분위수."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def make_input() -> Image.Image:
+    """업로드 정규화 후 크기(긴 변 1536)의 입력 사진 대용."""
+    from benchmarks.bench_encode import make_photo_like
+    return make_photo_like((1024, 1536))
+
+
+async def run_load(num_requests: int, max_retries: int, seed: int):
+    """N건의 4컷 요청을 동시에 시작하고 요청별 (지연, 성공 셀 수, 셀 수)를 모읍니다."""
+    from utils.gemini_client import generate_multiple_styles_async
+
+    rng = random.Random(seed)
+
+    async def one_request(i: int):
+        styles = rng.sample(STYLES, 4)
+        start = time.perf_counter()
+        results = await generate_multiple_styles_async(make_input(), styles, max_retries=max_retries)
+        ok = sum(1 for img, err in results.values() if img is not None)
+        return time.perf_counter() - start, ok, len(styles)
+
+    return await asyncio.gather(*(one_request(i) for i in range(num_requests)))
+
+
+def main(argv=None):
+    from utils.fake_gemini import FakeGemini, FakeGeminiModel, FakeGeminiServer, add_config_arguments, config_from_args
+
+    parser = argparse.ArgumentParser(description="병렬 생성 경로 부하 테스트 (가짜 Gemini)")
+    parser.add_argument("--requests", type=int, default=10, help="동시에 보낼 4컷 요청 수")
+    parser.add_argument("--mode", choices=["inproc", "http"], default="inproc",
+                        help="inproc: 프로세스 내 가짜 모델, http: 로컬 HTTP 서버 + 실제 SDK REST 전송")
+    parser.add_argument("--workers", type=int, default=None, help="GEMINI_MAX_WORKERS (기본: 환경 변수)")
+    parser.add_argument("--initial-concurrency", type=int, default=None, help="GEMINI_INITIAL_CONCURRENCY (기본: 환경 변수)")
+    parser.add_argument("--rpm", type=float, default=None, help="GEMINI_RPM (기본: 환경 변수)")
+    parser.add_argument("--max-retries", type=int, default=3)
+    parser.add_argument("--verbose", action="store_true", help="생성 로그 출력")
+    add_config_arguments(parser)
+    args = parser.parse_args(argv)
+
+    from utils import gemini_client
+    from utils.gemini_client import GenerationClient, set_generation_client
+
+    fake = FakeGemini(config_from_args(args))
+    server = None
+    if args.mode == "http":
+        server = FakeGeminiServer(fake).start()
+        gemini_client.configure_gemini(api_key="fake-key", api_endpoint=server.url)
+        model = None
+    else:
+        model = FakeGeminiModel(fake)
+
+    client = GenerationClient(
+        max_workers=args.workers or gemini_client.GEMINI_MAX_WORKERS,
+        model=model,
+        initial_concurrency=args.initial_concurrency or gemini_client.GEMINI_INITIAL_CONCURRENCY,
+        rpm=gemini_client.GEMINI_RPM if args.rpm is None else args.rpm
+    )
+    set_generation_client(client)
+
+    log = io.StringIO()
+    start = time.perf_counter()
+    try:
+        with contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(log):
+            results = client.run(run_load(args.requests, args.max_retries, args.seed or 0))
+    finally:
+        if server:
+            server.stop()
+    elapsed = time.perf_counter() - start
+
+    latencies = [latency for latency, _, _ in results]
+    cells_ok = sum(ok for _, ok, _ in results)
+    cells_total = sum(total for _, _, total in results)
+    complete = sum(1 for _, ok, total in results if ok == total)
+    stats = fake.stats()
+    wasted = stats["calls"] - cells_ok
+    limiter = client.limiter.stats()
+
+    print(f"모드: {args.mode}, 동시 요청 {args.requests}건 × 4컷, 워커 {client.max_workers}, "
+          f"지연 {args.latency_dist} {args.latency:.1f}s")
+    print(f"소요 시간: {elapsed:.1f}s")
+    print(f"처리량: 요청 {complete / elapsed:.2f}건/s, 셀 {cells_ok / elapsed:.2f}개/s")
+    print(f"완료: 요청 {complete}/{args.requests}, 셀 {cells_ok}/{cells_total}")
+    print(f"요청 지연: p50 {percentile(latencies, 50):.2f}s, p95 {percentile(latencies, 95):.2f}s, "
+          f"p99 {percentile(latencies, 99):.2f}s, 최대 {max(latencies):.2f}s")
+    print(f"API 호출: {stats['calls']}회 (최대 동시 {stats['max_in_flight']}), 결과별 {stats['outcomes']}")
+    print(f"헛된 호출: {wasted}회 ({wasted / max(1, stats['calls']):.0%})")
+    print(f"제어기: 최종 한도 {limiter['limit']}, 할당량 초과 {limiter['throttled']}회")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+"""
+이미지 처리 핫패스 벤치마크 스위트.
+
+실제 크기의 합성 입력(휴대폰 사진, Gemini 출력 크기, RGBA/P 모드)으로 함수별 실행 시간(최솟값, 다른 프로세스의 간섭에 덜 흔들림)과
+최대 메모리 증가량을 측정하고, 저장소의 기준값(benchmarks/baseline.json)과 비교하여
+기준보다 threshold 이상 느려지거나 메모리를 더 쓰면 실패(종료 코드 1)합니다.
+네트워크와 GPU 없이 CPU에서만 실행됩니다.
+
+각 케이스는 별도 프로세스에서 실행하여 이전 케이스의 메모리/캐시 영향을 받지 않습니다.
+기준값은 측정한 PC에 따라 다르므로 같은 PC에서 --update-baseline으로 다시 기록한 뒤 비교하세요.
+
+    python -m benchmarks.suite                       # 기준값과 비교
+    python -m benchmarks.suite --update-baseline     # 기준값 갱신
+    python -m benchmarks.suite --only four_cut --rounds 10
+"""
+import argparse
+import ctypes
+import gc
+import io
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+DEFAULT_THRESHOLD = 0.25
+GEMINI_SIZE = (1024, 1536)
+
+
+# ===== 입력 생성 =====
+
+def phone_jpeg(megapixels: int = 12) -> bytes:
+    from benchmarks.bench_validate import make_phone_jpeg
+    return make_phone_jpeg(megapixels)
+
+
+def gemini_image(mode: str = "RGB"):
+    from benchmarks.bench_encode import make_photo_like
+    image = make_photo_like(GEMINI_SIZE)
+    if mode == "RGBA":
+        image = image.convert("RGBA")
+    elif mode == "P":
+        image = image.convert("P")
+    return image
+
+
+def four_cut_image():
+    from utils.image_processor import create_four_cut_template
+    return create_four_cut_template([gemini_image() for _ in range(4)], "grid")
+
+
+# ===== 케이스 (이름 → (입력 준비 함수, 측정 함수)) =====
+
+def _validate_image(raw):
+    from utils.image_processor import validate_image
+    validate_image(io.BytesIO(raw))
+
+
+def _prepare_upload(raw):
+    from utils.image_processor import prepare_upload
+    prepare_upload(raw)
+
+
+def _process_for_print(image):
+    from utils.image_processor import process_image_for_print
+    process_image_for_print(image)
+
+
+def _four_cut(layout):
+    def run(images):
+        from utils.image_processor import create_four_cut_template
+        create_four_cut_template(images, layout)
+    return run
+
+
+def _image_to_bytes(image):
+    from utils.image_processor import image_to_bytes
+    image_to_bytes(image)
+
+
+def _encode(profile):
+    def run(image):
+        from utils.image_processor import encode_image
+        encode_image(image, profile)
+    return run
+
+
+def _qr_code(url):
+    from utils.qr_generator import generate_qr_code
+    generate_qr_code(url)
+
+
+CASES = {
+    "validate_image[phone_12mp]": (lambda: phone_jpeg(12), _validate_image),
+    "validate_image[phone_48mp]": (lambda: phone_jpeg(48), _validate_image),
+    "prepare_upload[phone_12mp]": (lambda: phone_jpeg(12), _prepare_upload),
+    "prepare_upload[phone_48mp]": (lambda: phone_jpeg(48), _prepare_upload),
+    "process_image_for_print[gemini_rgb]": (lambda: gemini_image("RGB"), _process_for_print),
+    "process_image_for_print[gemini_rgba]": (lambda: gemini_image("RGBA"), _process_for_print),
+    "process_image_for_print[gemini_p]": (lambda: gemini_image("P"), _process_for_print),
+    "four_cut[grid]": (lambda: [gemini_image() for _ in range(4)], _four_cut("grid")),
+    "four_cut[strip]": (lambda: [gemini_image() for _ in range(4)], _four_cut("strip")),
+    "four_cut[branded]": (lambda: [gemini_image() for _ in range(4)], _four_cut("branded")),
+    "four_cut[rgba]": (lambda: [gemini_image("RGBA") for _ in range(4)], _four_cut("grid")),
+    "image_to_bytes[four_cut_png]": (four_cut_image, _image_to_bytes),
+    "encode[print]": (four_cut_image, _encode("print")),
+    "encode[download]": (four_cut_image, _encode("download")),
+    "encode[thumbnail]": (four_cut_image, _encode("thumbnail")),
+    "generate_qr_code[url]": (
+        lambda: "https://example.supabase.co/storage/v1/object/public/output_images/result_0000_1700000000_download.jpg",
+        _qr_code
+    ),
+}
+
+
+# ===== 측정 =====
+
+def _release_free_memory():
+    """해제된 메모리를 OS에 반환하여(glibc) 워밍업에서 쓴 메모리가 측정 기준에 섞이지 않게 합니다."""
+    gc.collect()
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+def _reset_peak_rss() -> bool:
+    """Linux에서 최대 RSS(VmHWM)를 현재 값으로 초기화합니다. 지원하지 않으면 False."""
+    _release_free_memory()
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _read_status_kb(field: str):
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _peak_rss_kb() -> int:
+    peak = _read_status_kb("VmHWM")
+    if peak is not None:
+        return peak
+    # macOS는 바이트, Linux는 KB
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss // 1024 if sys.platform == "darwin" else maxrss
+
+
+def _run_case(name: str, rounds: int, conn):
+    """자식 프로세스: 입력 준비 → 워밍업 → rounds회 측정 → 결과 전송."""
+    try:
+        setup, fn = CASES[name]
+        arg = setup()
+        fn(arg)  # 워밍업 (프레임 배경/폰트 캐시 등)
+
+        precise = _reset_peak_rss()
+        base_kb = _read_status_kb("VmRSS") if precise else _peak_rss_kb()
+        samples = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            fn(arg)
+            samples.append(time.perf_counter() - start)
+            _release_free_memory()
+        peak_mb = max(0, _peak_rss_kb() - (base_kb or 0)) / 1024
+        conn.send({"ms": min(samples) * 1000, "peak_mb": peak_mb, "precise_memory": precise})
+    except Exception as e:
+        conn.send({"error": f"{type(e).__name__}: {e}"})
+    finally:
+        conn.close()
+
+
+def run_case(name: str, rounds: int) -> dict:
+    ctx = multiprocessing.get_context("spawn")
+    parent, child = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_run_case, args=(name, rounds, child))
+    process.start()
+    child.close()
+    result = parent.recv()
+    process.join()
+    return result
+
+
+def compare(result: dict, baseline: dict, threshold: float, memory_slack_mb: float, time_slack_ms: float = 1.0) -> list:
+    """기준 대비 회귀 항목 목록을 반환합니다."""
+    problems = []
+    # 1ms 미만 케이스(헤더 검사 등)는 비율만으로 비교하면 타이머 오차로 실패하므로 여유분을 더함
+    if result["ms"] > baseline["ms"] * (1 + threshold) + time_slack_ms:
+        problems.append(f"시간 {baseline['ms']:.1f} → {result['ms']:.1f}ms")
+    # 메모리는 작은 값의 흔들림을 무시하기 위해 여유분(memory_slack_mb)을 더해 비교
+    if result["peak_mb"] > baseline["peak_mb"] * (1 + threshold) + memory_slack_mb:
+        problems.append(f"메모리 {baseline['peak_mb']:.1f} → {result['peak_mb']:.1f}MB")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="이미지 처리 핫패스 벤치마크 스위트")
+    parser.add_argument("--rounds", type=int, default=7)
+    parser.add_argument("--only", help="이름에 이 문자열이 포함된 케이스만 실행")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="허용 회귀 비율 (0.25 = 25%%)")
+    parser.add_argument("--memory-slack-mb", type=float, default=8.0)
+    parser.add_argument("--time-slack-ms", type=float, default=1.0)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="측정값을 기준값으로 저장")
+    args = parser.parse_args(argv)
+
+    names = [name for name in CASES if not args.only or args.only in name]
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print(f"{'case':<40}{'ms':>10}{'peak MB':>10}{'기준 ms':>10}  결과")
+    results = {}
+    failed = False
+    for name in names:
+        result = run_case(name, args.rounds)
+        if "error" in result:
+            print(f"{name:<40}{'':>10}{'':>10}{'':>10}  ❌ {result['error']}")
+            failed = True
+            continue
+        results[name] = {"ms": round(result["ms"], 2), "peak_mb": round(result["peak_mb"], 1)}
+        base = baseline.get("cases", {}).get(name)
+        if args.update_baseline or base is None:
+            status = "기록" if args.update_baseline else "기준 없음"
+            base_ms = ""
+        else:
+            problems = compare(result, base, args.threshold, args.memory_slack_mb, args.time_slack_ms)
+            status = "❌ " + ", ".join(problems) if problems else "✅"
+            failed = failed or bool(problems)
+            base_ms = f"{base['ms']:.1f}"
+        print(f"{name:<40}{result['ms']:>10.1f}{result['peak_mb']:>10.1f}{base_ms:>10}  {status}")
+
+    if args.update_baseline:
+        cases = dict(baseline.get("cases", {}))
+        cases.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "rounds": args.rounds,
+                "python": sys.version.split()[0],
+                "cpu_count": os.cpu_count(),
+                "cases": cases,
+            }, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"기준값 저장: {args.baseline}")
+        return 0 if not failed else 1
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
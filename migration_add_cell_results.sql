@@ -0,0 +1,5 @@
+-- 4-cut 셀별 생성 결과 저장 (부분 성공 재시도용)
+-- 예: {"lego": {"status": "completed", "path": "cells/<id>/0_lego_1700000000.png"},
+--      "anime": {"status": "failed", "error": "..."}}
+ALTER TABLE booth_requests
+ADD COLUMN IF NOT EXISTS cell_results JSONB;
@@ -0,0 +1,4 @@
+-- QR 다운로드용 경량 결과 이미지 경로 (output_images 버킷)
+-- output_image_url은 인쇄용 원본(PNG), download_image_url은 휴대폰 다운로드용(JPEG 등)
+ALTER TABLE booth_requests
+ADD COLUMN IF NOT EXISTS download_image_url TEXT;
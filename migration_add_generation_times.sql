@@ -0,0 +1,30 @@
+-- 대기 시간 예측용 생성 시작/완료 시각
+-- started_at: 요청이 processing으로 바뀐 시각 (선점/재시도), generated_at: 결과 이미지 경로가 저장된 시각
+-- 두 값의 차이가 요청 1건의 생성 소요 시간이며, 최근 완료 요청들로 스타일별/4컷 소요 시간을 계산합니다.
+-- 트리거가 기록하므로 관리자 대시보드와 워커 코드는 그대로 둡니다.
+ALTER TABLE booth_requests
+ADD COLUMN IF NOT EXISTS started_at TIMESTAMPTZ,
+ADD COLUMN IF NOT EXISTS generated_at TIMESTAMPTZ;
+
+CREATE OR REPLACE FUNCTION set_booth_requests_generation_times()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.status = 'processing' AND OLD.status IS DISTINCT FROM 'processing' THEN
+        NEW.started_at := clock_timestamp();
+        NEW.generated_at := NULL;
+    END IF;
+    IF NEW.output_image_url IS NOT NULL AND NEW.output_image_url IS DISTINCT FROM OLD.output_image_url THEN
+        NEW.generated_at := clock_timestamp();
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_booth_requests_generation_times ON booth_requests;
+CREATE TRIGGER trg_booth_requests_generation_times
+BEFORE UPDATE ON booth_requests
+FOR EACH ROW EXECUTE FUNCTION set_booth_requests_generation_times();
+
+-- 최근 완료 요청 조회용
+CREATE INDEX IF NOT EXISTS idx_booth_requests_generated_at
+ON booth_requests(generated_at DESC) WHERE generated_at IS NOT NULL;
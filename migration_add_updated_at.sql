@@ -0,0 +1,22 @@
+-- 관리자 대기열 증분 동기화용 updated_at 컬럼
+-- 행이 삽입/수정될 때마다 updated_at이 갱신되므로, 대시보드는 마지막으로 본 시각 이후에 바뀐 행만 가져옵니다.
+
+ALTER TABLE booth_requests
+ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
+
+CREATE OR REPLACE FUNCTION set_booth_requests_updated_at()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.updated_at := clock_timestamp();
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_booth_requests_updated_at ON booth_requests;
+CREATE TRIGGER trg_booth_requests_updated_at
+BEFORE INSERT OR UPDATE ON booth_requests
+FOR EACH ROW EXECUTE FUNCTION set_booth_requests_updated_at();
+
+CREATE INDEX IF NOT EXISTS idx_booth_requests_updated_at ON booth_requests(updated_at);
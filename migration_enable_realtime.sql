@@ -0,0 +1,3 @@
+-- 관리자 대시보드 실시간 갱신: booth_requests 변경을 Realtime으로 발행
+-- 실행하지 않으면 대시보드는 폴링(변경이 없을수록 간격 증가)으로 동작합니다.
+ALTER PUBLICATION supabase_realtime ADD TABLE booth_requests;
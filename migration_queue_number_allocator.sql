@@ -0,0 +1,50 @@
+-- 대기 번호 원자적 할당 (create_booth_request RPC)
+-- 번호 할당 + 요청 삽입을 한 번의 호출로 처리합니다.
+-- 카운터 행에 대한 UPSERT 잠금으로 직렬화되어 동시 제출 시에도 번호가 중복되지 않습니다.
+
+CREATE TABLE IF NOT EXISTS booth_queue_counters (
+    counter_key TEXT PRIMARY KEY,   -- 'global' 또는 일자('YYYY-MM-DD')
+    last_value INTEGER NOT NULL
+);
+
+-- 기존 데이터가 있으면 최대 번호 다음부터 이어서 할당
+INSERT INTO booth_queue_counters (counter_key, last_value)
+VALUES ('global', COALESCE((SELECT MAX(queue_number) FROM booth_requests), -1))
+ON CONFLICT (counter_key) DO NOTHING;
+
+ALTER TABLE booth_queue_counters ENABLE ROW LEVEL SECURITY;
+
+CREATE OR REPLACE FUNCTION create_booth_request(
+    p_input_image_url TEXT,
+    p_style_type TEXT DEFAULT NULL,
+    p_style_types JSONB DEFAULT NULL,
+    p_daily_reset BOOLEAN DEFAULT FALSE,
+    p_timezone TEXT DEFAULT 'Asia/Seoul'
+) RETURNS SETOF booth_requests
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_key TEXT;
+    v_number INTEGER;
+BEGIN
+    IF p_daily_reset THEN
+        v_key := to_char(now() AT TIME ZONE p_timezone, 'YYYY-MM-DD');
+    ELSE
+        v_key := 'global';
+    END IF;
+
+    INSERT INTO booth_queue_counters AS c (counter_key, last_value)
+    VALUES (v_key, 0)
+    ON CONFLICT (counter_key) DO UPDATE SET last_value = c.last_value + 1
+    RETURNING c.last_value INTO v_number;
+
+    RETURN QUERY
+    INSERT INTO booth_requests (input_image_url, status, style_type, style_types, queue_number)
+    VALUES (p_input_image_url, 'pending', p_style_type, p_style_types, v_number)
+    RETURNING *;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION create_booth_request(TEXT, TEXT, JSONB, BOOLEAN, TEXT) TO anon, authenticated;
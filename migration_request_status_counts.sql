@@ -0,0 +1,14 @@
+-- 상태별 요청 수 집계 (booth_request_counts RPC)
+-- 관리자 대시보드가 전체 행을 내려받지 않고 상태별 개수만 가져옵니다. (idx_status_created 인덱스 사용)
+
+CREATE OR REPLACE FUNCTION booth_request_counts()
+RETURNS TABLE (status TEXT, count BIGINT)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT status, COUNT(*) FROM booth_requests GROUP BY status;
+$$;
+
+GRANT EXECUTE ON FUNCTION booth_request_counts() TO anon, authenticated;
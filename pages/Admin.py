@@ -2,32 +2,15 @@
 import streamlit as st
 st.set_page_config(page_title="Admin Dashboard - COM-ART", page_icon="🛠️", layout="wide")
 
-from streamlit_autorefresh import st_autorefresh
-from utils.supabase_client import (
-    get_pending_requests,
-    get_all_active_requests,
-    update_request_status,
-    download_image,
-    upload_image,
-    get_image_url,
-    delete_request,
-    supabase
-)
-from utils.gemini_client import generate_styled_image, generate_multiple_styles_sync
-from utils.image_processor import process_image_for_print, image_to_bytes, create_four_cut_template
-from utils.qr_generator import generate_qr_code
-from PIL import Image
-import io
 import time
 
 # 세션 상태 초기화
 if "admin_authenticated" not in st.session_state:
     st.session_state.admin_authenticated = False
 
-# 관리자 비밀번호 확인 (.env 파일에서만 로드)
+# 관리자 비밀번호 확인 (.env 파일에서만 로드, utils 패키지 import 시 로드됨)
 import os
-from dotenv import load_dotenv
-load_dotenv()
+import utils  # noqa: F401 (.env 로드)
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "admin123")  # 기본값
 
 # 로그인 페이지
@@ -52,12 +35,72 @@ if not st.session_state.admin_authenticated:
     
     st.stop()
 
-# 자동 새로고침 (작업 중이 아닐 때만)
-if 'selected_request' not in st.session_state and 'generated_result' not in st.session_state:
-    count = st_autorefresh(interval=10000, limit=None, key="fizzbuzzcounter")
+# 대시보드 모듈 (Supabase/Gemini SDK 포함)은 로그인 후에만 불러와 로그인 화면이 빨리 뜨도록 함
+from utils.supabase_client import (
+    get_change_feed,
+    ChangeWatcher,
+    get_request,
+    get_status_counts,
+    update_request_status,
+    download_image,
+    download_thumbnail,
+    get_download_cache_stats,
+    get_image_url,
+    delete_request,
+    claim_request,
+    reclaim_stale_request,
+    CLAIM_STALE_SECONDS
+)
+from utils.gemini_client import generate_styled_image, generate_styles_as_completed, get_generation_client, GEMINI_MAX_WORKERS
+from utils.batch import get_batch_dispatcher, BATCH_SIZE, BATCH_CONCURRENCY
+from utils.backends import SupabaseBackend
+from utils.queue_store import QueueStore, QUEUE_PAGE_SIZE, window_rows
+from utils.pipeline import stream_cells, missing_cells_message, decode_image
+from utils.publisher import publish_output
+from utils.image_processor import FourCutCompositor
+from utils.image_executor import get_image_executor
+from utils.qr_generator import generate_qr_code
+from utils.metrics import get_metrics, request_context
+from utils.wait_estimator import get_wait_estimator, format_wait, parse_timestamp, WAIT_CONCURRENCY
 
 st.title("🛠️ COM-ART 관리자 대시보드")
 
+# 대기열 동기화: 세션마다 한 번 전체 로드 후 변경분만 가져오고, 사이드바와 목록이 같은 결과를 사용
+if 'queue_store' not in st.session_state:
+    st.session_state.queue_store = QueueStore()
+queue_store = st.session_state.queue_store
+
+def poll_queue_changes(store=queue_store) -> bool:
+    return store.refresh().changed > 0
+
+# 변경 감지: Realtime 구독이 살아 있으면 booth_requests가 실제로 바뀐 경우에만 갱신하고,
+# 구독을 사용할 수 없으면 폴링으로 대체 (변경이 없을수록 간격 증가)
+if 'queue_watcher' not in st.session_state:
+    st.session_state.queue_watcher = ChangeWatcher(get_change_feed(), poll_queue_changes)
+queue_watcher = st.session_state.queue_watcher
+queue_watcher.mark_seen()
+
+try:
+    queue_store.refresh()
+except Exception as e:
+    st.error(f"대기열 조회 오류: {e}")
+
+# 대기 시간 예측: 최근 생성 소요 시간(주기적으로 갱신)과 동기화된 목록만으로 계산 (새로고침마다 DB 조회 없음)
+wait_estimator = get_wait_estimator()
+wait_estimator.refresh()
+current_batch = get_batch_dispatcher().current
+wait_concurrency = max(WAIT_CONCURRENCY, current_batch.concurrency if current_batch is not None and current_batch.running else 0)
+wait_etas = wait_estimator.estimate(queue_store.rows(), wait_concurrency)
+
+# 자동 새로고침 (작업 중이 아닐 때만): 1초마다 변경 여부만 확인하고, 바뀐 경우에만 전체 화면을 다시 그림
+if 'selected_request' not in st.session_state and 'generated_result' not in st.session_state:
+    @st.fragment(run_every=1)
+    def watch_queue_changes():
+        if queue_watcher.should_refresh():
+            st.rerun()
+    
+    watch_queue_changes()
+
 # 사이드바: 상태 모니터링 및 설정
 with st.sidebar:
     st.header("상태 모니터링")
@@ -72,15 +115,98 @@ with st.sidebar:
     
     st.divider()
     
-    # 통계 (간단한 카운트)
+    # 통계 (서버 집계, 실패 시 동기화된 목록 기준)
     try:
-        active_reqs = get_all_active_requests()
-        pending_count = len([r for r in active_reqs if r['status'] == 'pending'])
-        completed_count = len([r for r in active_reqs if r['status'] == 'completed'])
-        st.metric("대기 중", pending_count)
-        st.metric("완료됨", completed_count)
-    except Exception as e:
-        st.error(f"통계 오류: {e}")
+        status_counts = get_status_counts()
+    except Exception:
+        status_counts = queue_store.count_by_status()
+    st.metric("대기 중", status_counts.get('pending', 0))
+    st.metric("완료됨", status_counts.get('completed', 0))
+    if wait_etas:
+        st.caption(f"⏳ 대기열 처리 완료 예상 {format_wait(max(wait_etas.values()))} (동시 {wait_concurrency}건 기준)")
+    
+    # 갱신 방식 및 마지막 새로고침 전송량
+    if queue_watcher.feed.available:
+        st.caption("📡 실시간 갱신 중")
+    else:
+        st.caption(f"🔁 폴링 갱신 중 (간격 {queue_watcher.interval:.0f}초)")
+    sync_stats = queue_store.stats()
+    st.caption(
+        f"🔄 동기화({sync_stats['mode']}) {sync_stats['last_rows']}행 / {sync_stats['last_bytes'] / 1024:.1f}KB, "
+        f"{sync_stats['last_ms']:.0f}ms | 누적 {sync_stats['total_bytes'] / 1024:.1f}KB ({sync_stats['refreshes']}회)"
+    )
+    cache_stats = get_download_cache_stats()
+    if cache_stats:
+        st.caption(
+            f"💾 이미지 캐시 적중률 {cache_stats['hit_rate'] * 100:.0f}% ({cache_stats['hits']}/{cache_stats['hits'] + cache_stats['misses']}) | "
+            f"{cache_stats['bytes'] / 1024 / 1024:.1f}/{cache_stats['max_bytes'] / 1024 / 1024:.0f}MB"
+        )
+    
+    # Gemini 호출 제어기 상태 (프로세스 전역)
+    gen_stats = get_generation_client().stats()
+    st.caption(
+        f"🤖 Gemini 동시 호출 한도 {gen_stats['limit']} | 진행 {gen_stats['in_flight']} | "
+        f"대기 {gen_stats['queue_depth']} | 스로틀 {gen_stats['throttled']}회"
+    )
+    
+    st.divider()
+    
+    # 일괄 처리: 다음 N건을 선점해 백그라운드에서 동시에 생성 (그동안 다른 결과 검토/인쇄 가능)
+    st.subheader("📦 일괄 처리")
+    batch_dispatcher = get_batch_dispatcher()
+    batch = batch_dispatcher.current
+    batch_running = batch is not None and batch.running
+    if not batch_running:
+        b1, b2 = st.columns(2)
+        batch_count = b1.number_input("건수", min_value=1, max_value=20, value=BATCH_SIZE, key="batch_count")
+        batch_concurrency = b2.number_input(
+            "동시 처리", min_value=1, max_value=GEMINI_MAX_WORKERS, value=min(BATCH_CONCURRENCY, GEMINI_MAX_WORKERS), key="batch_concurrency"
+        )
+        if st.button(f"▶️ 다음 {batch_count}건 처리", use_container_width=True, disabled=status_counts.get('pending', 0) == 0):
+            try:
+                batch_dispatcher.start(int(batch_count), int(batch_concurrency))
+                st.rerun()
+            except RuntimeError as e:
+                st.warning(str(e))
+    
+    # 진행 중에는 이 영역만 1초마다 갱신하고, 요청이 끝날 때마다 대기열을 다시 그림 (작업 중이 아닐 때만)
+    @st.fragment(run_every=1 if batch_running else None)
+    def batch_progress():
+        batch = batch_dispatcher.current
+        if batch is None:
+            return
+        finished = batch.processed + batch.failed
+        for job in batch.job_list():
+            icon = {"running": "⏳", "done": "✅", "failed": "❌"}[job.status]
+            st.progress(
+                job.cells_done / max(1, job.cells_total),
+                text=f"{icon} `{job.queue_number:03d}` {job.cells_done}/{job.cells_total}컷 · {job.elapsed:.0f}초"
+            )
+            if job.error:
+                st.caption(f"❌ {job.error[:100]}")
+        st.caption(f"선점 {batch.claimed}/{batch.count}건 | 완료 {batch.processed} | 실패 {batch.failed}")
+        if batch.running:
+            if st.button("⏹️ 새 요청 선점 중지", use_container_width=True):
+                batch_dispatcher.stop()
+        
+        seen = st.session_state.get("batch_seen_finished")
+        st.session_state.batch_seen_finished = finished
+        idle = 'selected_request' not in st.session_state and 'generated_result' not in st.session_state
+        if batch_running and (not batch.running or (idle and seen is not None and finished > seen)):
+            st.rerun()
+    
+    batch_progress()
+    
+    # 단계/스타일별 지연 (프로세스 전역, 이 PC에서 처리한 요청 기준)
+    with st.expander("📈 단계별 지연"):
+        metrics = get_metrics()
+        stage_rows = metrics.summary()
+        if stage_rows:
+            st.dataframe(stage_rows, hide_index=True, use_container_width=True)
+            st.download_button("JSONL 내보내기", metrics.to_jsonl(), file_name="booth_spans.jsonl", mime="application/x-ndjson")
+            st.download_button("Prometheus 내보내기", metrics.to_prometheus(), file_name="booth_metrics.prom", mime="text/plain")
+        else:
+            st.caption("아직 기록된 구간이 없습니다.")
 
 # 메인 콘텐츠
 col1, col2 = st.columns([1, 2])
@@ -88,13 +214,29 @@ col1, col2 = st.columns([1, 2])
 with col1:
     st.subheader("📋 대기열 (Queue)")
     
-    all_requests = get_all_active_requests()
+    render_started = time.perf_counter()
+    all_requests = queue_store.rows()
+    
+    # 보기 선택 (진행 중 / 완료됨 / 전체) 및 페이지
+    view_labels = {"open": "진행 중", "completed": "완료됨", "all": "전체"}
+    queue_view = st.radio(
+        "보기", list(view_labels), format_func=view_labels.get,
+        horizontal=True, label_visibility="collapsed", key="queue_view"
+    )
+    _, view_total, page_count = window_rows(all_requests, queue_view, 1, QUEUE_PAGE_SIZE)
+    page = 1
+    if page_count > 1:
+        # 삭제 등으로 페이지 수가 줄어든 경우 마지막 페이지로 조정
+        if st.session_state.get("queue_page", 1) > page_count:
+            st.session_state.queue_page = page_count
+        page = st.number_input(f"페이지 (총 {page_count})", min_value=1, max_value=page_count, step=1, key="queue_page")
+    page_requests, view_total, page_count = window_rows(all_requests, queue_view, page, QUEUE_PAGE_SIZE)
     
-    if not all_requests:
+    if not page_requests:
         st.info("요청이 없습니다.")
     else:
-        # 대기열 리스트 표시
-        for req in all_requests:
+        # 대기열 리스트 표시 (현재 페이지만)
+        for req in page_requests:
             queue_num = req.get('queue_number', 0)
             status = req.get('status', 'pending')
             
@@ -105,6 +247,9 @@ with col1:
             elif status == 'processing':
                 border_color = "border: 2px solid #ffaa00;"
                 status_emoji = "⏳"
+            elif status == 'failed':
+                border_color = "border: 2px solid #ff4b4b;"
+                status_emoji = "❌"
             else:  # pending
                 border_color = ""
                 status_emoji = "⏸️"
@@ -114,6 +259,15 @@ with col1:
                 with c1:
                     st.markdown(f"{status_emoji} **번호:** `{queue_num:03d}`")
                     
+                    # 썸네일 (결과가 있으면 결과, 없으면 원본 / 디스크 캐시 사용)
+                    try:
+                        if req.get('output_image_url'):
+                            st.image(download_thumbnail("output_images", req['output_image_url']), width=96)
+                        else:
+                            st.image(download_thumbnail("input_images", req['input_image_url']), width=96)
+                    except Exception as e:
+                        print(f"썸네일 로드 실패: {e}")
+                    
                     # 4-cut 요청인지 확인
                     if req.get('style_types') and isinstance(req['style_types'], list):
                         styles = " → ".join(req['style_types'])
@@ -121,23 +275,31 @@ with col1:
                     else:
                         st.markdown(f"**스타일:** `{req['style_type']}`")
                     
-                    st.caption(f"상태: {status} | 요청 시간: {req['created_at']}")
+                    eta = f" | 예상 완료 {format_wait(wait_etas[req['id']])}" if req['id'] in wait_etas else ""
+                    st.caption(f"상태: {status} | 요청 시간: {req['created_at']}{eta}")
                 with c2:
-                    button_label = "확인" if status == 'completed' else "처리"
+                    # 워커가 생성을 끝낸 요청(processing + 결과 경로)도 검토용으로 바로 확인
+                    has_output = bool(req.get('output_image_url'))
+                    if status == 'completed' or has_output:
+                        button_label = "확인"
+                    elif status == 'failed':
+                        button_label = "재시도"
+                    else:
+                        button_label = "처리"
                     if st.button(button_label, key=f"btn_{req['id']}", use_container_width=True):
+                        # 목록에는 일부 컬럼만 있으므로 선택한 요청은 전체 컬럼(cell_results 등)을 다시 조회
+                        req = get_request(req['id']) or req
                         st.session_state.selected_request = req
-                        # 완료된 요청인 경우 결과를 바로 로드
-                        if status == 'completed' and req.get('output_image_url'):
+                        # 결과가 있는 요청은 결과를 바로 로드
+                        if has_output:
                             try:
-                                from PIL import ImageOps
-                                output_data = download_image("output_images", req['output_image_url'])
-                                output_image = Image.open(io.BytesIO(output_data))
-                                # EXIF 회전 정보 자동 적용
-                                output_image = ImageOps.exif_transpose(output_image) if output_image else output_image
+                                # 검토 화면은 썸네일로 표시 (원본은 "원본 해상도로 보기"에서 로드)
+                                output_image = decode_image(download_thumbnail("output_images", req['output_image_url']))
                                 is_four_cut = req.get('style_types') is not None and isinstance(req['style_types'], list)
                                 st.session_state.generated_result = {
                                     "image": output_image,
-                                    "url": get_image_url("output_images", req['output_image_url']),
+                                    "preview": True,
+                                    "url": get_image_url("output_images", req.get('download_image_url') or req['output_image_url']),
                                     "req": req,
                                     "is_four_cut": is_four_cut
                                 }
@@ -148,6 +310,7 @@ with col1:
                     if st.button("🗑️", key=f"del_{req['id']}", use_container_width=True, help="삭제"):
                         try:
                             delete_request(req['id'])
+                            queue_store.remove(req['id'])
                             if 'selected_request' in st.session_state and st.session_state.selected_request['id'] == req['id']:
                                 del st.session_state.selected_request
                             st.success("삭제되었습니다.")
@@ -155,6 +318,9 @@ with col1:
                         except Exception as e:
                             st.error(f"삭제 실패: {e}")
 
+    # 목록 렌더링 시간 (표시 건수는 페이지 크기로 제한됨)
+    st.caption(f"⏱️ 목록 렌더링 {(time.perf_counter() - render_started) * 1000:.0f}ms | 표시 {len(page_requests)}/{view_total}건")
+
 with col2:
     st.subheader("🎨 작업 스테이션")
     
@@ -165,18 +331,14 @@ with col2:
     elif 'selected_request' in st.session_state:
         req = st.session_state.selected_request
         
-        # 1. 원본 이미지 로드
+        # 1. 원본 이미지 미리보기 (썸네일, 원본은 생성 시작 시 다운로드)
         try:
-            with st.spinner("원본 이미지를 다운로드 중입니다..."):
-                from PIL import ImageOps
-                img_data = download_image("input_images", req['input_image_url'])
-                original_image = Image.open(io.BytesIO(img_data))
-                # EXIF 회전 정보 자동 적용
-                original_image = ImageOps.exif_transpose(original_image) if original_image else original_image
+            with st.spinner("원본 이미지를 불러오는 중입니다..."):
+                preview_image = decode_image(download_thumbnail("input_images", req['input_image_url']))
                 
             c1, c2 = st.columns(2)
             with c1:
-                st.image(original_image, caption="원본 이미지", use_column_width=True)
+                st.image(preview_image, caption="원본 이미지", use_column_width=True)
             with c2:
                 # 4-cut 요청인지 확인
                 is_four_cut = req.get('style_types') is not None and isinstance(req['style_types'], list)
@@ -186,104 +348,132 @@ with col2:
                     st.markdown(f"### 4컷 요청 (스타일: {len(style_types)}개)")
                     styles_display = " → ".join(style_types)
                     st.info(f"📸 {styles_display}")
+                    
+                    # 이전 시도에서 저장된 셀 (재시도 시 나머지만 생성)
+                    cell_results = req.get('cell_results') or {}
+                    saved_cells = [s for s in style_types if (cell_results.get(s) or {}).get('status') == 'completed']
+                    if saved_cells:
+                        st.caption(f"♻️ 저장된 셀 {len(saved_cells)}/{len(style_types)}개 재사용, {len(style_types) - len(saved_cells)}개만 생성합니다.")
                 else:
                     st.markdown(f"### 단일 스타일: **{req['style_type']}**")
                 
-                st.markdown("AI 생성을 시작하려면 아래 버튼을 누르세요.")
+                # 결과 없이 processing인 요청은 워커/일괄 처리/다른 관리자가 생성 중 (오래 멈춰 있으면 다시 선점 가능)
+                in_flight = req.get('status') == 'processing' and not req.get('output_image_url')
+                started = parse_timestamp(req.get('started_at'))
+                stale = in_flight and started is not None and time.time() - started > CLAIM_STALE_SECONDS
                 
                 # 2. 생성 버튼
-                button_label = "✨ 4컷 이미지 생성 시작" if is_four_cut else "✨ AI 이미지 생성 시작"
+                if stale:
+                    button_label = "⚠️ 중단된 요청 다시 생성"
+                    st.markdown(f"{int((time.time() - started) // 60)}분째 결과가 없습니다. 처리가 중단된 경우 다시 생성하세요.")
+                else:
+                    button_label = "✨ 4컷 이미지 생성 시작" if is_four_cut else "✨ AI 이미지 생성 시작"
+                    st.markdown("AI 생성을 시작하려면 아래 버튼을 누르세요.")
                 
-                if st.button(button_label, type="primary", use_container_width=True):
+                if in_flight and not stale:
+                    st.info("⏳ 다른 워커/관리자가 생성 중인 요청입니다. 결과가 나오면 대기열에서 확인할 수 있습니다.")
+                elif st.button(button_label, type="primary", use_container_width=True):
+                    # 워커/다른 관리자와 동시에 가져가지 않도록 선점(조건부 update) 후 처리
+                    claimed = reclaim_stale_request(req['id']) if stale else claim_request(req['id'])
+                    if claimed is None:
+                        st.warning("⚠️ 다른 워커/관리자가 이미 처리 중인 요청입니다.")
+                        st.stop()
+                    req['status'] = 'processing'
+                    
                     progress_bar = st.progress(0)
                     status_text = st.empty()
                     
-                    try:
-                        # 상태 업데이트: Processing
-                        status_text.text("상태 업데이트 중...")
-                        update_request_status(req['id'], "processing")
-                        progress_bar.progress(5)
+                    # 이 요청에서 기록되는 구간(다운로드, 스타일별 생성, 합성, 인코딩, 업로드, DB)에 요청 ID를 붙임
+                    with request_context(req['id']):
+                        try:
+                            progress_bar.progress(5)
                         
-                        if is_four_cut:
-                            # === 4-CUT 모드 ===
-                            status_text.text(f"4개 스타일 동시 생성 시작... (약 30-60초 소요)")
-                            
-                            # 병렬 생성
-                            results = generate_multiple_styles_sync(original_image, style_types, max_retries=3)
-                            progress_bar.progress(60)
-                            
-                            # 성공/실패 분류
-                            generated_images = []
-                            failed_styles = []
+                            # 생성에는 원본 해상도 사용 (디스크 캐시에 있으면 네트워크 없이 로드)
+                            status_text.text("원본 이미지 다운로드 중...")
+                            # (디코딩/리사이즈/인코딩은 이미지 작업 프로세스에서 실행하여 다른 세션을 멈추지 않음)
+                            image_executor = get_image_executor()
+                            original_image = image_executor.decode(download_image("input_images", req['input_image_url']))
+                        
+                            if is_four_cut:
+                                # === 4-CUT 모드 ===
+                                status_text.text(f"4개 스타일 동시 생성 시작... (약 30-60초 소요)")
                             
-                            for style in style_types:
-                                img, error = results.get(style, (None, None))
-                                if img is not None:
-                                    generated_images.append(img)
-                                    st.success(f"✅ {style} 생성 완료")
-                                else:
-                                    failed_styles.append(style)
-                                    st.error(f"❌ {style} 생성 실패: {str(error)[:100] if error else '알 수 없는 오류'}")
+                                # 병렬 생성: 완료되는 셀부터 템플릿에 배치하여 바로 표시
+                                # (저장된 셀은 재사용, 새 셀은 도착 즉시 저장 시작)
+                                live_preview = st.empty()
+                                compositor = FourCutCompositor(fit=image_executor.fit_cell)
+                                cell_results = dict(req.get('cell_results') or {})
+                                cell_images = {}
+                                cell_stream = stream_cells(
+                                    req, original_image, SupabaseBackend(), generate_styles_as_completed, cell_results, max_retries=3
+                                )
+                                for done_count, (style, img, error) in enumerate(get_generation_client().iterate(cell_stream), start=1):
+                                    if img is not None:
+                                        cell_images[style] = img
+                                        compositor.place(style_types.index(style), img)
+                                        live_preview.image(compositor.image, caption=f"생성 중... {len(cell_images)}/4", use_column_width=True)
+                                        st.success(f"✅ {style} 생성 완료")
+                                    else:
+                                        st.error(f"❌ {style} 생성 실패: {str(error)[:100] if error else '알 수 없는 오류'}")
+                                    progress_bar.progress(5 + int(60 * done_count / len(style_types)))
+                                req['cell_results'] = cell_results  # 같은 화면에서 재시도할 때도 저장된 셀 사용
                             
-                            # 성공 개수 확인
-                            if len(generated_images) != 4:
-                                st.error(f"⚠️ {len(generated_images)}/4 개만 생성 완료. 실패한 스타일: {', '.join(failed_styles)}")
-                                raise Exception(f"4개 중 {len(generated_images)}개만 생성됨")
+                                # 성공 개수 확인 (성공한 셀은 저장되어 재시도 시 재사용됨)
+                                if len(cell_images) != len(style_types):
+                                    st.error(f"⚠️ {len(cell_images)}/4 개만 생성 완료. 재시도하면 실패한 셀만 다시 생성합니다.")
+                                    raise Exception(missing_cells_message(style_types, cell_images, cell_results))
                             
-                            # 4개 모두 성공: 템플릿 생성
-                            status_text.text("4컷 템플릿 생성 중...")
-                            final_image = create_four_cut_template(generated_images)
-                            progress_bar.progress(70)
+                                # 4개 모두 성공: 셀은 이미 배치 완료
+                                final_image = compositor.image
+                                progress_bar.progress(70)
                             
-                        else:
-                            # === 기존 단일 스타일 모드 ===
-                            status_text.text(f"{req['style_type']} 스타일로 생성 중... (약 30초 소요)")
-                            generated_image = generate_styled_image(original_image, req['style_type'])
-                            progress_bar.progress(60)
+                            else:
+                                # === 기존 단일 스타일 모드 ===
+                                status_text.text(f"{req['style_type']} 스타일로 생성 중... (약 30초 소요)")
+                                generated_image = generate_styled_image(original_image, req['style_type'])
+                                progress_bar.progress(60)
                             
-                            # 이미지 후처리 (리사이징/크롭)
-                            status_text.text("인쇄용 규격으로 변환 중...")
-                            final_image = process_image_for_print(generated_image)
-                            progress_bar.progress(70)
+                                # 이미지 후처리 (리사이징/크롭)
+                                status_text.text("인쇄용 규격으로 변환 중...")
+                                final_image = image_executor.fit_print(generated_image)
+                                progress_bar.progress(70)
                         
-                        # 결과 업로드
-                        status_text.text("결과 이미지 업로드 중...")
-                        timestamp = int(time.time())
-                        output_filename = f"result_{req['id']}_{timestamp}.png"
+                            # 결과 업로드 (인쇄용 원본 + QR 다운로드용 + 썸네일 동시 업로드, DB는 한 번만 기록)
+                            # 상태는 processing 유지, "완료" 버튼을 눌러야만 completed로 변경
+                            status_text.text("결과 이미지 업로드 중...")
+                            published = publish_output(req['id'], final_image, SupabaseBackend())
+                            req['output_image_url'] = published.output_path
+                            req['download_image_url'] = published.download_path
+                            progress_bar.progress(90)
                         
-                        img_bytes = image_to_bytes(final_image)
-                        print(f"📤 output_images 버킷에 업로드 시작: {output_filename}")
-                        output_path = upload_image(img_bytes, "output_images", output_filename)
-                        progress_bar.progress(90)
+                            # 공개 URL 가져오기 (QR은 다운로드용 이미지를 가리킴)
+                            public_url = get_image_url("output_images", published.download_path)
+                            print(f"🔗 공개 URL 생성: {public_url}")
+                            progress_bar.progress(100)
                         
-                        # 공개 URL 가져오기
-                        public_url = get_image_url("output_images", output_path)
-                        print(f"🔗 공개 URL 생성: {public_url}")
+                            mode_text = "4컷 이미지" if is_four_cut else "이미지"
+                            st.success(f"✅ {mode_text} 생성이 완료되었습니다!")
                         
-                        # DB 업데이트: 파일 경로만 저장, 상태는 processing 유지
-                        status_text.text("결과 저장 중...")
-                        # 상태는 "완료" 버튼을 눌러야만 completed로 변경
-                        response = supabase.table('booth_requests').update({
-                            'output_image_url': output_path
-                        }).eq('id', req['id']).execute()
-                        progress_bar.progress(100)
-                        
-                        mode_text = "4컷 이미지" if is_four_cut else "이미지"
-                        st.success(f"✅ {mode_text} 생성이 완료되었습니다!")
-                        
-                        # 결과를 세션 상태에 저장 (URL은 공개 URL 사용)
-                        st.session_state.generated_result = {
-                            "image": final_image,
-                            "url": public_url,
-                            "req": req,
-                            "is_four_cut": is_four_cut
-                        }
-                        # 작업 완료 후에도 selected_request는 유지 (삭제 버튼으로만 제거)
-                        st.rerun()
+                            # 결과를 세션 상태에 저장 (URL은 공개 URL 사용)
+                            st.session_state.generated_result = {
+                                "image": final_image,
+                                "url": public_url,
+                                "req": req,
+                                "is_four_cut": is_four_cut,
+                                "publish_summary": published.summary(),
+                                "timeline": [
+                                    {"구간": span.name, "스타일": span.style or "", "ms": round(span.duration_ms), "성공": span.ok}
+                                    for span in get_metrics().spans(req['id'])
+                                ]
+                            }
+                            # 작업 완료 후에도 selected_request는 유지 (삭제 버튼으로만 제거)
+                            st.rerun()
                         
-                    except Exception as e:
-                        st.error(f"오류 발생: {e}")
-                        update_request_status(req['id'], "failed", error_msg=str(e))
+                        except Exception as e:
+                            st.error(f"오류 발생: {e}")
+                            update_request_status(req['id'], "failed", error_msg=str(e))
+                            req['status'] = 'failed'
+        
         
         except Exception as e:
             st.error(f"원본 이미지 로드 실패: {e}")
@@ -302,6 +492,10 @@ with col2:
         with r_col1:
             caption = "최종 결과물 (4컷 템플릿)" if is_four_cut else "최종 결과물 (4x6인치)"
             st.image(res['image'], caption=caption, use_column_width=True)
+            if res.get('preview') and st.button("🔍 원본 해상도로 보기"):
+                res['image'] = get_image_executor().decode(download_image("output_images", res['req']['output_image_url']))
+                res['preview'] = False
+                st.rerun()
             
         with r_col2:
             st.markdown("#### 📱 다운로드용 QR 코드")
@@ -310,6 +504,11 @@ with col2:
             st.image(qr_img, width=200)
             
             st.markdown(f"🔗 [이미지 직접 다운로드]({res['url']})")
+            if res.get('publish_summary'):
+                st.caption(f"⏱️ 게시 {res['publish_summary']}")
+            if res.get('timeline'):
+                with st.expander("⏱️ 단계별 소요 시간"):
+                    st.dataframe(res['timeline'], hide_index=True, use_container_width=True)
             
         # 버튼은 컬럼 밖에 배치
         col_done1, col_done2 = st.columns(2)
@@ -331,6 +530,7 @@ with col2:
             if st.button("🗑️ 요청 삭제", use_container_width=True):
                 try:
                     delete_request(res['req']['id'])
+                    queue_store.remove(res['req']['id'])
                     del st.session_state.generated_result
                     if 'selected_request' in st.session_state:
                         del st.session_state.selected_request
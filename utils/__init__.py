@@ -1 +1,6 @@
 # Utils package
+
+# 환경 변수 로드 (.env): utils 모듈은 import 시점에 환경 변수로 설정값을 읽으므로 패키지를 처음 import할 때 한 번만 로드
+from dotenv import load_dotenv
+
+load_dotenv()
@@ -0,0 +1,125 @@
+# 저장소/DB 백엔드 어댑터 (워커·파이프라인용)
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+
+class SupabaseBackend:
+    """
+    utils.supabase_client 함수들을 감싸는 기본 백엔드.
+    supabase_client는 import 시점에 접속 정보를 요구하므로 실제로 사용할 때 로드합니다.
+    """
+
+    def __init__(self):
+        from utils import supabase_client
+        self._db = supabase_client
+
+    def fetch_pending(self, limit: int = 10) -> List[dict]:
+        return self._db.get_pending_requests(limit=limit)
+
+    def claim(self, request_id: str) -> Optional[dict]:
+        return self._db.claim_request(request_id)
+
+    def download(self, bucket_name: str, file_path: str) -> bytes:
+        return self._db.download_image(bucket_name, file_path)
+
+    def upload(self, file_bytes: bytes, bucket_name: str, file_path: str, content_type: str = "image/png") -> str:
+        return self._db.upload_image(file_bytes, bucket_name, file_path, content_type=content_type)
+
+    def get_url(self, bucket_name: str, file_path: str) -> str:
+        return self._db.get_image_url(bucket_name, file_path)
+
+    def set_output(self, request_id: str, output_path: str, download_path: str = None, status: str = None):
+        return self._db.update_request_output(request_id, output_path, download_path=download_path, status=status)
+
+    def set_cell_results(self, request_id: str, cell_results: dict):
+        return self._db.update_cell_results(request_id, cell_results)
+
+    def update_status(self, request_id: str, status: str, output_url: str = None, error_msg: str = None):
+        return self._db.update_request_status(request_id, status, output_url=output_url, error_msg=error_msg)
+
+
+class LocalBackend:
+    """
+    네트워크 없이 워커를 구동하기 위한 메모리 기반 백엔드.
+    booth_requests 테이블과 Storage 버킷을 딕셔너리로 흉내냅니다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.rows: Dict[str, dict] = {}
+        self.objects: Dict[str, bytes] = {}
+        self._next_queue_number = 0
+
+    def add_request(self, input_bytes: bytes, style_types: list = None, style_type: str = None) -> dict:
+        """입력 이미지를 저장하고 pending 요청을 추가합니다 (app.py 제출 흉내)."""
+        file_path = f"{uuid.uuid4()}.png"
+        self.upload(input_bytes, "input_images", file_path)
+        with self._lock:
+            row = {
+                "id": str(uuid.uuid4()),
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "status": "pending",
+                "style_type": style_types[0] if style_types else style_type,
+                "style_types": style_types,
+                "input_image_url": file_path,
+                "output_image_url": None,
+                "download_image_url": None,
+                "error_message": None,
+                "cell_results": None,
+                "queue_number": self._next_queue_number,
+            }
+            self._next_queue_number += 1
+            self.rows[row["id"]] = row
+            return dict(row)
+
+    def fetch_pending(self, limit: int = 10) -> List[dict]:
+        with self._lock:
+            pending = [dict(r) for r in self.rows.values() if r["status"] == "pending"]
+        pending.sort(key=lambda r: r["created_at"])
+        return pending[:limit]
+
+    def claim(self, request_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self.rows.get(request_id)
+            if row is None or row["status"] not in ("pending", "failed"):
+                return None
+            row["status"] = "processing"
+            return dict(row)
+
+    def download(self, bucket_name: str, file_path: str) -> bytes:
+        with self._lock:
+            return self.objects[f"{bucket_name}/{file_path}"]
+
+    def upload(self, file_bytes: bytes, bucket_name: str, file_path: str, content_type: str = "image/png") -> str:
+        with self._lock:
+            self.objects[f"{bucket_name}/{file_path}"] = bytes(file_bytes)
+        return file_path
+
+    def get_url(self, bucket_name: str, file_path: str) -> str:
+        return f"local://{bucket_name}/{file_path}"
+
+    def set_output(self, request_id: str, output_path: str, download_path: str = None, status: str = None):
+        with self._lock:
+            self.rows[request_id]["output_image_url"] = output_path
+            self.rows[request_id]["download_image_url"] = download_path
+            if status:
+                self.rows[request_id]["status"] = status
+                self.rows[request_id]["error_message"] = None
+            return [dict(self.rows[request_id])]
+
+    def set_cell_results(self, request_id: str, cell_results: dict):
+        with self._lock:
+            self.rows[request_id]["cell_results"] = dict(cell_results)
+            return [dict(self.rows[request_id])]
+
+    def update_status(self, request_id: str, status: str, output_url: str = None, error_msg: str = None):
+        with self._lock:
+            row = self.rows[request_id]
+            row["status"] = status
+            if output_url:
+                row["output_image_url"] = output_url
+            if error_msg:
+                row["error_message"] = error_msg
+            return [dict(row)]
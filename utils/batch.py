@@ -0,0 +1,187 @@
+"""
+관리자 대시보드 일괄 처리.
+
+"다음 N건 처리"를 누르면 pending 요청을 N건까지 선점해 최대 concurrency건씩 동시에 4컷 파이프라인을 실행합니다.
+처리는 GenerationClient의 백그라운드 루프에서 진행되므로 관리자는 그동안 다른 결과를 검토/인쇄할 수 있고,
+Gemini 호출은 모든 요청이 같은 제어기(동시 호출 한도/RPM)를 공유합니다.
+"""
+import asyncio
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from utils.pipeline import GenerateStream, process_request, request_style_types
+from utils.worker import BoothWorker
+
+# 기본 일괄 처리 건수 / 동시에 처리할 요청 수
+BATCH_SIZE = int(os.getenv("BATCH_SIZE", "4"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "2"))
+
+# 작업 상태
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+@dataclass
+class BatchJob:
+    """
+    일괄 처리 중인 요청 1건의 진행 상황.
+
+    Attributes:
+        request_id: 요청 ID
+        queue_number: 대기 번호
+        cells_total: 생성할 셀 수 (단일 스타일은 1)
+        cells_done: 완료된 셀 수 (이전 시도에서 저장된 셀 포함)
+        status: running / done / failed
+        started_at: 시작 시각 (epoch 초)
+        finished_at: 종료 시각 (진행 중이면 None)
+        output_path: 결과 파일 경로 (성공 시)
+        error: 실패 메시지
+    """
+    request_id: str
+    queue_number: int
+    cells_total: int
+    cells_done: int = 0
+    status: str = JOB_RUNNING
+    started_at: float = 0.0
+    finished_at: Optional[float] = None
+    output_path: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.time()) - self.started_at
+
+
+class BatchRun(BoothWorker):
+    """
+    일괄 처리 1회. BoothWorker의 선점/실패 처리를 그대로 쓰고, 요청별 셀 진행 상황을 기록합니다.
+
+    Args:
+        backend: SupabaseBackend 또는 LocalBackend
+        generate_stream: generate_styles_as_completed 호환 생성 함수
+        count: 처리할 최대 요청 수
+        concurrency: 동시에 처리할 요청 수
+        max_retries: 스타일별 재시도 횟수
+    """
+
+    def __init__(self, backend, generate_stream: GenerateStream, count: int, concurrency: int = BATCH_CONCURRENCY, max_retries: int = 3):
+        super().__init__(backend, generate_stream, concurrency=concurrency, poll_interval=1.0,
+                         max_retries=max_retries, max_requests=count)
+        self.count = count
+        self.jobs: Dict[str, BatchJob] = {}
+        self.started_at = time.time()
+        self.finished_at = None
+        self.future = None
+
+    async def _process(self, req: dict) -> str:
+        cell_results = req.get('cell_results') or {}
+        style_types = request_style_types(req)
+        job = BatchJob(
+            request_id=req['id'],
+            queue_number=req.get('queue_number', 0),
+            cells_total=len(style_types),
+            cells_done=sum(1 for s in style_types if (cell_results.get(s) or {}).get('status') == 'completed'),
+            started_at=time.time()
+        )
+        self.jobs[req['id']] = job
+
+        async def tracked_stream(image, styles, max_retries=3):
+            async for style, img, error in self.generate_stream(image, styles, max_retries=max_retries):
+                if img is not None:
+                    job.cells_done += 1
+                yield style, img, error
+
+        try:
+            job.output_path = await process_request(req, self.backend, tracked_stream, self.max_retries)
+            job.status = JOB_DONE
+            return job.output_path
+        except Exception as e:
+            job.status = JOB_FAILED
+            job.error = str(e)
+            raise
+        finally:
+            job.finished_at = time.time()
+
+    async def run(self, stop_when_idle: bool = True):
+        try:
+            await super().run(stop_when_idle=stop_when_idle)
+        finally:
+            self.finished_at = time.time()
+
+    @property
+    def running(self) -> bool:
+        return self.finished_at is None
+
+    def job_list(self) -> List[BatchJob]:
+        """시작 순 작업 목록."""
+        return list(self.jobs.values())
+
+
+class BatchDispatcher:
+    """
+    프로세스 전역 일괄 처리 관리자 (동시에 1회만 실행, 모든 관리자 세션이 같은 진행 상황을 봄).
+    """
+
+    def __init__(self):
+        self.current: Optional[BatchRun] = None
+        self._lock = threading.Lock()
+
+    def start(
+        self,
+        count: int = BATCH_SIZE,
+        concurrency: int = BATCH_CONCURRENCY,
+        max_retries: int = 3,
+        backend=None,
+        generate_stream: GenerateStream = None
+    ) -> BatchRun:
+        """
+        다음 count건의 pending 요청 일괄 처리를 백그라운드 루프에서 시작합니다.
+
+        Args:
+            count: 처리할 최대 요청 수
+            concurrency: 동시에 처리할 요청 수
+            max_retries: 스타일별 재시도 횟수
+            backend: 기본 SupabaseBackend
+            generate_stream: 기본 generate_styles_as_completed
+
+        Returns:
+            시작한 BatchRun
+
+        Raises:
+            RuntimeError: 이미 일괄 처리가 진행 중인 경우
+        """
+        from utils.gemini_client import generate_styles_as_completed, get_generation_client
+
+        with self._lock:
+            if self.current is not None and self.current.running:
+                raise RuntimeError("이미 일괄 처리가 진행 중입니다.")
+            if backend is None:
+                from utils.backends import SupabaseBackend
+                backend = SupabaseBackend()
+            run = BatchRun(backend, generate_stream or generate_styles_as_completed, count, concurrency, max_retries)
+            run.future = asyncio.run_coroutine_threadsafe(run.run(stop_when_idle=True), get_generation_client().loop)
+            self.current = run
+        return run
+
+    def stop(self):
+        """새 요청 선점을 멈춥니다 (처리 중인 요청은 끝까지 진행)."""
+        if self.current is not None:
+            self.current.stop()
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_batch_dispatcher() -> BatchDispatcher:
+    """프로세스 전역 BatchDispatcher를 반환합니다 (최초 호출 시 생성)."""
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = BatchDispatcher()
+    return _dispatcher
@@ -0,0 +1,338 @@
+"""
+네트워크 없이 병렬 생성 경로를 부하 테스트하기 위한 가짜 Gemini.
+
+같은 동작(지연 분포, 오류율, 429 버스트, 텍스트만 오는 응답)을 두 가지 방식으로 제공합니다.
+- FakeGeminiModel: GenerationClient(model=...)에 넣는 프로세스 내 모델
+- FakeGeminiServer: generateContent REST 엔드포인트를 흉내내는 로컬 HTTP 서버
+  (SDK의 REST 전송/직렬화/오류 변환까지 실제 코드 경로를 그대로 탑니다)
+
+두 방식 모두 실제 API와 같은 JSON 응답을 만들어 SDK 응답 객체로 변환하므로
+gemini_client._call_model의 응답 파싱 코드가 그대로 실행됩니다.
+
+    python -m utils.fake_gemini --port 8765 --latency 8 --quota-rate 0.05
+    GEMINI_API_ENDPOINT=http://127.0.0.1:8765 GEMINI_API_KEY=fake streamlit run app.py
+"""
+import argparse
+import base64
+import io
+import json
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+# 응답 종류
+OUTCOME_IMAGE = "image"
+OUTCOME_TEXT = "text"      # 이미지 없이 텍스트만 반환 (200 OK)
+OUTCOME_QUOTA = "quota"    # 429 RESOURCE_EXHAUSTED
+OUTCOME_ERROR = "error"    # 500 INTERNAL
+
+_ERROR_STATUS = {
+    OUTCOME_QUOTA: (429, "RESOURCE_EXHAUSTED", "Resource has been exhausted (e.g. check quota)."),
+    OUTCOME_ERROR: (500, "INTERNAL", "An internal error has occurred."),
+}
+
+
+@dataclass
+class FakeGeminiConfig:
+    """
+    가짜 Gemini 동작 설정.
+
+    Attributes:
+        latency: 지연 중앙값(초)
+        latency_dist: "fixed", "uniform"(latency ± jitter 비율), "lognormal"(sigma=jitter, 긴 꼬리)
+        jitter: 분포 폭
+        error_rate: 500 오류 비율
+        quota_rate: 무작위 429 비율
+        text_only_rate: 이미지 없이 텍스트만 반환하는 비율
+        burst_every: 이 주기(초)마다 429 버스트 시작 (0이면 없음)
+        burst_length: 버스트 동안 모든 호출에 429 반환 (초)
+        max_concurrency: 동시 처리 상한, 넘으면 429 (0이면 제한 없음)
+        image_size: 생성 이미지 크기 (Gemini 2:3 출력 크기)
+        seed: 난수 시드 (None이면 무작위)
+    """
+    latency: float = 2.0
+    latency_dist: str = "lognormal"
+    jitter: float = 0.35
+    error_rate: float = 0.0
+    quota_rate: float = 0.0
+    text_only_rate: float = 0.0
+    burst_every: float = 0.0
+    burst_length: float = 0.0
+    max_concurrency: int = 0
+    image_size: Tuple[int, int] = (832, 1248)
+    seed: Optional[int] = None
+
+
+class FakeGemini:
+    """
+    호출마다 지연/결과를 정하고 통계를 모으는 공통 동작 (모델과 HTTP 서버가 공유).
+
+    Args:
+        config: FakeGeminiConfig
+    """
+
+    def __init__(self, config: FakeGeminiConfig = None):
+        self.config = config or FakeGeminiConfig()
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.outcomes: Dict[str, int] = {}
+        self.latencies: List[float] = []
+
+    def sample_latency(self) -> float:
+        cfg = self.config
+        with self._lock:
+            if cfg.latency_dist == "uniform":
+                value = self._rng.uniform(cfg.latency * (1 - cfg.jitter), cfg.latency * (1 + cfg.jitter))
+            elif cfg.latency_dist == "lognormal":
+                value = cfg.latency * math.exp(self._rng.gauss(0, cfg.jitter))
+            else:
+                value = cfg.latency
+        return max(0.0, value)
+
+    def _in_burst(self, now: float) -> bool:
+        cfg = self.config
+        if cfg.burst_every <= 0 or cfg.burst_length <= 0:
+            return False
+        return (now - self._started) % cfg.burst_every < cfg.burst_length
+
+    def begin(self) -> str:
+        """호출 시작: 결과 종류를 정합니다 (429는 지연 없이 즉시 반환)."""
+        cfg = self.config
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            if self._in_burst(time.monotonic()) or (cfg.max_concurrency and self.in_flight > cfg.max_concurrency):
+                return OUTCOME_QUOTA
+            roll = self._rng.random()
+        for outcome, rate in ((OUTCOME_QUOTA, cfg.quota_rate), (OUTCOME_ERROR, cfg.error_rate), (OUTCOME_TEXT, cfg.text_only_rate)):
+            if roll < rate:
+                return outcome
+            roll -= rate
+        return OUTCOME_IMAGE
+
+    def end(self, outcome: str, elapsed: float):
+        with self._lock:
+            self.in_flight -= 1
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+            self.latencies.append(elapsed)
+
+    def respond(self, prompt: str = "") -> Tuple[int, dict, str]:
+        """
+        호출 1회를 수행합니다 (지연 포함).
+
+        Returns:
+            (HTTP 상태 코드, 응답 JSON, 결과 종류)
+        """
+        start = time.monotonic()
+        outcome = self.begin()
+        try:
+            if outcome != OUTCOME_QUOTA:
+                time.sleep(self.sample_latency())
+            if outcome in _ERROR_STATUS:
+                code, status, message = _ERROR_STATUS[outcome]
+                return code, {"error": {"code": code, "message": message, "status": status}}, outcome
+            if outcome == OUTCOME_TEXT:
+                part = {"text": "I can't generate an image of that, but here is a description of the style instead."}
+            else:
+                data = fake_image_png(_style_from_prompt(prompt), self.config.image_size)
+                part = {"inlineData": {"mimeType": "image/png", "data": base64.b64encode(data).decode()}}
+            body = {
+                "candidates": [{"content": {"parts": [part], "role": "model"}, "finishReason": "STOP", "index": 0}],
+                "usageMetadata": {"promptTokenCount": 1290, "candidatesTokenCount": 1290, "totalTokenCount": 2580},
+            }
+            return 200, body, outcome
+        finally:
+            self.end(outcome, time.monotonic() - start)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "outcomes": dict(self.outcomes),
+            }
+
+
+@lru_cache(maxsize=32)
+def fake_image_png(style: str, size: Tuple[int, int]) -> bytes:
+    """스타일마다 색조가 다른 노이즈 이미지 (실제 출력과 비슷한 PNG 크기가 되도록 노이즈 포함)."""
+    rng = random.Random(style)
+    tint = Image.new("RGB", size, (rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255)))
+    noise = Image.effect_noise(size, 48).convert("RGB")
+    buf = io.BytesIO()
+    Image.blend(tint, noise, 0.3).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def _style_from_prompt(prompt: str) -> str:
+    """프롬프트 첫 스타일 문장을 색조 시드로 사용 (스타일별로 다른 이미지)."""
+    lines = [line for line in prompt.splitlines() if line.strip()]
+    return lines[1] if len(lines) > 1 else prompt
+
+
+def _prompt_text(contents) -> str:
+    for item in contents if isinstance(contents, (list, tuple)) else [contents]:
+        if isinstance(item, str):
+            return item
+    return ""
+
+
+class FakeGeminiModel:
+    """
+    genai.GenerativeModel 대신 GenerationClient(model=...)에 넣는 프로세스 내 가짜 모델.
+    요청은 SDK와 같이 Content로 변환하고(입력 이미지 인코딩 비용 포함), 실제 API와 같은 JSON을
+    SDK 응답 객체로 변환하며, 오류는 REST 전송과 같은 google.api_core 예외로 발생시킵니다.
+
+    Args:
+        fake: 공유할 FakeGemini (없으면 새로 생성)
+    """
+
+    def __init__(self, fake: FakeGemini = None):
+        self.fake = fake or FakeGemini()
+
+    def generate_content(self, contents, generation_config=None, **kwargs):
+        from google.api_core import exceptions as api_exceptions
+        import google.generativeai as genai
+        from google.generativeai import protos
+        from google.generativeai.types import content_types
+
+        content_types.to_contents(contents)
+        code, body, outcome = self.fake.respond(_prompt_text(contents))
+        if code != 200:
+            raise api_exceptions.from_http_status(code, body["error"]["message"])
+        message = protos.GenerateContentResponse.from_json(json.dumps(body), ignore_unknown_fields=True)
+        return genai.types.GenerateContentResponse.from_response(message)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    fake: FakeGemini = None
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = self.rfile.read(length) if length else b""
+        if ":generateContent" not in self.path:
+            self._send(404, {"error": {"code": 404, "message": f"Unknown path {self.path}", "status": "NOT_FOUND"}})
+            return
+        prompt = ""
+        try:
+            parts = json.loads(payload)["contents"][0]["parts"]
+            prompt = next((p["text"] for p in parts if "text" in p), "")
+        except (ValueError, KeyError, IndexError):
+            pass
+        code, body, _ = self.fake.respond(prompt)
+        self._send(code, body)
+
+    def _send(self, code: int, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeGeminiServer:
+    """
+    generateContent REST 엔드포인트를 흉내내는 로컬 HTTP 서버 (백그라운드 스레드).
+    gemini_client.configure_gemini(api_key=..., api_endpoint=server.url)로 연결합니다.
+
+    Args:
+        fake: 공유할 FakeGemini (없으면 새로 생성)
+        host: 바인딩 주소
+        port: 포트 (0이면 빈 포트 자동 선택)
+    """
+
+    def __init__(self, fake: FakeGemini = None, host: str = "127.0.0.1", port: int = 0):
+        self.fake = fake or FakeGemini()
+        handler = type("FakeGeminiHandler", (_Handler,), {"fake": self.fake})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeGeminiServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-gemini", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def add_config_arguments(parser: argparse.ArgumentParser):
+    """FakeGeminiConfig 항목을 명령행 옵션으로 추가합니다 (서버 실행/부하 스크립트 공용)."""
+    defaults = FakeGeminiConfig()
+    parser.add_argument("--latency", type=float, default=defaults.latency, help="지연 중앙값(초)")
+    parser.add_argument("--latency-dist", choices=["fixed", "uniform", "lognormal"], default=defaults.latency_dist)
+    parser.add_argument("--jitter", type=float, default=defaults.jitter)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate)
+    parser.add_argument("--quota-rate", type=float, default=defaults.quota_rate)
+    parser.add_argument("--text-only-rate", type=float, default=defaults.text_only_rate)
+    parser.add_argument("--burst-every", type=float, default=defaults.burst_every, help="429 버스트 주기(초)")
+    parser.add_argument("--burst-length", type=float, default=defaults.burst_length, help="429 버스트 길이(초)")
+    parser.add_argument("--max-concurrency", type=int, default=defaults.max_concurrency, help="넘으면 429 (0=무제한)")
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def config_from_args(args) -> FakeGeminiConfig:
+    return FakeGeminiConfig(
+        latency=args.latency,
+        latency_dist=args.latency_dist,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        quota_rate=args.quota_rate,
+        text_only_rate=args.text_only_rate,
+        burst_every=args.burst_every,
+        burst_length=args.burst_length,
+        max_concurrency=args.max_concurrency,
+        seed=args.seed,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="가짜 Gemini generateContent 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_config_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = FakeGeminiServer(FakeGemini(config_from_args(args)), args.host, args.port)
+    print(f"🧪 가짜 Gemini 서버: {server.url} (GEMINI_API_ENDPOINT={server.url})")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"📊 {server.fake.stats()}")
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,41 @@
 import os
-import google.generativeai as genai
-from dotenv import load_dotenv
-from PIL import Image
+import asyncio
+import contextvars
+import hashlib
+import io
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from PIL import Image, ImageOps
+from utils.generation_cache import get_generation_cache, make_cache_key
+from utils.image_processor import encode_image
+from utils.metrics import span
+
+# API 엔드포인트 (로컬 가짜 서버로 부하 테스트할 때: http://127.0.0.1:8765, utils/fake_gemini.py 참고)
+GEMINI_API_ENDPOINT = os.getenv("GEMINI_API_ENDPOINT", "generativelanguage.googleapis.com")
 
-# 환경 변수 로드
-load_dotenv()
+# Gemini API 설정 (SDK import와 configure는 첫 GenerationClient를 만들 때 한 번만 실행)
+_gemini_configured = False
+_gemini_configure_lock = threading.Lock()
 
-# Gemini API 설정
-def configure_gemini():
-    api_key = os.getenv("GEMINI_API_KEY")
+def configure_gemini(api_key: str = None, api_endpoint: str = None):
+    """
+    Gemini SDK를 API 키로 설정합니다.
+    
+    Args:
+        api_key: API 키 (기본: GEMINI_API_KEY 또는 Streamlit secrets)
+        api_endpoint: API 엔드포인트 (기본: GEMINI_API_ENDPOINT, 부하 테스트: 가짜 서버 주소)
+    
+    Raises:
+        ValueError: API 키가 없는 경우
+    """
+    global _gemini_configured
+    import google.generativeai as genai
+    
+    api_key = api_key or os.getenv("GEMINI_API_KEY")
     
     # Streamlit secrets에서 로드 시도
     if not api_key:
@@ -26,15 +53,24 @@ def configure_gemini():
     genai.configure(
         api_key=api_key,
         transport='rest',  # REST API 사용 강제
-        client_options={"api_endpoint": "generativelanguage.googleapis.com"}
+        client_options={"api_endpoint": api_endpoint or GEMINI_API_ENDPOINT}
     )
+    _gemini_configured = True
     return True
 
-# 초기 설정
-try:
-    configure_gemini()
-except Exception as e:
-    print(f"Gemini 설정 실패: {str(e)}")
+def ensure_gemini_configured():
+    """아직 설정하지 않았으면 configure_gemini를 한 번 실행합니다 (실패는 출력만 하고 다시 시도하지 않음)."""
+    global _gemini_configured
+    if _gemini_configured:
+        return
+    with _gemini_configure_lock:
+        if _gemini_configured:
+            return
+        try:
+            configure_gemini()
+        except Exception as e:
+            print(f"Gemini 설정 실패: {str(e)}")
+        _gemini_configured = True
 
 # 모델 설정
 MODEL_NAME = os.getenv("GEMINI_MODEL", "gemini-2.5-flash-image")
@@ -120,69 +156,446 @@ CRITICAL: Show COMPLETE FULL BODY from head to toe, no cropping of legs or feet.
 - Maintain character likeness in figure form"""
 }
 
-def generate_styled_image(input_image: Image.Image, style_type: str) -> Image.Image:
+# 이미지 편집 프롬프트 (imagen 스타일)
+EDIT_PROMPT_TEMPLATE = """Generate a new image based on this input image with the following style:
+
+{prompt}
+
+Important: Generate a complete new image, not text description."""
+
+
+# 동시 API 호출용 스레드 수 (= keep-alive 커넥션 풀 크기, 동시 호출 상한)
+GEMINI_MAX_WORKERS = int(os.getenv("GEMINI_MAX_WORKERS", "8"))
+# 시작 동시 호출 수 (스로틀링 여부에 따라 1 ~ GEMINI_MAX_WORKERS 사이에서 자동 조절)
+GEMINI_INITIAL_CONCURRENCY = int(os.getenv("GEMINI_INITIAL_CONCURRENCY", "4"))
+# 분당 요청 수 제한 (0이면 토큰 버킷 사용 안 함, 무료 티어는 15)
+GEMINI_RPM = float(os.getenv("GEMINI_RPM", "0"))
+
+# 오류 분류
+ERROR_QUOTA = "quota"          # 429 / 할당량 초과 → 동시 호출 축소 + 긴 백오프
+ERROR_TRANSIENT = "transient"  # 5xx, 타임아웃, 이미지 없는 응답 → 백오프 후 재시도
+ERROR_PERMANENT = "permanent"  # 잘못된 요청/인증 오류 → 재시도하지 않음
+
+
+def classify_error(error: Exception) -> str:
+    """Gemini 호출 오류를 할당량/일시적/영구 오류로 분류합니다."""
+    from google.api_core import exceptions as api_exceptions
+    
+    if isinstance(error, (api_exceptions.ResourceExhausted, api_exceptions.TooManyRequests)):
+        return ERROR_QUOTA
+    if isinstance(error, (
+        api_exceptions.InvalidArgument,
+        api_exceptions.PermissionDenied,
+        api_exceptions.Unauthenticated,
+        api_exceptions.NotFound,
+        api_exceptions.FailedPrecondition,
+    )):
+        return ERROR_PERMANENT
+    message = str(error).lower()
+    if "429" in message or "quota" in message or "rate limit" in message:
+        return ERROR_QUOTA
+    return ERROR_TRANSIENT
+
+
+def backoff_delay(attempt: int, kind: str, base: float = 1.0, cap: float = 30.0) -> float:
+    """지수 백오프 + full jitter. 할당량 오류는 더 긴 기본 대기 시간을 사용합니다."""
+    if kind == ERROR_QUOTA:
+        base *= 4
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class AdaptiveRateLimiter:
+    """
+    프로세스 전역 Gemini 호출 제어기 (AIMD 동시성 + 토큰 버킷).
+    성공할 때마다 동시 호출 한도를 천천히 늘리고(가산 증가),
+    할당량 오류가 나면 절반으로 줄이고 잠시 새 호출을 멈춥니다(승산 감소).
+    여러 이벤트 루프/스레드에서 호출되므로 threading 기반으로 동작합니다.
+    
+    Args:
+        max_limit: 동시 호출 상한
+        initial_limit: 시작 동시 호출 수
+        min_limit: 동시 호출 하한
+        rpm: 분당 요청 수 제한 (0이면 사용 안 함)
+        cooldown: 할당량 오류 후 새 호출을 멈추는 시간(초)
+    """
+    
+    def __init__(self, max_limit: int, initial_limit: int = None, min_limit: int = 1, rpm: float = 0, cooldown: float = 5.0):
+        self.max_limit = max(min_limit, max_limit)
+        self.min_limit = min_limit
+        self.limit = float(min(self.max_limit, initial_limit or self.max_limit))
+        self.rpm = rpm
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.waiting = 0
+        self.throttled = 0
+        self.completed = 0
+        self._cooldown_until = 0.0
+        self._tokens = 1.0
+        self._last_refill = time.monotonic()
+        self._cond = threading.Condition()
+    
+    def _refill_locked(self, now: float):
+        if self.rpm <= 0:
+            return
+        # 버스트는 현재 동시 호출 한도까지만 허용
+        capacity = max(1.0, self.limit)
+        self._tokens = min(capacity, self._tokens + (now - self._last_refill) * self.rpm / 60.0)
+        self._last_refill = now
+    
+    def _wait_time_locked(self, now: float) -> float:
+        """지금 호출할 수 있으면 0, 아니면 다시 확인할 때까지의 시간."""
+        if now < self._cooldown_until:
+            return self._cooldown_until - now
+        if self.in_flight >= int(self.limit):
+            return 1.0  # release 시 notify로 깨어남
+        if self.rpm > 0 and self._tokens < 1.0:
+            return (1.0 - self._tokens) * 60.0 / self.rpm
+        return 0.0
+    
+    def acquire(self):
+        with self._cond:
+            self.waiting += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill_locked(now)
+                    wait = self._wait_time_locked(now)
+                    if wait <= 0:
+                        break
+                    self._cond.wait(timeout=wait)
+                if self.rpm > 0:
+                    self._tokens -= 1.0
+                self.in_flight += 1
+            finally:
+                self.waiting -= 1
+    
+    def release(self, outcome: str = None):
+        """
+        호출 종료를 알립니다.
+        
+        Args:
+            outcome: None(성공) 또는 classify_error 결과
+        """
+        with self._cond:
+            self.in_flight -= 1
+            if outcome == ERROR_QUOTA:
+                self.throttled += 1
+                self.limit = max(self.min_limit, self.limit / 2)
+                self._cooldown_until = max(self._cooldown_until, time.monotonic() + self.cooldown)
+                print(f"🐢 할당량 초과 감지 → 동시 호출 한도 {int(self.limit)}로 축소")
+            elif outcome is None:
+                self.completed += 1
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+    
+    def call(self, fn, *args, **kwargs):
+        """한도 안에서 fn을 실행하고 결과에 따라 한도를 조절합니다."""
+        self.acquire()
+        outcome = None
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            outcome = classify_error(e)
+            raise
+        finally:
+            self.release(outcome)
+    
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "waiting": self.waiting,
+                "throttled": self.throttled,
+                "completed": self.completed,
+                "rpm": self.rpm,
+            }
+
+
+class GenerationClient:
+    """
+    프로세스 전역 생성 클라이언트.
+    모델 인스턴스 1개, keep-alive 커넥션 풀, 크기가 정해진 전용 스레드 풀,
+    백그라운드 이벤트 루프를 소유하며 Streamlit 재실행/세션 간에 재사용됩니다.
+    
+    Args:
+        max_workers: API 호출 스레드 수 및 커넥션 풀 크기
+        model: generate_content를 제공하는 모델 (기본: genai.GenerativeModel, 부하 테스트: FakeGeminiModel)
+        initial_concurrency: 시작 동시 호출 수
+        rpm: 분당 요청 수 제한
+    """
+    
+    def __init__(
+        self,
+        max_workers: int = GEMINI_MAX_WORKERS,
+        model=None,
+        initial_concurrency: int = GEMINI_INITIAL_CONCURRENCY,
+        rpm: float = GEMINI_RPM
+    ):
+        self.max_workers = max_workers
+        if model is None:
+            ensure_gemini_configured()
+            import google.generativeai as genai
+            self.model = genai.GenerativeModel(MODEL_NAME)
+        else:
+            self.model = model
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gemini")
+        self.limiter = AdaptiveRateLimiter(
+            max_limit=max_workers,
+            initial_limit=initial_concurrency,
+            rpm=rpm
+        )
+        self._loop = None
+        self._loop_thread = None
+        self._loop_lock = threading.Lock()
+        if model is None:
+            self._configure_connection_pool()
+    
+    def _configure_connection_pool(self):
+        """SDK 기본 REST 클라이언트의 세션 커넥션 풀을 스레드 수에 맞춥니다."""
+        try:
+            from google.generativeai import client as genai_client
+            from requests.adapters import HTTPAdapter
+            
+            rest_client = genai_client.get_default_generative_client()
+            session = rest_client._transport._session
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self.model._client = rest_client
+        except Exception as e:
+            # 내부 구조가 바뀐 SDK 버전에서도 생성 자체는 동작하도록 기본 설정 유지
+            print(f"⚠️ 커넥션 풀 설정 생략: {e}")
+    
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """백그라운드 스레드에서 계속 실행되는 이벤트 루프 (최초 사용 시 시작)."""
+        if self._loop is None:
+            with self._loop_lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    thread = threading.Thread(target=loop.run_forever, name="gemini-loop", daemon=True)
+                    thread.start()
+                    self._loop_thread = thread
+                    self._loop = loop
+        return self._loop
+    
+    def run(self, coro):
+        """코루틴을 백그라운드 루프에서 실행하고 결과를 기다립니다 (동기 코드용)."""
+        if threading.current_thread() is self._loop_thread:
+            raise RuntimeError("백그라운드 루프 안에서는 run()을 호출할 수 없습니다. await를 사용하세요.")
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+    
+    def iterate(self, async_iterable):
+        """
+        비동기 이터레이터를 백그라운드 루프에서 실행하며 항목이 나오는 즉시 동기적으로 yield합니다.
+        (Streamlit 스크립트 스레드에서 셀이 완료될 때마다 화면을 갱신하는 용도)
+        """
+        items = queue.Queue()
+        done = object()
+        
+        async def pump():
+            try:
+                async for item in async_iterable:
+                    items.put((item, None))
+            except BaseException as e:
+                items.put((done, e))
+                return
+            items.put((done, None))
+        
+        asyncio.run_coroutine_threadsafe(pump(), self.loop)
+        while True:
+            item, error = items.get()
+            if item is done:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    
+    def generate_content(self, contents):
+        """모든 API 호출은 공유 제어기(limiter)를 거칩니다."""
+        return self.limiter.call(self.model.generate_content, contents, generation_config=GENERATION_CONFIG)
+    
+    def stats(self) -> dict:
+        """현재 동시 호출 한도와 대기열 깊이 (제어기 대기 + 스레드 풀 대기)."""
+        stats = self.limiter.stats()
+        stats["queue_depth"] = stats["waiting"] + self.executor._work_queue.qsize()
+        return stats
+
+
+_generation_client = None
+_generation_client_lock = threading.Lock()
+
+
+def get_generation_client() -> GenerationClient:
+    """프로세스 전역 GenerationClient를 반환합니다 (최초 호출 시 생성)."""
+    global _generation_client
+    if _generation_client is None:
+        with _generation_client_lock:
+            if _generation_client is None:
+                _generation_client = GenerationClient()
+    return _generation_client
+
+
+def set_generation_client(client: GenerationClient) -> GenerationClient:
+    """
+    프로세스 전역 GenerationClient를 교체합니다 (부하 테스트에서 가짜 모델/설정을 주입할 때 사용).
+
+    Returns:
+        이전 클라이언트 (없으면 None)
+    """
+    global _generation_client
+    with _generation_client_lock:
+        previous, _generation_client = _generation_client, client
+    return previous
+
+
+def generation_cache_key(input_hash: str, style_type: str) -> str:
+    """입력 해시 + 스타일 + 모델/설정/프롬프트 버전으로 생성 캐시 키를 만듭니다."""
+    prompt_text = EDIT_PROMPT_TEMPLATE.format(prompt=STYLE_PROMPTS[style_type])
+    return make_cache_key(input_hash, style_type, MODEL_NAME, GENERATION_CONFIG, prompt_text)
+
+
+@dataclass
+class PreparedInput:
+    """
+    요청 1건의 모델 입력. 한 번만 회전 적용/축소/인코딩하여 모든 스타일 호출과 재시도가 같은 바이트를 보냅니다.
+    (PIL 이미지를 그대로 넘기면 SDK가 호출마다 원본 해상도의 무손실 WebP로 다시 인코딩)
+    
+    Attributes:
+        data: 인코딩된 이미지 바이트
+        mime_type: MIME 타입
+        size: 인코딩된 이미지 (width, height)
+        source_size: 원본 이미지 (width, height)
+        digest: data의 SHA-256 (생성 캐시 키의 입력 해시)
+    """
+    data: bytes
+    mime_type: str
+    size: tuple
+    source_size: tuple
+    digest: str
+    
+    @property
+    def kb(self) -> float:
+        return len(self.data) / 1024
+    
+    def part(self) -> dict:
+        """generate_content에 그대로 넘길 수 있는 blob (SDK가 다시 인코딩하지 않음)."""
+        return {"mime_type": self.mime_type, "data": self.data}
+
+
+def prepare_model_input(image) -> PreparedInput:
+    """
+    입력 이미지를 모델 입력으로 준비합니다 (EXIF 회전 적용 → 긴 변 MODEL_INPUT_MAX_EDGE로 축소 → 인코딩).
+    
+    Args:
+        image: PIL 이미지 또는 이미 준비된 PreparedInput (그대로 반환)
+    
+    Returns:
+        PreparedInput
+    """
+    if isinstance(image, PreparedInput):
+        return image
+    
+    with span("model.prepare_input", source=f"{image.width}x{image.height}") as s:
+        # decode_image를 거친 이미지는 이미 회전이 적용되어 있으므로 태그가 남은 경우에만 처리 (불필요한 복사 방지)
+        if image.getexif().get(0x0112, 1) != 1:
+            image = ImageOps.exif_transpose(image)
+        source_size = image.size
+        encoded = encode_image(image, "model")
+        size = Image.open(io.BytesIO(encoded.data)).size
+        s.update(size=f"{size[0]}x{size[1]}", kb=round(len(encoded.data) / 1024, 1))
+    return PreparedInput(
+        data=encoded.data,
+        mime_type=encoded.content_type,
+        size=size,
+        source_size=source_size,
+        digest=hashlib.sha256(encoded.data).hexdigest()
+    )
+
+
+def generate_styled_image(
+    input_image,
+    style_type: str,
+    use_cache: bool = True
+) -> Image.Image:
     """
     Gemini 2.5 Flash Image Preview를 사용하여 스타일이 적용된 이미지를 생성합니다.
+    같은 입력/스타일/프롬프트 버전의 결과가 캐시에 있으면 API를 호출하지 않습니다.
+    
+    Args:
+        input_image: 입력 이미지 (PIL 이미지 또는 prepare_model_input 결과)
+        style_type: 스타일 키 (STYLE_PROMPTS)
+        use_cache: 생성 캐시 사용 여부
     """
     if style_type not in STYLE_PROMPTS:
         raise ValueError(f"알 수 없는 스타일 유형: {style_type}")
-        
-    prompt = STYLE_PROMPTS[style_type]
     
-    try:
-        model = genai.GenerativeModel(MODEL_NAME)
-        
-        # 이미지 편집 프롬프트 (imagen 스타일)
-        edit_prompt = f"""Generate a new image based on this input image with the following style:
+    prepared = prepare_model_input(input_image)
+    cache = get_generation_cache() if use_cache else None
+    if cache:
+        key = generation_cache_key(prepared.digest, style_type)
+        with span("generate.cache", style=style_type) as s:
+            cached = cache.get(key)
+            s["hit"] = cached is not None
+        if cached is not None:
+            return cached
+    
+    img = _call_model(prepared, style_type)
+    if cache:
+        cache.put(key, img)
+    return img
 
-{prompt}
 
-Important: Generate a complete new image, not text description."""
-        
-        response = model.generate_content(
-            [edit_prompt, input_image],
-            generation_config=GENERATION_CONFIG
-        )
+def _call_model(prepared: PreparedInput, style_type: str) -> Image.Image:
+    """Gemini API를 호출하여 응답에서 이미지를 추출합니다."""
+    prompt = STYLE_PROMPTS[style_type]
+    
+    try:
+        edit_prompt = EDIT_PROMPT_TEMPLATE.format(prompt=prompt)
         
-        print(f"[이미지 생성 완료] Response has {len(response.parts) if hasattr(response, 'parts') else 0} parts")
+        with span("model.call", style=style_type, input_kb=round(prepared.kb, 1)) as s:
+            response = get_generation_client().generate_content([edit_prompt, prepared.part()])
+            s["parts"] = len(response.parts) if hasattr(response, 'parts') else 0
         
-        # 응답에 이미지가 포함되어 있는지 확인
-        if not response.parts:
-            raise ValueError("생성된 콘텐츠가 없습니다.")
+            # 응답에 이미지가 포함되어 있는지 확인
+            if not response.parts:
+                raise ValueError("생성된 콘텐츠가 없습니다.")
              
-        # 다양한 방식으로 이미지 추출 시도
+            # 다양한 방식으로 이미지 추출 시도
         
-        # 1. response.images 속성
-        if hasattr(response, 'images') and response.images:
-            print(f"[DEBUG] Found {len(response.images)} images in response.images")
-            return response.images[0]
+            # 1. response.images 속성
+            if hasattr(response, 'images') and response.images:
+                return response.images[0]
              
-        # 2. parts 내에 inline_data가 있는 경우 (바이너리 이미지 데이터)
-        for i, part in enumerate(response.parts):
-            if hasattr(part, 'inline_data') and part.inline_data and hasattr(part.inline_data, 'data'):
-                image_data = part.inline_data.data
+            # 2. parts 내에 inline_data가 있는 경우 (바이너리 이미지 데이터)
+            for i, part in enumerate(response.parts):
+                if hasattr(part, 'inline_data') and part.inline_data and hasattr(part.inline_data, 'data'):
+                    image_data = part.inline_data.data
                 
-                # 문자열이면 base64 디코딩
-                if isinstance(image_data, str):
-                    import base64
-                    image_data = base64.b64decode(image_data)
+                    # 문자열이면 base64 디코딩
+                    if isinstance(image_data, str):
+                        import base64
+                        image_data = base64.b64decode(image_data)
                 
-                # bytes인지 확인
-                if isinstance(image_data, bytes) and len(image_data) > 0:
-                    try:
-                        from io import BytesIO
-                        img = Image.open(BytesIO(image_data))
-                        print(f"✅ 이미지 생성 성공: {img.format}, {img.size}, {len(image_data)/1024:.1f}KB")
-                        return img
-                    except Exception as e:
-                        print(f"❌ 이미지 열기 실패: {e}")
-                        continue
+                    # bytes인지 확인
+                    if isinstance(image_data, bytes) and len(image_data) > 0:
+                        try:
+                            from io import BytesIO
+                            img = Image.open(BytesIO(image_data))
+                            # 지연 디코딩된 이미지를 여러 스레드(셀 저장 인코딩, 템플릿 배치)가 동시에 읽지 않도록 여기서 디코딩
+                            img.load()
+                            s.update(format=img.format, size=img.size, kb=round(len(image_data) / 1024, 1))
+                            return img
+                        except Exception as e:
+                            print(f"❌ 이미지 열기 실패: {e}")
+                            continue
         
-        # 텍스트만 반환된 경우
-        if hasattr(response, 'text'):
-            print(f"⚠️ 텍스트 응답만 받음: {response.text[:200]}")
+            # 텍스트만 반환된 경우
+            if hasattr(response, 'text'):
+                print(f"⚠️ 텍스트 응답만 받음: {response.text[:200]}")
                 
-        raise ValueError(f"응답에서 이미지를 찾을 수 없습니다. Gemini 모델이 텍스트만 반환했을 수 있습니다.")
+            raise ValueError(f"응답에서 이미지를 찾을 수 없습니다. Gemini 모델이 텍스트만 반환했을 수 있습니다.")
 
     except Exception as e:
         print(f"Gemini 생성 오류: {e}")
@@ -192,71 +605,126 @@ Important: Generate a complete new image, not text description."""
 
 
 # 4-cut 기능을 위한 병렬 생성 함수
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
-from typing import List, Dict, Tuple, Optional
+from typing import AsyncIterator, List, Dict, Tuple, Optional
 
-async def generate_multiple_styles_async(
-    input_image: Image.Image, 
+async def generate_styles_as_completed(
+    input_image: Image.Image,
     style_types: List[str],
     max_retries: int = 3
-) -> Dict[str, Tuple[Optional[Image.Image], Optional[Exception]]]:
+) -> AsyncIterator[Tuple[str, Optional[Image.Image], Optional[Exception]]]:
     """
-    여러 스타일의 이미지를 동시에 생성합니다 (asyncio + ThreadPoolExecutor 사용).
+    여러 스타일을 동시에 생성하고, 완료되는 순서대로 (style, image, error)를 yield합니다.
+    가장 느린 스타일을 기다리지 않고 먼저 끝난 셀부터 화면 표시/저장을 시작할 수 있습니다.
     
     Args:
         input_image: 입력 이미지
-        style_types: 생성할 스타일 타입 리스트 (예: ["lego", "anime", "pixel", "clay"])
+        style_types: 생성할 스타일 타입 리스트
         max_retries: 실패 시 재시도 횟수
     
-    Returns:
-        Dict[style_type, (generated_image or None, error or None)]
-        성공: {style: (Image, None)}
-        실패: {style: (None, Exception)}
+    Yields:
+        (style, generated_image or None, error or None)
     """
-    loop = asyncio.get_event_loop()
+    loop = asyncio.get_running_loop()
+    executor = get_generation_client().executor
+    
+    # 모델 입력(축소/인코딩)과 입력 해시는 요청당 한 번만 만들어 모든 스타일과 재시도가 공유
+    prepared = await asyncio.to_thread(prepare_model_input, input_image)
+    cache = get_generation_cache()
     
-    async def generate_one_with_retry(style: str) -> Tuple[str, Optional[Image.Image], Optional[Exception]]:
+    async def generate_one_timed(style: str) -> Tuple[str, Optional[Image.Image], Optional[Exception]]:
+        """스타일 1개의 전체 소요 시간(캐시 조회, 재시도, 백오프 포함)을 기록합니다."""
+        with span("generate.style", style=style) as attrs:
+            result = await generate_one_with_retry(style, attrs)
+            attrs["result"] = "completed" if result[1] is not None else "failed"
+            return result
+    
+    async def generate_one_with_retry(style: str, attrs: dict) -> Tuple[str, Optional[Image.Image], Optional[Exception]]:
         """단일 스타일 생성 (재시도 포함)"""
+        if style not in STYLE_PROMPTS:
+            return style, None, ValueError(f"알 수 없는 스타일 유형: {style}")
+        
+        key = None
+        if cache:
+            # 캐시 파일 읽기/쓰기는 스레드에서 (공유 이벤트 루프에서 하면 다른 요청의 생성이 모두 멈춤)
+            key = generation_cache_key(prepared.digest, style)
+            cached = await asyncio.to_thread(cache.get, key)
+            if cached is not None:
+                attrs["cached"] = True
+                request_attrs["cached"] += 1
+                return style, cached, None
+        
         for attempt in range(max_retries):
+            attrs["attempts"] = attempt + 1
             try:
-                print(f"🎨 [{style}] 생성 시작 (시도 {attempt + 1}/{max_retries})")
-                
-                # ThreadPoolExecutor를 사용하여 동기 함수를 비동기로 실행
-                img = await loop.run_in_executor(
-                    None,
-                    generate_styled_image,
-                    input_image,
-                    style
-                )
+                # 전용 ThreadPoolExecutor(GEMINI_MAX_WORKERS)에서 동기 함수를 비동기로 실행
+                # (스레드에서 기록되는 구간에도 요청 ID가 붙도록 현재 context를 복사해 실행)
+                with span("generate.attempt", style=style, attempt=attempt + 1):
+                    request_attrs["calls"] += 1
+                    img = await loop.run_in_executor(
+                        executor,
+                        contextvars.copy_context().run,
+                        generate_styled_image,
+                        prepared,
+                        style,
+                        False
+                    )
+                if key:
+                    await asyncio.to_thread(cache.put, key, img)
                 
-                print(f"✅ [{style}] 생성 완료")
                 return style, img, None
                 
             except Exception as e:
-                print(f"❌ [{style}] 생성 실패 (시도 {attempt + 1}/{max_retries}): {str(e)[:100]}")
-                if attempt == max_retries - 1:
-                    # 마지막 시도 실패
+                kind = classify_error(e)
+                print(f"❌ [{style}] 생성 실패 (시도 {attempt + 1}/{max_retries}, {kind}): {str(e)[:100]}")
+                if attempt == max_retries - 1 or kind == ERROR_PERMANENT:
+                    # 마지막 시도 실패 또는 재시도해도 소용없는 오류
                     return style, None, e
-                # 재시도 전 잠시 대기
-                await asyncio.sleep(1)
+                # 지수 백오프 + jitter (동시에 실패한 호출들이 같은 시각에 재시도하지 않도록)
+                await asyncio.sleep(backoff_delay(attempt, kind))
         
         return style, None, Exception("알 수 없는 오류")
     
-    # 모든 스타일 동시 생성
-    print(f"🚀 {len(style_types)}개 스타일 동시 생성 시작: {style_types}")
-    tasks = [generate_one_with_retry(style) for style in style_types]
-    results = await asyncio.gather(*tasks)
+    # 모든 스타일 동시 생성 (캐시 적중 수, 모델 호출 수는 구간 속성으로 기록)
+    with span("generate.request", styles=len(style_types), ok=0, calls=0, cached=0) as request_attrs:
+        tasks = [asyncio.ensure_future(generate_one_timed(style)) for style in style_types]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                if result[1] is not None:
+                    request_attrs["ok"] += 1
+                yield result
+        finally:
+            # 소비자가 중간에 멈추면 남은 생성 작업 취소
+            for task in tasks:
+                task.cancel()
+            # 요청 1건이 모델에 보낸 입력 크기 (재시도 포함)
+            request_attrs["upload_kb"] = round(prepared.kb * request_attrs["calls"], 1)
+
+
+async def generate_multiple_styles_async(
+    input_image: Image.Image, 
+    style_types: List[str],
+    max_retries: int = 3
+) -> Dict[str, Tuple[Optional[Image.Image], Optional[Exception]]]:
+    """
+    여러 스타일의 이미지를 동시에 생성합니다 (asyncio + ThreadPoolExecutor 사용).
+    모든 스타일이 끝날 때까지 기다렸다가 한 번에 반환합니다.
+    완료 순서대로 받으려면 generate_styles_as_completed를 사용하세요.
+    
+    Args:
+        input_image: 입력 이미지
+        style_types: 생성할 스타일 타입 리스트 (예: ["lego", "anime", "pixel", "clay"])
+        max_retries: 실패 시 재시도 횟수
     
-    # 결과를 딕셔너리로 변환
+    Returns:
+        Dict[style_type, (generated_image or None, error or None)]
+        성공: {style: (Image, None)}
+        실패: {style: (None, Exception)}
+    """
     result_dict = {}
-    for style, img, error in results:
+    async for style, img, error in generate_styles_as_completed(input_image, style_types, max_retries):
         result_dict[style] = (img, error)
     
-    # 통계 출력
-    success_count = sum(1 for img, err in result_dict.values() if img is not None)
-    print(f"📊 생성 완료: {success_count}/{len(style_types)} 성공")
-    
     return result_dict
 
 
@@ -267,6 +735,7 @@ def generate_multiple_styles_sync(
 ) -> Dict[str, Tuple[Optional[Image.Image], Optional[Exception]]]:
     """
     generate_multiple_styles_async의 동기 버전 (Streamlit에서 사용하기 쉽도록).
+    매번 새 루프를 만들지 않고 GenerationClient의 백그라운드 루프에서 실행합니다.
     
     Args:
         input_image: 입력 이미지
@@ -276,4 +745,4 @@ def generate_multiple_styles_sync(
     Returns:
         Dict[style_type, (generated_image or None, error or None)]
     """
-    return asyncio.run(generate_multiple_styles_async(input_image, style_types, max_retries))
+    return get_generation_client().run(generate_multiple_styles_async(input_image, style_types, max_retries))
@@ -0,0 +1,117 @@
+# 생성 결과 캐시 (입력 해시 + 스타일 + 프롬프트 버전 기반 content-addressed 캐시)
+import hashlib
+import io
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from PIL import Image
+
+from utils.disk_cache import DiskLRUCache
+
+GENERATION_CACHE_ENABLED = os.getenv("GENERATION_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+GENERATION_CACHE_DIR = os.getenv("GENERATION_CACHE_DIR", os.path.join(".cache", "generations"))
+GENERATION_CACHE_MAX_MB = int(os.getenv("GENERATION_CACHE_MAX_MB", "512"))
+# 설정 시 Supabase Storage 버킷에도 미러링 (여러 대의 관리자 PC/워커가 캐시 공유)
+GENERATION_CACHE_BUCKET = os.getenv("GENERATION_CACHE_BUCKET", "")
+
+
+def make_cache_key(input_hash: str, style_type: str, model_name: str, generation_config: dict, prompt_text: str) -> str:
+    """
+    캐시 키를 만듭니다. 모델, 생성 설정, 프롬프트 문구 중 하나라도 바뀌면 키가 달라지므로
+    프롬프트를 수정하면 이전 결과는 자동으로 무효화됩니다.
+    """
+    h = hashlib.sha256()
+    for part in (
+        input_hash,
+        style_type,
+        model_name,
+        json.dumps(generation_config, sort_keys=True),
+        prompt_text,
+    ):
+        h.update(part.encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class GenerationCache:
+    """
+    생성된 스타일 이미지를 로컬 디스크(LRU)에 저장하고, 선택적으로 Supabase Storage에 미러링합니다.
+
+    Args:
+        directory: 로컬 캐시 디렉터리
+        max_bytes: 로컬 캐시 최대 크기
+        mirror_bucket: 미러링할 Storage 버킷 이름 (빈 문자열이면 미러링 안 함)
+    """
+
+    def __init__(self, directory: str, max_bytes: int, mirror_bucket: str = ""):
+        self.local = DiskLRUCache(directory, max_bytes)
+        self.mirror_bucket = mirror_bucket
+        self.mirror_hits = 0
+        self._mirror_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="gen-cache-mirror") if mirror_bucket else None
+
+    def _mirror_path(self, key: str) -> str:
+        return f"generations/{key}.png"
+
+    def get(self, key: str) -> Optional[Image.Image]:
+        data = self.local.get(key)
+        if data is None and self.mirror_bucket:
+            data = self._get_from_mirror(key)
+        if data is None:
+            return None
+        img = Image.open(io.BytesIO(data))
+        img.load()
+        return img
+
+    def _get_from_mirror(self, key: str) -> Optional[bytes]:
+        try:
+            from utils.supabase_client import download_image
+            data = download_image(self.mirror_bucket, self._mirror_path(key), use_cache=False)
+        except Exception:
+            return None
+        self.mirror_hits += 1
+        self.local.put(key, data)
+        return data
+
+    def put(self, key: str, image: Image.Image):
+        buf = io.BytesIO()
+        # 캐시는 읽기 속도가 중요하므로 낮은 압축 레벨로 저장
+        image.save(buf, format='PNG', compress_level=1)
+        data = buf.getvalue()
+        self.local.put(key, data)
+        if self._mirror_executor:
+            self._mirror_executor.submit(self._put_to_mirror, key, data)
+
+    def _put_to_mirror(self, key: str, data: bytes):
+        try:
+            from utils.supabase_client import upload_image
+            upload_image(data, self.mirror_bucket, self._mirror_path(key), use_cache=False)
+        except Exception as e:
+            print(f"캐시 미러 업로드 실패: {e}")
+
+    def stats(self) -> dict:
+        stats = self.local.stats()
+        stats["mirror_hits"] = self.mirror_hits
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_generation_cache() -> Optional[GenerationCache]:
+    """프로세스 전역 생성 캐시를 반환합니다. 비활성화된 경우 None."""
+    global _cache
+    if not GENERATION_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = GenerationCache(
+                    GENERATION_CACHE_DIR,
+                    GENERATION_CACHE_MAX_MB * 1024 * 1024,
+                    GENERATION_CACHE_BUCKET
+                )
+    return _cache
@@ -0,0 +1,232 @@
+# 이미지 CPU 작업용 프로세스 풀 (디코딩/리사이즈/합성/인코딩을 Streamlit 스크립트 스레드 밖에서 실행)
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from multiprocessing import get_context, shared_memory
+from typing import List, Optional, Tuple
+
+from PIL import Image
+
+from utils import image_processor
+from utils.image_processor import EncodedImage
+from utils.metrics import span
+
+# 작업 프로세스 수 (0이면 호출한 스레드에서 바로 실행, 기본: 코어 수 - 1, 최대 4)
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", str(max(0, min(4, (os.cpu_count() or 1) - 1)))))
+
+
+@dataclass(frozen=True)
+class SharedImage:
+    """
+    공유 메모리에 올린 픽셀 데이터. 프로세스 간에는 이 이름/모드/크기만 전달하고 픽셀은 복사하지 않습니다.
+
+    Attributes:
+        name: SharedMemory 이름
+        mode: PIL 모드
+        size: (width, height)
+        nbytes: 픽셀 데이터 크기
+    """
+    name: str
+    mode: str
+    size: tuple
+    nbytes: int
+
+
+def share_image(image: Image.Image) -> Tuple[SharedImage, shared_memory.SharedMemory]:
+    """
+    이미지 픽셀을 새 공유 메모리에 씁니다. 반환된 SharedMemory는 사용이 끝나면 close()/unlink() 해야 합니다.
+    팔레트 이미지는 팔레트 없이 복원되지 않도록 RGB(투명도가 있으면 RGBA)로 바꿔 올립니다.
+    """
+    if image.mode == 'P':
+        image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+    data = image.tobytes()
+    shm = shared_memory.SharedMemory(create=True, size=max(1, len(data)))
+    shm.buf[:len(data)] = data
+    return SharedImage(shm.name, image.mode, image.size, len(data)), shm
+
+
+def open_shared(shared: SharedImage) -> Image.Image:
+    """공유 메모리의 픽셀로 이미지를 만듭니다 (공유 메모리는 닫지만 삭제하지 않음)."""
+    shm = shared_memory.SharedMemory(name=shared.name)
+    try:
+        view = shm.buf[:shared.nbytes]
+        try:
+            return Image.frombytes(shared.mode, shared.size, view)
+        finally:
+            view.release()
+    finally:
+        shm.close()
+
+
+def take_shared(shared: SharedImage) -> Image.Image:
+    """작업 프로세스가 만든 결과를 읽고 공유 메모리를 삭제합니다."""
+    try:
+        return open_shared(shared)
+    finally:
+        _unlink(shared.name)
+
+
+def _unlink(name: str):
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    shm.close()
+    shm.unlink()
+
+
+def _release(shms):
+    for shm in shms:
+        shm.close()
+        shm.unlink()
+
+
+def _share_result(image: Image.Image) -> SharedImage:
+    """작업 프로세스: 결과를 공유 메모리에 올리고 이름만 반환 (삭제는 부모 프로세스가 담당)."""
+    shared, shm = share_image(image)
+    shm.close()
+    return shared
+
+
+# ===== 작업 프로세스에서 실행되는 함수 (pickle 가능하도록 모듈 최상위에 정의) =====
+
+def _init_worker():
+    # 구간 기록/출력은 부모 프로세스에서 작업 단위로 하므로 작업 프로세스에서는 끔
+    from utils import metrics
+    metrics.METRICS_ENABLED = False
+
+
+def _decode_task(data: bytes) -> SharedImage:
+    from utils.pipeline import decode_image
+    image = decode_image(data)
+    image.load()
+    return _share_result(image)
+
+
+def _fit_cell_task(shared: SharedImage, width: int, height: int) -> SharedImage:
+    return _share_result(image_processor.fit_cell(open_shared(shared), width, height))
+
+
+def _fit_print_task(shared: SharedImage) -> SharedImage:
+    return _share_result(image_processor.process_image_for_print(open_shared(shared)))
+
+
+def _compose_task(shared_images: List[SharedImage], layout) -> SharedImage:
+    images = [open_shared(shared) for shared in shared_images]
+    return _share_result(image_processor.create_four_cut_template(images, layout))
+
+
+def _encode_task(shared: SharedImage, profile: str) -> EncodedImage:
+    return image_processor.encode_image(open_shared(shared), profile)
+
+
+class ImageExecutor:
+    """
+    Pillow CPU 작업(디코딩, LANCZOS 리사이즈, 4컷 합성, PNG/JPEG 인코딩)을 작업 프로세스에서 실행합니다.
+    픽셀은 pickle 대신 공유 메모리로 주고받고, 호출한 스레드는 결과를 기다리는 동안 GIL을 잡지 않으므로
+    동시에 접속한 관리자/키오스크 세션이 서로의 이미지 작업 때문에 멈추지 않습니다.
+    max_workers가 0이거나 풀이 비정상 종료되면 호출한 스레드에서 바로 실행합니다.
+
+    Args:
+        max_workers: 작업 프로세스 수
+    """
+
+    def __init__(self, max_workers: int = IMAGE_WORKERS):
+        self.max_workers = max_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_workers > 0
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        """작업 프로세스 풀 (최초 사용 시 시작, Streamlit 서버의 스레드와 충돌하지 않도록 spawn 사용)."""
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=get_context("spawn"),
+                        initializer=_init_worker
+                    )
+        return self._pool
+
+    def _run(self, name: str, task, args: tuple, inline, shared=()):
+        """
+        작업 프로세스에서 task(*args)를 실행합니다. 풀이 깨졌으면 다음 호출에서 새로 만들도록 비우고 inline()으로 대체합니다.
+        결과가 SharedImage이면 이미지로 읽고 공유 메모리를 삭제합니다.
+        """
+        with span(f"image_pool.{name}", workers=self.max_workers):
+            try:
+                result = self.pool.submit(task, *args).result()
+            except BrokenProcessPool as e:
+                print(f"⚠️ 이미지 작업 프로세스 오류, 현재 스레드에서 실행합니다: {e}")
+                with self._lock:
+                    self._pool = None
+                return inline()
+            finally:
+                _release(shared)
+            return take_shared(result) if isinstance(result, SharedImage) else result
+
+    def decode(self, data: bytes) -> Image.Image:
+        """이미지 바이트를 디코딩하고 EXIF 회전을 적용합니다 (pipeline.decode_image)."""
+        from utils.pipeline import decode_image
+        if not self.enabled:
+            return decode_image(data)
+        return self._run("decode", _decode_task, (data,), lambda: decode_image(data))
+
+    def fit_cell(self, image: Image.Image, width: int, height: int) -> Image.Image:
+        """셀 크기에 맞게 리사이즈/크롭합니다 (image_processor.fit_cell)."""
+        if not self.enabled:
+            return image_processor.fit_cell(image, width, height)
+        shared, shm = share_image(image)
+        inline = lambda: image_processor.fit_cell(image, width, height)
+        return self._run("fit_cell", _fit_cell_task, (shared, width, height), inline, [shm])
+
+    def fit_print(self, image: Image.Image) -> Image.Image:
+        """인쇄 크기로 리사이즈/크롭합니다 (image_processor.process_image_for_print)."""
+        if not self.enabled:
+            return image_processor.process_image_for_print(image)
+        shared, shm = share_image(image)
+        inline = lambda: image_processor.process_image_for_print(image)
+        return self._run("fit_print", _fit_print_task, (shared,), inline, [shm])
+
+    def compose(self, images: List[Image.Image], layout=None) -> Image.Image:
+        """4컷 템플릿을 합성합니다 (image_processor.create_four_cut_template)."""
+        if not self.enabled:
+            return image_processor.create_four_cut_template(images, layout)
+        pairs = [share_image(image) for image in images]
+        inline = lambda: image_processor.create_four_cut_template(images, layout)
+        return self._run("compose", _compose_task, ([shared for shared, _ in pairs], layout), inline, [shm for _, shm in pairs])
+
+    def encode(self, image: Image.Image, profile: str = "print") -> EncodedImage:
+        """프로필에 맞게 인코딩합니다 (image_processor.encode_image, 결과 바이트만 전달받음)."""
+        if not self.enabled:
+            return image_processor.encode_image(image, profile)
+        shared, shm = share_image(image)
+        inline = lambda: image_processor.encode_image(image, profile)
+        return self._run("encode", _encode_task, (shared, profile), inline, [shm])
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_image_executor() -> ImageExecutor:
+    """프로세스 전역 ImageExecutor를 반환합니다 (최초 호출 시 생성, 모든 세션이 공유)."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ImageExecutor()
+    return _executor
@@ -1,73 +1,250 @@
-from PIL import Image, ImageOps
+from PIL import Image, ImageDraw, ImageFont, ImageOps
+from dataclasses import dataclass
+from functools import lru_cache
+import hashlib
 import io
+import math
+import os
+
+from utils.metrics import span
 
 # 4x6cm @ 118dpi 상수
 TARGET_WIDTH = 472   # 4 cm * 118 dpi / 2.54 cm/inch
 TARGET_HEIGHT = 709  # 6 cm * 118 dpi / 2.54 cm/inch
 ASPECT_RATIO = TARGET_WIDTH / TARGET_HEIGHT
 
+# 업로드 정규화 설정 (긴 변 최대 픽셀 / JPEG 품질)
+INGEST_MAX_EDGE = int(os.getenv("INGEST_MAX_EDGE", "1536"))
+INGEST_QUALITY = int(os.getenv("INGEST_QUALITY", "88"))
+
+# 업로드 허용 형식과 최대 픽셀 수 (압축 폭탄 방지, 기본 50MP: 48MP 휴대폰 사진까지 허용)
+ALLOWED_FORMATS = ('JPEG', 'PNG')
+INGEST_MAX_PIXELS = int(os.getenv("INGEST_MAX_PIXELS", str(50_000_000)))
+
+# EXIF Orientation 태그 값 중 가로/세로가 바뀌는 값 (90도/270도 회전)
+_TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+
+
+class InvalidImageError(ValueError):
+    """업로드 이미지 검증 실패 (사용자에게 보여줄 메시지 포함)"""
+
+
+class ValidatedImage:
+    """
+    헤더만 읽어 검증한 업로드 이미지 핸들.
+    디코딩은 image를 처음 사용할 때 한 번만 하며(JPEG는 max_edge 크기로 축소 디코딩),
+    EXIF 회전이 적용된 결과를 미리보기와 업로드 정규화가 함께 사용합니다.
+    
+    Attributes:
+        raw: 업로드 파일 바이트
+        format: 'JPEG' 또는 'PNG'
+        size: 회전 적용 후 (width, height) - 헤더 기준
+        orientation: EXIF Orientation 값 (없으면 1)
+        icc_profile: ICC 프로파일 (없으면 None)
+    """
+
+    def __init__(self, raw: bytes, header: Image.Image, max_edge: int = INGEST_MAX_EDGE):
+        self.raw = raw
+        self.format = header.format
+        self.orientation = header.getexif().get(0x0112, 1)
+        width, height = header.size
+        self.size = (height, width) if self.orientation in _TRANSPOSED_ORIENTATIONS else (width, height)
+        self.icc_profile = header.info.get("icc_profile")
+        self.max_edge = max_edge
+        self._header = header
+        self._image = None
+
+    @property
+    def bytes_in(self) -> int:
+        return len(self.raw)
+
+    @property
+    def image(self) -> Image.Image:
+        """회전이 적용된 디코딩 이미지 (긴 변이 max_edge보다 클 수 있음, 최초 접근 시 디코딩)."""
+        if self._image is None:
+            img = self._header
+            # JPEG는 DCT 단계에서 축소 디코딩 (전체 해상도 디코딩 회피)
+            # draft는 가로/세로 모두 요청 크기 이상이 되도록 배율을 고르므로 원본 비율대로 목표 크기를 계산
+            if img.format == 'JPEG':
+                ratio = min(1.0, self.max_edge / max(img.size))
+                img.draft('RGB', (math.ceil(img.width * ratio), math.ceil(img.height * ratio)))
+            img = ImageOps.exif_transpose(img)
+            img.load()
+            self._image = img
+            self._header = None
+        return self._image
+
+
+def open_validated_image(file, max_pixels: int = INGEST_MAX_PIXELS, max_edge: int = INGEST_MAX_EDGE) -> ValidatedImage:
+    """
+    업로드 파일을 헤더만 읽어 형식, 크기, 픽셀 수 상한을 검사하고 핸들을 반환합니다.
+    픽셀 데이터는 디코딩하지 않습니다.
+    
+    Args:
+        file: 업로드 파일 객체 (read/seek 지원) 또는 bytes
+        max_pixels: 허용 최대 픽셀 수 (가로 x 세로)
+        max_edge: 디코딩 시 목표 긴 변 크기 (JPEG 축소 디코딩 기준)
+    
+    Returns:
+        ValidatedImage
+    
+    Raises:
+        InvalidImageError: 이미지가 아니거나, 허용되지 않는 형식이거나, 너무 큰 경우
+    """
+    if isinstance(file, (bytes, bytearray)):
+        raw = bytes(file)
+    else:
+        file.seek(0)
+        raw = file.read()
+
+    try:
+        header = Image.open(io.BytesIO(raw))
+    except Image.DecompressionBombError:
+        raise InvalidImageError("이미지 해상도가 너무 큽니다.")
+    except Exception:
+        raise InvalidImageError("올바르지 않은 이미지 파일입니다. JPG 또는 PNG 파일을 업로드해주세요.")
+
+    if header.format not in ALLOWED_FORMATS:
+        raise InvalidImageError("JPG 또는 PNG 파일만 업로드할 수 있습니다.")
+    width, height = header.size
+    if width <= 0 or height <= 0:
+        raise InvalidImageError("올바르지 않은 이미지 크기입니다.")
+    if width * height > max_pixels:
+        raise InvalidImageError(
+            f"이미지 해상도가 너무 큽니다. ({width}x{height}, 최대 {max_pixels // 1_000_000}MP)"
+        )
+    return ValidatedImage(raw, header, max_edge)
+
+
 def validate_image(file) -> bool:
     """
     업로드된 이미지 파일을 검증합니다.
-    형식과 크기를 확인합니다.
+    형식과 크기를 헤더만 읽어 확인합니다. (디코딩된 이미지가 필요하면 open_validated_image 사용)
     """
     try:
-        img = Image.open(file)
-        img.verify() # 이미지인지 확인
-        
-        # 파일 포인터 초기화
-        file.seek(0)
-        img = Image.open(file)
-        
-        # 형식 확인 (EXIF 처리 전에)
-        if img.format not in ['JPEG', 'PNG']:
-            return False
-        
-        # EXIF 회전 정보 자동 적용
-        img = ImageOps.exif_transpose(img)
-        if img is None:
-            return False
-            
-        # 크기 확인 (선택 사항, 예: 최소 400x400)
-        # if img.width < 400 or img.height < 400:
-        #     return False
-            
+        open_validated_image(file)
         return True
-    except Exception:
+    except InvalidImageError:
         return False
 
-def process_image_for_print(image: Image.Image) -> Image.Image:
-    """
-    이미지를 대상 인쇄 크기(472x709px)에 맞게 리사이징하고 자릅니다.
-    비율을 유지하며 중앙을 기준으로 자릅니다.
+@dataclass
+class IngestResult:
+    """정규화된 업로드 이미지"""
+    data: bytes
+    content_type: str
+    ext: str
+    size: tuple
+    bytes_in: int
+    thumbnail: "EncodedImage" = None
+
+    @property
+    def bytes_out(self) -> int:
+        return len(self.data)
+
+
+def normalize_upload(file, max_edge: int = INGEST_MAX_EDGE, quality: int = INGEST_QUALITY) -> IngestResult:
     """
-    # RGBA인 경우 RGB로 변환 (일부 형식 문제 방지)
-    if image.mode == 'RGBA':
-        image = image.convert('RGB')
-        
-    img_ratio = image.width / image.height
+    업로드된 사진을 저장 전에 정규화합니다.
+    EXIF 회전을 한 번 적용하고, 긴 변을 max_edge 이하로 줄인 뒤
+    메타데이터(EXIF/GPS 등)를 제거한 JPEG로 다시 인코딩합니다.
+    색 재현을 위해 ICC 프로파일만 유지합니다.
     
-    if img_ratio > ASPECT_RATIO:
-        # 이미지가 대상보다 넓은 경우
-        new_height = TARGET_HEIGHT
-        new_width = int(new_height * img_ratio)
-    else:
-        # 이미지가 대상보다 높은 경우
-        new_width = TARGET_WIDTH
-        new_height = int(new_width / img_ratio)
-        
-    # 리사이징
-    resized_img = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    Args:
+        file: ValidatedImage (미리보기에서 디코딩한 이미지 재사용), 업로드 파일 객체 또는 bytes
+        max_edge: 긴 변 최대 픽셀 (모델 입력에 충분한 크기)
+        quality: JPEG 품질
     
-    # 중앙 자르기 (Center Crop)
-    left = (new_width - TARGET_WIDTH) / 2
-    top = (new_height - TARGET_HEIGHT) / 2
-    right = (new_width + TARGET_WIDTH) / 2
-    bottom = (new_height + TARGET_HEIGHT) / 2
+    Returns:
+        IngestResult (인코딩된 바이트, content type, 확장자, 크기, 원본 바이트 수, 썸네일)
+    """
+    if isinstance(file, ValidatedImage):
+        handle = file
+    else:
+        handle = open_validated_image(file, max_edge=max_edge)
+    img = handle.image
+    icc_profile = handle.icc_profile
+
+    # 투명 영역은 흰 배경으로 합성 (JPEG는 알파 미지원)
+    if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+        img = img.convert('RGBA')
+        background = Image.new('RGB', img.size, 'white')
+        background.paste(img, mask=img.getchannel('A'))
+        img = background
+    elif img.mode != 'RGB':
+        img = img.convert('RGB')
+
+    if max(img.size) > max_edge:
+        if img is handle.image:
+            # 미리보기와 공유하는 이미지는 그대로 두고 복사본을 축소
+            img = img.copy()
+        img.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+
+    out = io.BytesIO()
+    save_kwargs = {"quality": quality, "optimize": True}
+    if icc_profile:
+        save_kwargs["icc_profile"] = icc_profile
+    img.save(out, format='JPEG', **save_kwargs)
+    thumbnail = encode_image(img, "thumbnail")
+
+    return IngestResult(
+        data=out.getvalue(),
+        content_type="image/jpeg",
+        ext="jpg",
+        size=img.size,
+        bytes_in=handle.bytes_in,
+        thumbnail=thumbnail
+    )
+
+# 업로드 미리보기 크기 (화면 표시용 긴 변)
+PREVIEW_MAX_EDGE = int(os.getenv("PREVIEW_MAX_EDGE", "720"))
+
+
+@dataclass
+class PreparedUpload:
+    """
+    업로드 1건에 대해 한 번만 계산해 두는 결과 (Streamlit 세션에 보관하여 재실행 시 재사용).
     
-    cropped_img = resized_img.crop((left, top, right, bottom))
+    Attributes:
+        digest: 업로드 바이트의 SHA-256
+        validated: 헤더 검증 핸들
+        preview: 화면 표시용 JPEG 바이트 (긴 변 PREVIEW_MAX_EDGE)
+        ingest: 저장용으로 정규화된 업로드 (썸네일 포함)
+    """
+    digest: str
+    validated: ValidatedImage
+    preview: bytes
+    ingest: IngestResult
+
+
+def prepare_upload(file, preview_max_edge: int = PREVIEW_MAX_EDGE) -> PreparedUpload:
+    """
+    업로드 파일을 검증하고, 축소 디코딩(JPEG draft) 1회로 미리보기와 정규화된 업로드를 함께 만듭니다.
     
-    return cropped_img
+    Raises:
+        InvalidImageError: 검증 실패
+    """
+    with span("image.prepare_upload") as s:
+        validated = open_validated_image(file)
+        digest = hashlib.sha256(validated.raw).hexdigest()
+        
+        preview_image = validated.image.copy()
+        if preview_image.mode != 'RGB':
+            preview_image = preview_image.convert('RGB')
+        preview_image.thumbnail((preview_max_edge, preview_max_edge), Image.Resampling.LANCZOS, reducing_gap=2.0)
+        buf = io.BytesIO()
+        preview_image.save(buf, format='JPEG', quality=85)
+        
+        prepared = PreparedUpload(digest, validated, buf.getvalue(), normalize_upload(validated))
+        s.update(kb_in=round(validated.bytes_in / 1024, 1), kb_out=round(prepared.ingest.bytes_out / 1024, 1))
+        return prepared
+
+def process_image_for_print(image: Image.Image) -> Image.Image:
+    """
+    이미지를 대상 인쇄 크기(472x709px)에 맞게 리사이징하고 자릅니다.
+    비율을 유지하며 중앙을 기준으로 자릅니다.
+    """
+    with span("image.fit_print"):
+        return fit_cell(image, TARGET_WIDTH, TARGET_HEIGHT)
 
 def image_to_bytes(image: Image.Image, format: str = 'PNG') -> bytes:
     """
@@ -78,66 +255,312 @@ def image_to_bytes(image: Image.Image, format: str = 'PNG') -> bytes:
     img_byte_arr.seek(0)
     return img_byte_arr.getvalue()
 
-def create_four_cut_template(images: list, layout="grid") -> Image.Image:
+
+@dataclass(frozen=True)
+class EncoderProfile:
+    """
+    출력 인코딩 설정.
+    
+    Attributes:
+        name: 프로필 이름
+        format: Pillow 저장 형식 ('PNG', 'JPEG', 'WEBP')
+        content_type: 업로드 시 사용할 MIME 타입
+        ext: 파일 확장자
+        options: image.save()에 넘길 옵션
+        max_edge: 지정 시 긴 변을 이 크기로 축소 후 인코딩 (썸네일용)
+    """
+    name: str
+    format: str
+    content_type: str
+    ext: str
+    options: tuple = ()
+    max_edge: int = None
+
+
+@dataclass
+class EncodedImage:
+    """인코딩된 이미지와 업로드 메타데이터"""
+    data: bytes
+    content_type: str
+    ext: str
+    profile: str
+
+
+# 모델 입력 크기/품질 (SDK에 PIL 이미지를 넘기면 호출마다 무손실 WebP로 다시 인코딩하므로 미리 인코딩)
+MODEL_INPUT_MAX_EDGE = int(os.getenv("MODEL_INPUT_MAX_EDGE", "1024"))
+MODEL_INPUT_QUALITY = int(os.getenv("MODEL_INPUT_QUALITY", "90"))
+
+# 인코더 프로필 (options는 image.save() 키워드 인자)
+ENCODER_PROFILES = {
+    # 기본 PNG (이전 image_to_bytes와 동일, 압축 레벨 6)
+    "png": EncoderProfile("png", "PNG", "image/png", "png"),
+    # 빠른 PNG: 무손실이지만 압축 레벨을 낮춰 인코딩 시간 단축 (인쇄 원본/셀 저장용)
+    "png_fast": EncoderProfile("png_fast", "PNG", "image/png", "png", (("compress_level", 1),)),
+    # 고화질 JPEG: 휴대폰 다운로드용 (4:4:4 샘플링으로 경계선 번짐 최소화)
+    "jpeg_hq": EncoderProfile("jpeg_hq", "JPEG", "image/jpeg", "jpg",
+                              (("quality", 90), ("subsampling", 0), ("optimize", True))),
+    # 프로그레시브 JPEG: 느린 네트워크에서 저해상도부터 먼저 표시
+    "jpeg_progressive": EncoderProfile("jpeg_progressive", "JPEG", "image/jpeg", "jpg",
+                                       (("quality", 88), ("optimize", True), ("progressive", True))),
+    # WebP: 같은 화질에서 JPEG보다 작음
+    "webp": EncoderProfile("webp", "WEBP", "image/webp", "webp", (("quality", 85), ("method", 4))),
+    # 썸네일: 대기열/검토 화면용 작은 WebP
+    "thumbnail": EncoderProfile("thumbnail", "WEBP", "image/webp", "webp",
+                                (("quality", 75), ("method", 4)), max_edge=480),
+    # 모델 입력: 요청당 한 번 인코딩하여 모든 스타일 호출이 공유 (모델이 활용하는 해상도까지만 축소)
+    "model_input": EncoderProfile("model_input", "JPEG", "image/jpeg", "jpg",
+                                  (("quality", MODEL_INPUT_QUALITY),), max_edge=MODEL_INPUT_MAX_EDGE),
+}
+
+# 산출물별 프로필 (인쇄 원본 / QR 다운로드 / 썸네일 / 셀 저장)
+ARTIFACT_PROFILES = {
+    "print": os.getenv("PRINT_ENCODER", "png_fast"),
+    "download": os.getenv("DOWNLOAD_ENCODER", "jpeg_hq"),
+    "thumbnail": os.getenv("THUMBNAIL_ENCODER", "thumbnail"),
+    "cell": os.getenv("CELL_ENCODER", "png_fast"),
+    "model": os.getenv("MODEL_INPUT_ENCODER", "model_input"),
+}
+
+
+def get_encoder_profile(name: str) -> EncoderProfile:
+    """프로필 이름 또는 산출물 이름("print", "download" 등)으로 인코더 프로필을 찾습니다."""
+    name = ARTIFACT_PROFILES.get(name, name)
+    if name not in ENCODER_PROFILES:
+        raise ValueError(f"알 수 없는 인코더 프로필: {name} (지원: {', '.join(ENCODER_PROFILES)})")
+    return ENCODER_PROFILES[name]
+
+
+def thumbnail_path(file_path: str) -> str:
     """
-    4개의 이미지를 2x2 그리드 템플릿으로 합성
-    기존 4x6 비율(472x709)을 유지하여 각 셀은 세로가 더 긴 형태
+    원본 경로에 대응하는 썸네일 경로 (같은 버킷의 thumbs/ 아래, 썸네일 프로필 확장자).
+    예: "result_abc_1700000000.png" → "thumbs/result_abc_1700000000.webp"
+    """
+    stem = os.path.splitext(file_path)[0]
+    return f"thumbs/{stem}.{get_encoder_profile('thumbnail').ext}"
+
+
+def encode_image(image: Image.Image, profile: str = "print") -> EncodedImage:
+    """
+    프로필에 맞게 이미지를 인코딩합니다.
     
     Args:
-        images: 4개의 PIL Image 객체 리스트
-        layout: "grid" (2x2) - 현재는 grid만 지원
+        image: PIL 이미지
+        profile: 프로필 이름(ENCODER_PROFILES) 또는 산출물 이름(ARTIFACT_PROFILES)
     
     Returns:
-        합성된 최종 이미지 (기존 4x6 비율 유지)
+        EncodedImage (upload_image에 content_type을 함께 넘길 것)
     """
-    if len(images) != 4:
-        raise ValueError(f"정확히 4개의 이미지가 필요합니다. (현재: {len(images)}개)")
+    encoder = get_encoder_profile(profile)
     
-    # 설정 - 기존 4x6 비율 유지 (TARGET_WIDTH=472, TARGET_HEIGHT=709)
-    cell_width = TARGET_WIDTH   # 472px
-    cell_height = TARGET_HEIGHT  # 709px
-    margin = 10  # 이미지 사이 여백
-    border = 0  # 외곽 테두리는 0으로 설정
-    
-    # 2x2 그리드 배치 - 전체 크기는 (472*2+10) x (709*2+10)
-    canvas_width = (cell_width * 2) + margin
-    canvas_height = (cell_height * 2) + margin
-    
-    # 흰색 배경 캔버스 생성
-    canvas = Image.new('RGB', (canvas_width, canvas_height), 'white')
-    
-    # 4개 위치 정의 (좌상, 우상, 좌하, 우하)
-    positions = [
-        (0, 0),  # 좌상
-        (cell_width + margin, 0),  # 우상
-        (0, cell_height + margin),  # 좌하
-        (cell_width + margin, cell_height + margin)  # 우하
-    ]
-    
-    for idx, (img, pos) in enumerate(zip(images, positions)):
-        # 이미지 리사이즈 (비율 유지하며 크롭)
-        img_ratio = img.width / img.height
-        target_ratio = cell_width / cell_height
+    with span("image.encode", profile=encoder.name) as s:
+        if encoder.max_edge and max(image.size) > encoder.max_edge:
+            image = image.copy()
+            image.thumbnail((encoder.max_edge, encoder.max_edge), Image.Resampling.LANCZOS, reducing_gap=2.0)
+        # JPEG는 알파/팔레트를 지원하지 않음
+        if encoder.format == 'JPEG' and image.mode != 'RGB':
+            image = image.convert('RGB')
         
-        if img_ratio > target_ratio:
-            # 이미지가 더 넓음 - 높이 기준으로 리사이즈
-            new_height = cell_height
-            new_width = int(new_height * img_ratio)
-        else:
-            # 이미지가 더 높음 - 너비 기준으로 리사이즈
-            new_width = cell_width
-            new_height = int(new_width / img_ratio)
-        
-        resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-        
-        # 중앙 크롭
-        left = (new_width - cell_width) / 2
-        top = (new_height - cell_height) / 2
-        right = (new_width + cell_width) / 2
-        bottom = (new_height + cell_height) / 2
-        cropped = resized.crop((left, top, right, bottom))
-        
-        # 캔버스에 붙이기
-        canvas.paste(cropped, pos)
+        buf = io.BytesIO()
+        image.save(buf, format=encoder.format, **dict(encoder.options))
+        s["kb"] = round(buf.tell() / 1024, 1)
+    return EncodedImage(buf.getvalue(), encoder.content_type, encoder.ext, encoder.name)
+
+# fit_cell의 reducing_gap: 축소 비율이 이 값의 정수배 이상이면 reduce()를 먼저 적용 (None이면 LANCZOS만 사용)
+CELL_REDUCING_GAP = 1.0
+
+
+def fit_cell(img: Image.Image, cell_width: int, cell_height: int) -> Image.Image:
+    """
+    이미지를 셀 크기에 맞게 비율 유지 리사이즈 + 중앙 크롭합니다.
+    크롭 영역(box)만 리샘플링하고, 2배 이상 축소할 때는 reduce()로 먼저 정수배 축소(박스 평균)한 뒤
+    남은 비율만 LANCZOS로 줄여 원본 해상도 전체에 LANCZOS를 적용하는 비용을 피합니다.
+    """
+    # JPEG를 아직 디코딩하지 않았다면 DCT 단계에서 축소 디코딩
+    if getattr(img, 'format', None) == 'JPEG':
+        img.draft('RGB', (cell_width, cell_height))
+    
+    # 팔레트/흑백은 LANCZOS가 적용되지 않고, 알파 채널은 최종 결과에서 버려지므로 먼저 RGB로 변환
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    
+    # 셀 비율에 맞는 원본 크롭 영역 계산 (중앙 기준)
+    img_ratio = img.width / img.height
+    target_ratio = cell_width / cell_height
+    if img_ratio > target_ratio:
+        # 이미지가 더 넓음 - 좌우를 잘라냄
+        crop_width = img.height * target_ratio
+        left = (img.width - crop_width) / 2
+        box = (left, 0, left + crop_width, img.height)
+    else:
+        # 이미지가 더 높음 - 위아래를 잘라냄
+        crop_height = img.width / target_ratio
+        top = (img.height - crop_height) / 2
+        box = (0, top, img.width, top + crop_height)
+    
+    return img.resize((cell_width, cell_height), Image.Resampling.LANCZOS, box=box, reducing_gap=CELL_REDUCING_GAP)
+
+
+@dataclass(frozen=True)
+class TemplateLayout:
+    """
+    4컷 템플릿 레이아웃 (모듈 로드 시 한 번 계산되는 고정 좌표).
+    
+    Attributes:
+        name: 레이아웃 이름
+        canvas_size: 전체 캔버스 크기 (width, height)
+        cells: 셀 영역 목록 (x, y, width, height) - 배치 순서대로
+        background: 배경색
+        footer_text: 하단 문구 (없으면 None)
+        overlay_path: 셀 위에 덮을 RGBA 프레임 PNG 경로 (없으면 None)
+    """
+    name: str
+    canvas_size: tuple
+    cells: tuple
+    background: str = 'white'
+    footer_text: str = None
+    overlay_path: str = None
+
+
+def _grid_layout(name: str, cell_width: int, cell_height: int, margin: int, padding: int = 0,
+                 footer: int = 0, **kwargs) -> TemplateLayout:
+    """2x2 그리드 레이아웃 좌표를 계산합니다."""
+    cells = tuple(
+        (padding + col * (cell_width + margin), padding + row * (cell_height + margin), cell_width, cell_height)
+        for row in range(2) for col in range(2)
+    )
+    canvas_size = (padding * 2 + cell_width * 2 + margin, padding * 2 + cell_height * 2 + margin + footer)
+    return TemplateLayout(name=name, canvas_size=canvas_size, cells=cells, **kwargs)
+
+
+def _strip_layout(name: str, cell_width: int, cell_height: int, margin: int, padding: int,
+                  footer: int, **kwargs) -> TemplateLayout:
+    """1x4 세로 스트립(클래식 인생네컷) 레이아웃 좌표를 계산합니다."""
+    cells = tuple(
+        (padding, padding + idx * (cell_height + margin), cell_width, cell_height)
+        for idx in range(4)
+    )
+    canvas_size = (padding * 2 + cell_width, padding * 2 + cell_height * 4 + margin * 3 + footer)
+    return TemplateLayout(name=name, canvas_size=canvas_size, cells=cells, **kwargs)
+
+
+# 4컷 레이아웃 정의
+LAYOUTS = {
+    # 기존 2x2 그리드: 셀 472x709 (4x6 비율), 여백 10px → 954x1428
+    "grid": _grid_layout("grid", TARGET_WIDTH, TARGET_HEIGHT, margin=10),
+    # 클래식 1x4 스트립: 셀 300x450 (2:3), 하단 브랜드 문구
+    "strip": _strip_layout("strip", 300, 450, margin=12, padding=24, footer=96,
+                           background='black', footer_text="COM-ART AI PHOTO BOOTH"),
+    # 브랜드 프레임: 2x2 그리드 + 테두리/하단 문구 + 선택적 오버레이(FRAME_OVERLAY_PATH)
+    "branded": _grid_layout("branded", TARGET_WIDTH, TARGET_HEIGHT, margin=16, padding=32, footer=120,
+                            background='#FF4B4B', footer_text="COM-ART AI PHOTO BOOTH",
+                            overlay_path=os.getenv("FRAME_OVERLAY_PATH") or None),
+}
+DEFAULT_LAYOUT = os.getenv("FOUR_CUT_LAYOUT", "grid")
+
+
+def get_layout(layout) -> TemplateLayout:
+    """레이아웃 이름 또는 TemplateLayout을 받아 TemplateLayout을 반환합니다."""
+    if isinstance(layout, TemplateLayout):
+        return layout
+    if layout not in LAYOUTS:
+        raise ValueError(f"알 수 없는 레이아웃: {layout} (지원: {', '.join(LAYOUTS)})")
+    return LAYOUTS[layout]
+
+
+@lru_cache(maxsize=16)
+def render_frame_background(layout: TemplateLayout) -> Image.Image:
+    """
+    레이아웃의 빈 프레임(배경, 빈 셀 자리, 하단 문구)을 렌더링합니다.
+    레이아웃별로 한 번만 그리고 캐시하며, 합성 시에는 copy()만 사용합니다.
+    """
+    canvas = Image.new('RGB', layout.canvas_size, layout.background)
+    placeholder_color = (230, 230, 230)
+    for x, y, w, h in layout.cells:
+        canvas.paste(placeholder_color, (x, y, x + w, y + h))
     
+    if layout.footer_text:
+        draw = ImageDraw.Draw(canvas)
+        footer_top = max(y + h for x, y, w, h in layout.cells)
+        footer_height = layout.canvas_size[1] - footer_top
+        font = ImageFont.load_default(size=max(12, footer_height // 4))
+        text_color = 'white' if layout.background != 'white' else 'black'
+        draw.text(
+            (layout.canvas_size[0] / 2, footer_top + footer_height / 2),
+            layout.footer_text, fill=text_color, font=font, anchor='mm'
+        )
     return canvas
+
+
+@lru_cache(maxsize=16)
+def load_frame_overlay(path: str, size: tuple) -> Image.Image:
+    """오버레이 PNG를 캔버스 크기에 맞춰 한 번만 로드/리사이즈하여 캐시합니다."""
+    overlay = Image.open(path).convert('RGBA')
+    if overlay.size != size:
+        overlay = overlay.resize(size, Image.Resampling.LANCZOS)
+    return overlay
+
+
+class FourCutCompositor:
+    """
+    4컷 템플릿을 셀 단위로 채워 나가는 합성기.
+    셀이 생성되는 즉시 place()로 배치할 수 있어 마지막 셀이 도착했을 때
+    남은 작업은 그 셀 하나의 리사이즈뿐입니다. 빈 셀은 회색으로 표시됩니다.
+    
+    Args:
+        layout: 레이아웃 이름("grid", "strip", "branded") 또는 TemplateLayout
+        fit: 셀 리사이즈 함수 (기본 fit_cell, 프로세스 풀에서 실행하려면 ImageExecutor.fit_cell)
+    """
+    
+    CELL_COUNT = 4
+    
+    def __init__(self, layout=None, fit=None):
+        self.layout = get_layout(layout or DEFAULT_LAYOUT)
+        self.canvas = render_frame_background(self.layout).copy()
+        self.fit = fit or fit_cell
+        self.filled = set()
+    
+    def place(self, index: int, img: Image.Image):
+        """index(0~3) 위치에 이미지를 맞춰 배치합니다."""
+        if not 0 <= index < self.CELL_COUNT:
+            raise ValueError(f"셀 위치는 0~{self.CELL_COUNT - 1} 사이여야 합니다. (현재: {index})")
+        x, y, w, h = self.layout.cells[index]
+        with span("image.place_cell", cell=index):
+            self.canvas.paste(self.fit(img, w, h), (x, y))
+        self.filled.add(index)
+    
+    @property
+    def is_complete(self) -> bool:
+        return len(self.filled) == self.CELL_COUNT
+    
+    @property
+    def image(self) -> Image.Image:
+        """현재까지 합성된 이미지 (오버레이가 있으면 맨 위에 적용)."""
+        if not self.layout.overlay_path:
+            return self.canvas
+        overlay = load_frame_overlay(self.layout.overlay_path, self.layout.canvas_size)
+        framed = self.canvas.copy()
+        framed.paste(overlay, (0, 0), overlay)
+        return framed
+
+
+def create_four_cut_template(images: list, layout=None) -> Image.Image:
+    """
+    4개의 이미지를 4컷 템플릿으로 합성
+    
+    Args:
+        images: 4개의 PIL Image 객체 리스트 (배치 순서대로)
+        layout: "grid"(2x2, 기본), "strip"(1x4), "branded"(프레임) 또는 TemplateLayout
+                생략 시 FOUR_CUT_LAYOUT 환경 변수(기본 grid)
+    
+    Returns:
+        합성된 최종 이미지
+    """
+    if len(images) != 4:
+        raise ValueError(f"정확히 4개의 이미지가 필요합니다. (현재: {len(images)}개)")
+    
+    with span("image.compose"):
+        compositor = FourCutCompositor(layout)
+        for idx, img in enumerate(images):
+            compositor.place(idx, img)
+        
+        return compositor.image
@@ -0,0 +1,249 @@
+# 단계별 소요 시간 계측 (요청별 구간 기록 + 단계/스타일별 지연 히스토그램 + JSONL/Prometheus 내보내기)
+import asyncio
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+# 구간이 끝날 때마다 한 줄씩 출력 (기존 print 진단 대체)
+METRICS_LOG = os.getenv("METRICS_LOG", "true").lower() in ("1", "true", "yes")
+# 지정하면 끝난 구간을 JSONL 파일에 계속 추가 기록 (오프라인 분석용)
+METRICS_JSONL_PATH = os.getenv("METRICS_JSONL_PATH", "")
+# 메모리에 보관할 최근 구간 수
+METRICS_MAX_SPANS = int(os.getenv("METRICS_MAX_SPANS", "5000"))
+
+# 히스토그램 버킷 상한(초): 수십 ms 단위 인코딩부터 분 단위 생성까지
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+# 백분위수 계산에 쓰는 단계/스타일별 최근 측정값 수
+_RECENT_SAMPLES = 512
+
+# 현재 처리 중인 요청 ID (asyncio 태스크/백그라운드 루프로 전파, 스레드 풀은 copy_context로 전달)
+_request_id: contextvars.ContextVar = contextvars.ContextVar("metrics_request_id", default=None)
+
+
+@dataclass
+class Span:
+    """
+    끝난 구간 1개.
+
+    Attributes:
+        name: 단계 이름 (예: "storage.upload", "model.call", "image.compose")
+        duration_ms: 소요 시간
+        request_id: 요청 ID (request_context 안에서 기록된 경우)
+        style: 스타일 키 (스타일별 단계)
+        ok: 예외 없이 끝났는지
+        error: 실패 시 예외 요약
+        started_at: 시작 시각 (epoch 초)
+        attrs: 추가 정보 (bytes, profile, attempt 등)
+    """
+    name: str
+    duration_ms: float
+    request_id: Optional[str] = None
+    style: Optional[str] = None
+    ok: bool = True
+    error: Optional[str] = None
+    started_at: float = 0.0
+    attrs: Dict[str, object] = field(default_factory=dict)
+
+
+class Histogram:
+    """누적 버킷(Prometheus 내보내기용) + 최근 측정값(백분위수용)."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.errors = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=_RECENT_SAMPLES)
+
+    def observe(self, seconds: float, ok: bool = True):
+        self.count += 1
+        self.sum += seconds
+        if not ok:
+            self.errors += 1
+        self.recent.append(seconds)
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+
+    def quantile(self, q: float) -> float:
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class MetricsRegistry:
+    """
+    프로세스 전역 계측 저장소. 최근 구간(요청별 타임라인)과 (단계, 스타일)별 히스토그램을 보관합니다.
+
+    Args:
+        max_spans: 보관할 최근 구간 수
+        jsonl_path: 지정 시 끝난 구간을 이 파일에 추가 기록
+        log: 구간 종료 시 한 줄 출력 여부
+    """
+
+    def __init__(self, max_spans: int = METRICS_MAX_SPANS, jsonl_path: str = METRICS_JSONL_PATH, log: bool = METRICS_LOG):
+        self.jsonl_path = jsonl_path
+        self.log = log
+        self._spans = deque(maxlen=max_spans)
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, span: Span):
+        with self._lock:
+            self._spans.append(span)
+            key = (span.name, span.style or "")
+            if key not in self._histograms:
+                self._histograms[key] = Histogram()
+            self._histograms[key].observe(span.duration_ms / 1000, span.ok)
+            if self.jsonl_path:
+                try:
+                    with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(asdict(span), ensure_ascii=False, default=str) + "\n")
+                except OSError as e:
+                    print(f"계측 기록 실패: {e}")
+        if self.log:
+            request = f"#{span.request_id[:8]} " if span.request_id else ""
+            style = f"[{span.style}] " if span.style else ""
+            attrs = " ".join(f"{k}={v}" for k, v in span.attrs.items())
+            mark = "⏱️" if span.ok else "❌"
+            print(f"{mark} {request}{style}{span.name} {span.duration_ms:.0f}ms {attrs}{' ' + span.error if span.error else ''}".rstrip())
+
+    def spans(self, request_id: str = None) -> List[Span]:
+        """최근 구간 목록 (request_id를 주면 해당 요청의 구간만, 시작 순)."""
+        with self._lock:
+            spans = [s for s in self._spans if request_id is None or s.request_id == request_id]
+        return sorted(spans, key=lambda s: s.started_at)
+
+    def summary(self) -> List[dict]:
+        """(단계, 스타일)별 호출 수, 실패 수, p50/p95/p99, 평균 (대시보드 표시용)."""
+        with self._lock:
+            rows = [
+                {
+                    "stage": name,
+                    "style": style,
+                    "count": h.count,
+                    "errors": h.errors,
+                    "p50_ms": round(h.quantile(0.50) * 1000, 1),
+                    "p95_ms": round(h.quantile(0.95) * 1000, 1),
+                    "p99_ms": round(h.quantile(0.99) * 1000, 1),
+                    "mean_ms": round(h.sum / h.count * 1000, 1) if h.count else 0.0,
+                }
+                for (name, style), h in self._histograms.items()
+            ]
+        return sorted(rows, key=lambda r: (r["stage"], r["style"]))
+
+    def to_jsonl(self, request_id: str = None) -> str:
+        """보관 중인 구간을 JSONL 문자열로 내보냅니다."""
+        return "".join(json.dumps(asdict(s), ensure_ascii=False, default=str) + "\n" for s in self.spans(request_id))
+
+    def to_prometheus(self) -> str:
+        """히스토그램을 Prometheus 텍스트 형식으로 내보냅니다."""
+        lines = [
+            "# HELP booth_stage_duration_seconds Stage latency by stage and style.",
+            "# TYPE booth_stage_duration_seconds histogram",
+        ]
+        errors = [
+            "# HELP booth_stage_errors_total Failed stage executions by stage and style.",
+            "# TYPE booth_stage_errors_total counter",
+        ]
+        with self._lock:
+            for (name, style), h in sorted(self._histograms.items()):
+                labels = f'stage="{_escape(name)}",style="{_escape(style)}"'
+                cumulative = 0
+                for bound, count in zip(h.buckets, h.counts):
+                    cumulative += count
+                    lines.append(f'booth_stage_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'booth_stage_duration_seconds_bucket{{{labels},le="+Inf"}} {h.count}')
+                lines.append(f"booth_stage_duration_seconds_sum{{{labels}}} {h.sum:.6f}")
+                lines.append(f"booth_stage_duration_seconds_count{{{labels}}} {h.count}")
+                errors.append(f"booth_stage_errors_total{{{labels}}} {h.errors}")
+        return "\n".join(lines + errors) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._spans.clear()
+            self._histograms.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """프로세스 전역 MetricsRegistry를 반환합니다 (최초 호출 시 생성)."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = MetricsRegistry()
+    return _registry
+
+
+@contextmanager
+def request_context(request_id: str):
+    """이 블록 안에서 기록되는 구간에 요청 ID를 붙입니다."""
+    token = _request_id.set(request_id)
+    try:
+        yield
+    finally:
+        _request_id.reset(token)
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+@contextmanager
+def span(name: str, style: str = None, **attrs):
+    """
+    구간 소요 시간을 기록합니다. 블록 안에서 yield된 dict에 값을 넣으면 attrs로 함께 기록됩니다.
+
+        with span("storage.upload", bucket=bucket_name, bytes=len(data)) as s:
+            ...
+            s["cached"] = True
+
+    Args:
+        name: 단계 이름
+        style: 스타일 키 (스타일별 히스토그램)
+        **attrs: 추가 정보
+    """
+    if not METRICS_ENABLED:
+        yield attrs
+        return
+    started_at = time.time()
+    start = time.perf_counter()
+    ok, error = True, None
+    try:
+        yield attrs
+    except (GeneratorExit, asyncio.CancelledError):
+        # 소비자가 중간에 멈추거나(aclose) 작업이 취소된 경우는 실패가 아님 (실패 수/에러 카운터에 포함하지 않음)
+        attrs["cancelled"] = True
+        raise
+    except BaseException as e:
+        ok, error = False, f"{type(e).__name__}: {str(e)[:200]}"
+        raise
+    finally:
+        get_metrics().record(Span(
+            name=name,
+            duration_ms=(time.perf_counter() - start) * 1000,
+            request_id=_request_id.get(),
+            style=style,
+            ok=ok,
+            error=error,
+            started_at=started_at,
+            attrs=attrs,
+        ))
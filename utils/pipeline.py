@@ -0,0 +1,230 @@
+# 요청 1건을 처리하는 생성 파이프라인 (다운로드 → 생성 → 합성 → 업로드)
+import asyncio
+import io
+import time
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from PIL import Image, ImageOps
+
+from utils.image_processor import FourCutCompositor, get_encoder_profile
+from utils.image_executor import get_image_executor
+from utils.publisher import publish_output
+from utils.metrics import request_context, span
+
+# generate_styles_as_completed와 같은 시그니처의 생성 함수 (완료 순서대로 (style, image, error) yield)
+GenerateStream = Callable[..., AsyncIterator[Tuple[str, Optional[Image.Image], Optional[Exception]]]]
+
+
+def is_four_cut_request(req: dict) -> bool:
+    """style_types 배열이 있으면 4-cut 요청입니다."""
+    return req.get('style_types') is not None and isinstance(req['style_types'], list)
+
+
+def decode_image(data: bytes) -> Image.Image:
+    """바이트를 PIL 이미지로 열고 EXIF 회전 정보를 적용합니다."""
+    image = Image.open(io.BytesIO(data))
+    return ImageOps.exif_transpose(image) if image else image
+
+
+# 셀(스타일별 생성 이미지) 저장 위치
+CELL_BUCKET = "output_images"
+
+
+def cell_path(request_id: str, index: int, style: str) -> str:
+    """셀 이미지 저장 경로 (요청 ID/순서/스타일 기준, 재생성 시 덮어쓰지 않도록 시각 포함, 확장자는 cell 인코더 프로필)"""
+    return f"cells/{request_id}/{index}_{style}_{int(time.time())}.{get_encoder_profile('cell').ext}"
+
+
+def request_style_types(req: dict) -> List[str]:
+    """요청의 스타일 목록 (단일 스타일 요청은 1개짜리 목록)."""
+    return req['style_types'] if is_four_cut_request(req) else [req['style_type']]
+
+
+async def stream_cells(
+    req: dict,
+    original_image: Image.Image,
+    backend,
+    generate_stream: GenerateStream,
+    cell_results: dict,
+    max_retries: int = 3
+) -> AsyncIterator[Tuple[str, Optional[Image.Image], Optional[Exception]]]:
+    """
+    요청의 셀을 준비되는 순서대로 (style, image, error)로 yield합니다.
+    이전 시도에서 저장된 셀은 다시 불러오고(생성과 동시에 진행), 누락/실패한 셀만 생성합니다.
+    새로 생성된 셀은 도착 즉시 인코딩/업로드를 시작하여 다음 재시도에서 재사용할 수 있게 합니다.
+    셀 상태는 cell_results(호출자가 넘긴 dict)에 반영되고, 끝나면 booth_requests.cell_results에 한 번에 기록됩니다.
+    
+    cell_results 예: {"lego": {"status": "completed", "path": "cells/..."}, "anime": {"status": "failed", "error": "..."}}
+    """
+    style_types = request_style_types(req)
+    events: asyncio.Queue = asyncio.Queue()
+    producers = []
+    producer_errors = []
+    uploads = []
+    active = 0
+    generated_any = False
+
+    async def run_producer(coro):
+        try:
+            await coro
+        except Exception as e:
+            producer_errors.append(e)
+        finally:
+            await events.put(None)
+
+    def start(coro):
+        nonlocal active
+        active += 1
+        producers.append(asyncio.ensure_future(run_producer(coro)))
+
+    async def run_generation(styles: List[str]):
+        async for style, img, error in generate_stream(original_image, styles, max_retries=max_retries):
+            await events.put((style, img, error, False))
+
+    async def load_saved(style: str, path: str):
+        try:
+            data = await asyncio.to_thread(backend.download, CELL_BUCKET, path)
+            img = await asyncio.to_thread(get_image_executor().decode, data)
+            print(f"♻️ [{style}] 저장된 셀 재사용")
+            await events.put((style, img, None, True))
+        except Exception as e:
+            print(f"⚠️ [{style}] 저장된 셀 로드 실패, 다시 생성합니다: {e}")
+            start(run_generation([style]))
+
+    async def store_cell(style: str, img: Image.Image):
+        path = cell_path(req['id'], style_types.index(style), style)
+        try:
+            encoded = await asyncio.to_thread(get_image_executor().encode, img, "cell")
+            await asyncio.to_thread(backend.upload, encoded.data, CELL_BUCKET, path, encoded.content_type)
+            cell_results[style] = {"status": "completed", "path": path}
+        except Exception as e:
+            # 저장 실패해도 이번 합성에는 사용 (다음 재시도 때만 다시 생성됨)
+            print(f"⚠️ [{style}] 셀 저장 실패: {e}")
+            cell_results[style] = {"status": "generated", "error": f"저장 실패: {str(e)[:150]}"}
+
+    # 1. 저장된 셀 로드와 누락 셀 생성을 동시에 시작
+    missing = []
+    for style in style_types:
+        cell = cell_results.get(style) or {}
+        if cell.get('status') == 'completed' and cell.get('path'):
+            start(load_saved(style, cell['path']))
+        else:
+            missing.append(style)
+    if missing:
+        print(f"🎯 생성할 셀 {len(missing)}/{len(style_types)}개: {missing}")
+        start(run_generation(missing))
+
+    # 2. 도착 순서대로 전달, 새 셀은 즉시 저장 시작
+    try:
+        while active:
+            event = await events.get()
+            if event is None:
+                active -= 1
+                continue
+            style, img, error, reused = event
+            if not reused:
+                generated_any = True
+                if img is None:
+                    cell_results[style] = {"status": "failed", "error": str(error)[:200] if error else "알 수 없는 오류"}
+                else:
+                    uploads.append(asyncio.ensure_future(store_cell(style, img)))
+            yield style, img, error
+    finally:
+        for task in producers:
+            task.cancel()
+
+    if producer_errors:
+        raise producer_errors[0]
+
+    # 3. 셀 업로드 완료 후 상태 한 번에 기록
+    await asyncio.gather(*uploads)
+    if generated_any:
+        try:
+            await asyncio.to_thread(backend.set_cell_results, req['id'], cell_results)
+        except Exception as e:
+            print(f"셀 상태 기록 오류: {e}")
+
+
+async def generate_cells(
+    req: dict,
+    original_image: Image.Image,
+    backend,
+    generate_stream: GenerateStream,
+    max_retries: int = 3
+) -> Tuple[Dict[str, Image.Image], dict]:
+    """
+    stream_cells를 끝까지 소비하여 모든 셀을 모읍니다.
+    
+    Returns:
+        (스타일별 이미지, cell_results)
+    """
+    cell_results = dict(req.get('cell_results') or {})
+    images: Dict[str, Image.Image] = {}
+    async for style, img, error in stream_cells(req, original_image, backend, generate_stream, cell_results, max_retries):
+        if img is not None:
+            images[style] = img
+    return images, cell_results
+
+
+def missing_cells_message(style_types: List[str], images: Dict[str, Image.Image], cell_results: dict) -> str:
+    """실패한 셀 목록을 사람이 읽을 수 있는 메시지로 만듭니다."""
+    failed = [
+        f"{style}({(cell_results.get(style) or {}).get('error', '알 수 없는 오류')[:100]})"
+        for style in style_types if style not in images
+    ]
+    return f"{len(style_types)}개 중 {len(style_types) - len(failed)}개만 생성됨: {', '.join(failed)}"
+
+
+async def process_request(
+    req: dict,
+    backend,
+    generate_stream: GenerateStream,
+    max_retries: int = 3
+) -> str:
+    """
+    요청 1건을 끝까지 처리하고 결과 파일 경로를 저장합니다.
+    상태는 processing으로 남겨 관리자가 검토 후 완료 처리하도록 합니다.
+    4컷은 셀이 도착할 때마다 템플릿에 배치하므로 마지막 셀 이후 남는 합성 작업이 최소화됩니다.
+
+    Args:
+        req: booth_requests 레코드 (이미 선점된 상태)
+        backend: SupabaseBackend 또는 LocalBackend
+        generate_stream: generate_styles_as_completed 호환 생성 함수
+        max_retries: 스타일별 재시도 횟수
+
+    Returns:
+        output_images 버킷에 저장된 결과 파일 경로
+    """
+    is_four_cut = is_four_cut_request(req)
+    style_types = request_style_types(req)
+
+    # 이 요청에서 기록되는 모든 구간(다운로드, 스타일별 생성, 합성, 인코딩, 업로드, DB)에 요청 ID를 붙임
+    with request_context(req['id']), span("request.process", styles=len(style_types)):
+        # 1. 원본 다운로드 및 디코딩
+        img_data = await asyncio.to_thread(backend.download, "input_images", req['input_image_url'])
+        image_executor = get_image_executor()
+        original_image = await asyncio.to_thread(image_executor.decode, img_data)
+
+        # 2. 셀 생성 (저장된 셀 재사용, 누락분만 생성) + 도착 즉시 템플릿에 배치
+        compositor = FourCutCompositor(fit=image_executor.fit_cell) if is_four_cut else None
+        cell_results = dict(req.get('cell_results') or {})
+        images: Dict[str, Image.Image] = {}
+        async for style, img, error in stream_cells(req, original_image, backend, generate_stream, cell_results, max_retries):
+            if img is None:
+                continue
+            images[style] = img
+            if compositor:
+                await asyncio.to_thread(compositor.place, style_types.index(style), img)
+
+        if len(images) != len(style_types):
+            raise Exception(missing_cells_message(style_types, images, cell_results))
+
+        # 3. 최종 이미지 (CPU 작업은 이미지 작업 프로세스에서, 이벤트 루프는 스레드에서 결과만 기다림)
+        if compositor:
+            final_image = compositor.image
+        else:
+            final_image = await asyncio.to_thread(image_executor.fit_print, images[style_types[0]])
+
+        # 4. 원본/다운로드용/썸네일 동시 인코딩·업로드 후 경로와 상태를 한 번에 저장
+        published = await asyncio.to_thread(publish_output, req['id'], final_image, backend)
+        return published.output_path
@@ -0,0 +1,116 @@
+# 결과 게시 파이프라인 (변형별 인코딩/업로드 동시 진행 → DB 한 번 기록)
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict
+
+from PIL import Image
+
+from utils.image_executor import get_image_executor
+from utils.image_processor import get_encoder_profile, thumbnail_path
+from utils.metrics import span
+
+# 변형(원본/다운로드/썸네일)별 인코딩+업로드를 동시에 실행할 스레드 수
+PUBLISH_WORKERS = int(os.getenv("PUBLISH_WORKERS", "6"))
+OUTPUT_BUCKET = "output_images"
+
+
+@dataclass
+class PublishResult:
+    """
+    게시 결과.
+
+    Attributes:
+        output_path: 인쇄용 원본 경로 (output_image_url)
+        download_path: QR 다운로드용 경로 (download_image_url)
+        thumbnail_path: 썸네일 경로
+        timings: 단계별 소요 시간 (ms), 예: {"print.encode": 120, "print.upload": 800, "db": 90, "total": 950}
+    """
+    output_path: str
+    download_path: str
+    thumbnail_path: str
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        return " | ".join(f"{stage} {ms:.0f}ms" for stage, ms in self.timings.items())
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_publish_executor() -> ThreadPoolExecutor:
+    """프로세스 전역 게시용 스레드 풀을 반환합니다."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=PUBLISH_WORKERS, thread_name_prefix="publish")
+    return _executor
+
+
+def output_paths(request_id: str, timestamp: int = None) -> Dict[str, str]:
+    """
+    변형별 저장 경로를 미리 정합니다 (업로드 전에 모두 알 수 있어야 동시에 올릴 수 있음).
+    썸네일은 원본 경로에서 정해지는 thumbs/ 경로를 사용합니다.
+    """
+    timestamp = timestamp or int(time.time())
+    print_path = f"result_{request_id}_{timestamp}.{get_encoder_profile('print').ext}"
+    return {
+        "print": print_path,
+        "download": f"result_{request_id}_{timestamp}_download.{get_encoder_profile('download').ext}",
+        "thumbnail": thumbnail_path(print_path),
+    }
+
+
+def publish_output(request_id: str, final_image: Image.Image, backend, status: str = "processing") -> PublishResult:
+    """
+    최종 이미지를 인쇄용 원본(print), QR 다운로드용(download), 썸네일(thumbnail)로 인코딩하여 업로드하고
+    경로와 상태를 update 한 번으로 저장합니다. 변형마다 인코딩→업로드를 별도 스레드에서 동시에 실행하므로
+    전체 소요 시간은 가장 느린 변형 하나의 인코딩+업로드 시간에 가깝습니다.
+
+    Args:
+        request_id: 요청 ID
+        final_image: 합성이 끝난 최종 이미지
+        backend: SupabaseBackend 또는 LocalBackend
+        status: 경로 저장과 함께 기록할 상태 (검토 대기이므로 기본 processing)
+
+    Returns:
+        PublishResult (경로 및 단계별 소요 시간)
+    """
+    started = time.perf_counter()
+    timings: Dict[str, float] = {}
+    paths = output_paths(request_id)
+    # 여러 스레드가 같은 이미지를 읽으므로 픽셀 데이터를 미리 로드
+    final_image.load()
+
+    def publish_variant(artifact: str):
+        t0 = time.perf_counter()
+        encoded = get_image_executor().encode(final_image, artifact)
+        t1 = time.perf_counter()
+        with span("publish.upload", artifact=artifact, profile=encoded.profile, kb=round(len(encoded.data) / 1024, 1)):
+            backend.upload(encoded.data, OUTPUT_BUCKET, paths[artifact], encoded.content_type)
+        t2 = time.perf_counter()
+        timings[f"{artifact}.encode"] = (t1 - t0) * 1000
+        timings[f"{artifact}.upload"] = (t2 - t1) * 1000
+
+    with span("publish"):
+        # 게시 스레드에서 기록되는 구간에도 요청 ID가 붙도록 현재 context를 복사해 실행
+        executor = get_publish_executor()
+        futures = [
+            executor.submit(contextvars.copy_context().run, publish_variant, artifact)
+            for artifact in ("print", "download", "thumbnail")
+        ]
+        for future in futures:
+            future.result()
+        timings["upload_all"] = (time.perf_counter() - started) * 1000
+
+        t0 = time.perf_counter()
+        backend.set_output(request_id, paths["print"], paths["download"], status=status)
+        timings["db"] = (time.perf_counter() - t0) * 1000
+        timings["total"] = (time.perf_counter() - started) * 1000
+
+    return PublishResult(paths["print"], paths["download"], paths["thumbnail"], timings)
@@ -0,0 +1,164 @@
+# 대기 번호(queue_number) 할당기
+# 번호 할당과 요청 삽입을 한 번의 호출로 원자적으로 처리합니다.
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+# 일자별 번호 초기화 여부 / 기준 시간대
+QUEUE_DAILY_RESET = os.getenv("QUEUE_DAILY_RESET", "false").lower() in ("1", "true", "yes")
+QUEUE_TIMEZONE = os.getenv("QUEUE_TIMEZONE", "Asia/Seoul")
+
+
+def _build_row_fields(data: dict) -> dict:
+    """allocator에 넘길 요청 필드를 정리합니다 (status/queue_number는 할당기가 채움)."""
+    return {
+        "input_image_url": data.get("input_image_url"),
+        "style_type": data.get("style_type"),
+        "style_types": data.get("style_types"),
+    }
+
+
+class SupabaseQueueAllocator:
+    """
+    DB 함수(create_booth_request RPC) 한 번으로 번호 할당 + 삽입을 수행합니다.
+    카운터 행 잠금으로 직렬화되므로 여러 키오스크가 동시에 제출해도 번호가 겹치지 않습니다.
+    (migration_queue_number_allocator.sql 실행 필요)
+    """
+
+    RPC_NAME = "create_booth_request"
+
+    def __init__(self, client, daily_reset: bool = QUEUE_DAILY_RESET, timezone: str = QUEUE_TIMEZONE):
+        self.client = client
+        self.daily_reset = daily_reset
+        self.timezone = timezone
+        self._rpc_missing = False
+
+    def create_request(self, data: dict) -> dict:
+        fields = _build_row_fields(data)
+        if not self._rpc_missing:
+            try:
+                response = self.client.rpc(self.RPC_NAME, {
+                    "p_input_image_url": fields["input_image_url"],
+                    "p_style_type": fields["style_type"],
+                    "p_style_types": fields["style_types"],
+                    "p_daily_reset": self.daily_reset,
+                    "p_timezone": self.timezone,
+                }).execute()
+                if response.data:
+                    return response.data[0]
+                return None
+            except Exception as e:
+                # 마이그레이션 전(함수 없음)에는 기존 방식으로 동작
+                if "PGRST202" not in str(e):
+                    raise e
+                print(f"⚠️ {self.RPC_NAME} RPC가 없어 기존 방식(조회 후 삽입)으로 번호를 할당합니다. 마이그레이션을 실행하세요.")
+                self._rpc_missing = True
+        return self._create_request_legacy(fields)
+
+    def _create_request_legacy(self, fields: dict) -> dict:
+        """마이그레이션 이전 방식: 최대 번호 조회 후 삽입 (2회 왕복, 동시 제출 시 중복 가능)."""
+        response = self.client.table("booth_requests")\
+            .select("queue_number")\
+            .order("queue_number", desc=True)\
+            .limit(1)\
+            .execute()
+        next_number = 0
+        if response.data and response.data[0].get("queue_number") is not None:
+            next_number = response.data[0]["queue_number"] + 1
+
+        row = {k: v for k, v in fields.items() if v is not None}
+        row.update({"status": "pending", "queue_number": next_number})
+        response = self.client.table("booth_requests").insert(row).execute()
+        if response.data:
+            return response.data[0]
+        return None
+
+
+class SQLiteQueueAllocator:
+    """
+    Supabase 대신 사용하는 로컬 SQLite 할당기 (오프라인 테스트/벤치마크용).
+    BEGIN IMMEDIATE 트랜잭션 안에서 카운터 UPSERT와 삽입을 함께 수행합니다.
+    """
+
+    def __init__(self, path: str, daily_reset: bool = QUEUE_DAILY_RESET, timezone: str = QUEUE_TIMEZONE):
+        self.path = path
+        self.daily_reset = daily_reset
+        self.timezone = timezone
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS booth_queue_counters (
+                    counter_key TEXT PRIMARY KEY,
+                    last_value INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS booth_requests (
+                    id TEXT PRIMARY KEY,
+                    created_at TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    style_type TEXT,
+                    style_types TEXT,
+                    input_image_url TEXT NOT NULL,
+                    output_image_url TEXT,
+                    error_message TEXT,
+                    queue_number INTEGER DEFAULT 0
+                );
+            """)
+
+    def _connect(self) -> sqlite3.Connection:
+        # 스레드마다 별도 연결 (sqlite3 연결은 스레드 간 공유 불가)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _counter_key(self) -> str:
+        if self.daily_reset:
+            return datetime.now(ZoneInfo(self.timezone)).strftime("%Y-%m-%d")
+        return "global"
+
+    def create_request(self, data: dict) -> dict:
+        fields = _build_row_fields(data)
+        conn = self._connect()
+        key = self._counter_key()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if key == "global":
+                # 기존 데이터가 있으면 최대 번호 다음부터 시작
+                conn.execute("""
+                    INSERT OR IGNORE INTO booth_queue_counters (counter_key, last_value)
+                    VALUES ('global', COALESCE((SELECT MAX(queue_number) FROM booth_requests), -1))
+                """)
+            number = conn.execute("""
+                INSERT INTO booth_queue_counters (counter_key, last_value) VALUES (?, 0)
+                ON CONFLICT (counter_key) DO UPDATE SET last_value = last_value + 1
+                RETURNING last_value
+            """, (key,)).fetchone()[0]
+            row = {
+                "id": str(uuid.uuid4()),
+                "created_at": datetime.now(ZoneInfo(self.timezone)).isoformat(),
+                "status": "pending",
+                "style_type": fields["style_type"],
+                "style_types": fields["style_types"],
+                "input_image_url": fields["input_image_url"],
+                "output_image_url": None,
+                "error_message": None,
+                "queue_number": number,
+            }
+            conn.execute(
+                "INSERT INTO booth_requests (id, created_at, status, style_type, style_types, input_image_url, queue_number)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (row["id"], row["created_at"], row["status"], row["style_type"],
+                 json.dumps(row["style_types"]) if row["style_types"] is not None else None,
+                 row["input_image_url"], number)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return row
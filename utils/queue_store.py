@@ -0,0 +1,187 @@
+# 관리자 대기열 클라이언트 측 저장소 (updated_at 커서 기반 증분 동기화)
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# 삭제된 행은 증분 조회로 알 수 없으므로 이 주기(초)마다 ID 목록으로 정리
+QUEUE_RECONCILE_INTERVAL = float(os.getenv("QUEUE_RECONCILE_INTERVAL", "60"))
+# 대기열 목록 한 페이지에 표시할 요청 수
+QUEUE_PAGE_SIZE = int(os.getenv("QUEUE_PAGE_SIZE", "10"))
+
+# 목록 보기: 진행 중(대기 → 처리 중 → 실패 순), 완료됨(최신순), 전체
+QUEUE_VIEWS = {
+    "open": ("pending", "processing", "failed"),
+    "completed": ("completed",),
+    "all": ("pending", "processing", "failed", "completed"),
+}
+_STATUS_ORDER = {"pending": 0, "processing": 1, "failed": 2, "completed": 3}
+
+
+@dataclass
+class SyncStats:
+    """새로고침 1회의 전송량"""
+    mode: str           # "full" (전체 조회), "delta" (변경분), "legacy" (updated_at 없음, 전체 select *)
+    rows: int           # 받은 행 수
+    bytes: int          # 응답 본문 크기 추정치 (JSON 직렬화 기준)
+    elapsed_ms: float
+    reconciled: bool = False
+    changed: int = 0    # 새로 추가되거나 내용이 바뀐(또는 삭제된) 행 수
+
+
+def _payload_size(rows) -> int:
+    return len(json.dumps(rows, ensure_ascii=False, default=str).encode())
+
+
+class QueueStore:
+    """
+    booth_requests 활성 요청을 메모리에 유지하고, 처음 한 번만 전체를 가져온 뒤
+    이후에는 updated_at 커서 이후에 바뀐 행만 가져와 병합합니다.
+    Streamlit 세션 상태에 보관하여 재실행(rerun) 간에 재사용하고,
+    한 번의 렌더링에서는 refresh()를 한 번만 호출한 뒤 사이드바와 목록이 같은 결과를 씁니다.
+
+    updated_at 컬럼이 없으면(마이그레이션 전) 매번 전체를 가져오는 기존 방식으로 동작합니다.
+
+    Args:
+        source: get_requests_updated_since / get_active_request_ids / get_all_active_requests를
+                제공하는 객체 (기본: utils.supabase_client)
+        reconcile_interval: 삭제 반영을 위한 ID 목록 조회 주기 (초)
+    """
+
+    def __init__(self, source=None, reconcile_interval: float = QUEUE_RECONCILE_INTERVAL):
+        if source is None:
+            from utils import supabase_client as source
+        self._db = source
+        self.reconcile_interval = reconcile_interval
+        self._rows: Dict[str, dict] = {}
+        self._cursor: Optional[str] = None
+        self._loaded = False
+        self._legacy = False
+        self._last_reconcile = 0.0
+        self._changed = 0
+        self.last_sync: Optional[SyncStats] = None
+        self.total_rows = 0
+        self.total_bytes = 0
+        self.refreshes = 0
+
+    def refresh(self) -> SyncStats:
+        """변경분을 가져와 병합합니다 (최초 호출 시 전체 로드)."""
+        start = time.perf_counter()
+        reconciled = False
+        self._changed = 0
+        if self._legacy:
+            rows = self._load_legacy()
+            mode = "legacy"
+        else:
+            try:
+                mode = "delta" if self._loaded else "full"
+                rows = self._db.get_requests_updated_since(self._cursor)
+                if not self._loaded:
+                    self._rows = {}
+                    self._last_reconcile = time.monotonic()
+                self._merge(rows)
+                self._loaded = True
+                if time.monotonic() - self._last_reconcile >= self.reconcile_interval:
+                    self._reconcile()
+                    reconciled = True
+            except Exception as e:
+                # 마이그레이션 전 (컬럼 없음: 42703)만 전체 조회로 전환, 일시적 오류는 다음 새로고침에서 재시도
+                if "42703" not in str(e):
+                    raise e
+                print(f"증분 동기화 사용 불가, 전체 조회로 대체합니다: {e}")
+                self._legacy = True
+                rows = self._load_legacy()
+                mode = "legacy"
+
+        stats = SyncStats(mode, len(rows), _payload_size(rows), (time.perf_counter() - start) * 1000, reconciled, self._changed)
+        self.last_sync = stats
+        self.total_rows += stats.rows
+        self.total_bytes += stats.bytes
+        self.refreshes += 1
+        return stats
+
+    def _load_legacy(self) -> List[dict]:
+        rows = self._db.get_all_active_requests()
+        new_rows = {row["id"]: row for row in rows}
+        self._changed = sum(1 for k, row in new_rows.items() if self._rows.get(k) != row)
+        self._changed += sum(1 for k in self._rows if k not in new_rows)
+        self._rows = new_rows
+        return rows
+
+    def _merge(self, rows: List[dict]):
+        for row in rows:
+            if self._rows.get(row["id"]) != row:
+                self._changed += 1
+            self._rows[row["id"]] = row
+            # 커서는 받은 행 중 가장 늦은 updated_at (gte로 조회하므로 같은 시각의 행도 놓치지 않음)
+            if row.get("updated_at") and (self._cursor is None or row["updated_at"] > self._cursor):
+                self._cursor = row["updated_at"]
+
+    def _reconcile(self):
+        """다른 관리자가 삭제한 행을 정리합니다."""
+        alive = set(self._db.get_active_request_ids())
+        for request_id in list(self._rows):
+            if request_id not in alive:
+                del self._rows[request_id]
+                self._changed += 1
+        self._last_reconcile = time.monotonic()
+
+    def remove(self, request_id: str):
+        """이 세션에서 삭제한 요청을 즉시 목록에서 제거합니다."""
+        self._rows.pop(request_id, None)
+
+    def rows(self) -> List[dict]:
+        """활성 요청 목록 (생성 시간순)."""
+        return sorted(self._rows.values(), key=lambda r: (r.get("created_at") or "", r["id"]))
+
+    def count_by_status(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for row in self._rows.values():
+            counts[row.get("status")] = counts.get(row.get("status"), 0) + 1
+        return counts
+
+    def stats(self) -> dict:
+        """누적 전송량 (사이드바 표시용)."""
+        return {
+            "mode": self.last_sync.mode if self.last_sync else None,
+            "last_rows": self.last_sync.rows if self.last_sync else 0,
+            "last_bytes": self.last_sync.bytes if self.last_sync else 0,
+            "last_ms": self.last_sync.elapsed_ms if self.last_sync else 0.0,
+            "refreshes": self.refreshes,
+            "total_rows": self.total_rows,
+            "total_bytes": self.total_bytes,
+            "cached_rows": len(self._rows),
+        }
+
+
+def window_rows(rows: List[dict], view: str = "open", page: int = 1, page_size: int = QUEUE_PAGE_SIZE) -> Tuple[List[dict], int, int]:
+    """
+    목록에 실제로 그릴 한 페이지 분량만 골라냅니다. 렌더링하는 위젯 수가 page_size로 제한되므로
+    행사 중 누적된 완료 요청 수와 관계없이 렌더링 시간이 일정합니다.
+
+    Args:
+        rows: QueueStore.rows() 결과 (생성 시간순)
+        view: QUEUE_VIEWS 키 ("open", "completed", "all")
+        page: 1부터 시작하는 페이지 번호 (범위를 벗어나면 마지막 페이지로 조정)
+        page_size: 페이지당 요청 수
+
+    Returns:
+        (페이지의 행 목록, 해당 보기의 전체 행 수, 전체 페이지 수)
+    """
+    statuses = QUEUE_VIEWS[view]
+    # 대기 중인 요청을 먼저(오래된 순), 완료된 요청은 최신순
+    open_rows = sorted(
+        (r for r in rows if r.get("status") in statuses and r.get("status") != "completed"),
+        key=lambda r: (_STATUS_ORDER.get(r.get("status"), len(_STATUS_ORDER)), r.get("created_at") or "")
+    )
+    done_rows = sorted(
+        (r for r in rows if r.get("status") in statuses and r.get("status") == "completed"),
+        key=lambda r: r.get("created_at") or "", reverse=True
+    )
+    selected = open_rows + done_rows
+    total = len(selected)
+    pages = max(1, -(-total // page_size))
+    page = min(max(1, page), pages)
+    start = (page - 1) * page_size
+    return selected[start:start + page_size], total, pages
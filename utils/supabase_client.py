@@ -1,49 +1,86 @@
 import os
-from supabase import create_client, Client
-from dotenv import load_dotenv
-from datetime import datetime
+import asyncio
+import hashlib
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING
+from utils.metrics import span
 
-# 환경 변수 로드
-load_dotenv()
+if TYPE_CHECKING:
+    from supabase import Client
 
-# Supabase 클라이언트 초기화
-def init_supabase() -> Client:
-    try:
-        # 먼저 환경 변수에서 로드 (로컬 개발용)
-        url = os.getenv("SUPABASE_URL")
-        key = os.getenv("SUPABASE_KEY")
-        
-        # Streamlit secrets 체크 (배포용) - lazy import로 set_page_config 이전 실행 방지
-        if not url or not key:
-            try:
-                import streamlit as st
-                if hasattr(st, "secrets") and "supabase" in st.secrets:
-                    url = st.secrets["supabase"]["url"]
-                    key = st.secrets["supabase"]["key"]
-            except:
-                pass
+def get_supabase_credentials():
+    """
+    Supabase URL과 Key를 환경 변수(로컬 개발용) 또는 Streamlit secrets(배포용)에서 가져옵니다.
+    """
+    # 먼저 환경 변수에서 로드 (로컬 개발용)
+    url = os.getenv("SUPABASE_URL")
+    key = os.getenv("SUPABASE_KEY")
+    
+    # Streamlit secrets 체크 (배포용) - lazy import로 set_page_config 이전 실행 방지
+    if not url or not key:
+        try:
+            import streamlit as st
+            if hasattr(st, "secrets") and "supabase" in st.secrets:
+                url = st.secrets["supabase"]["url"]
+                key = st.secrets["supabase"]["key"]
+        except:
+            pass
 
-        if not url or not key:
-            raise ValueError("Supabase URL 또는 Key가 누락되었습니다. .env 파일을 확인하세요.")
+    if not url or not key:
+        raise ValueError("Supabase URL 또는 Key가 누락되었습니다. .env 파일을 확인하세요.")
+    return url, key
 
+# Supabase 클라이언트 초기화
+def init_supabase() -> "Client":
+    try:
+        from supabase import create_client
+        url, key = get_supabase_credentials()
         return create_client(url, key)
     except Exception as e:
         print(f"Supabase 초기화 실패: {str(e)}")
         raise e
 
-supabase = init_supabase()
+_supabase = None
+_supabase_lock = threading.Lock()
 
-def upload_image(file_bytes, bucket_name: str, file_path: str) -> str:
+def get_supabase() -> "Client":
+    """
+    프로세스 전역 Supabase 클라이언트를 반환합니다 (최초 호출 시 생성).
+    모듈 import만으로는 SDK를 불러오거나 접속 정보를 확인하지 않으므로 키오스크/로그인 화면이 빨리 뜨고,
+    접속 정보가 없으면 실제로 DB/Storage를 사용할 때 ValueError가 발생합니다.
+    """
+    global _supabase
+    if _supabase is None:
+        with _supabase_lock:
+            if _supabase is None:
+                _supabase = init_supabase()
+    return _supabase
+
+def __getattr__(name):
+    # 하위 호환: from utils.supabase_client import supabase
+    if name == "supabase":
+        return get_supabase()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def upload_image(file_bytes, bucket_name: str, file_path: str, content_type: str = "image/png", use_cache: bool = True) -> str:
     """
     이미지를 Supabase Storage에 업로드하고 경로를 반환합니다.
+    content_type은 실제 인코딩 형식과 일치해야 합니다 (예: "image/jpeg").
+    업로드한 내용은 다운로드 캐시에도 저장하여 같은 PC에서 다시 받을 때 네트워크를 쓰지 않습니다.
     """
     try:
-        response = supabase.storage.from_(bucket_name).upload(
-            path=file_path,
-            file=file_bytes,
-            file_options={"content-type": "image/png"}
-        )
-        print(f"✅ 업로드 성공: {bucket_name}/{file_path} ({len(file_bytes)/1024:.1f}KB)")
+        with span("storage.upload", bucket=bucket_name, kb=round(len(file_bytes) / 1024, 1)):
+            get_supabase().storage.from_(bucket_name).upload(
+                path=file_path,
+                file=file_bytes,
+                file_options={"content-type": content_type}
+            )
+        cache = get_download_cache() if use_cache else None
+        if cache:
+            cache.put(download_cache_key(bucket_name, file_path), bytes(file_bytes))
         return file_path
     except Exception as e:
         print(f"업로드 오류: {e}")
@@ -55,15 +92,31 @@ def get_image_url(bucket_name: str, file_path: str) -> str:
     """
     try:
         # 공개 버킷용
-        return supabase.storage.from_(bucket_name).get_public_url(file_path)
+        return get_supabase().storage.from_(bucket_name).get_public_url(file_path)
     except Exception as e:
         print(f"URL 가져오기 오류: {e}")
         return None
 
+_queue_allocator = None
+
+def get_queue_allocator():
+    """
+    대기 번호 할당기를 반환합니다.
+    QUEUE_ALLOCATOR=sqlite 이면 로컬 SQLite(QUEUE_SQLITE_PATH)를, 기본값은 Supabase RPC를 사용합니다.
+    """
+    global _queue_allocator
+    if _queue_allocator is None:
+        from utils.queue_allocator import SupabaseQueueAllocator, SQLiteQueueAllocator
+        if os.getenv("QUEUE_ALLOCATOR", "supabase") == "sqlite":
+            _queue_allocator = SQLiteQueueAllocator(os.getenv("QUEUE_SQLITE_PATH", "booth_queue.db"))
+        else:
+            _queue_allocator = SupabaseQueueAllocator(get_supabase())
+    return _queue_allocator
+
 def create_booth_request(style_type=None, input_image_path: str = None, style_types: list = None) -> dict:
     """
     booth_requests 테이블에 새 레코드를 생성합니다.
-    순번(queue_number)을 자동으로 할당합니다.
+    순번(queue_number)은 할당기가 삽입과 함께 원자적으로 할당합니다 (1회 왕복).
     
     Args:
         style_type: 단일 스타일 (하위 호환성)
@@ -74,66 +127,109 @@ def create_booth_request(style_type=None, input_image_path: str = None, style_ty
         생성된 레코드
     """
     try:
-        # 현재 최대 순번 조회 (오늘 날짜 기준 또는 전체)
-        response = supabase.table("booth_requests")\
-            .select("queue_number")\
-            .order("queue_number", desc=True)\
-            .limit(1)\
-            .execute()
-        
-        # 다음 순번 계산
-        next_number = 0
-        if response.data and len(response.data) > 0 and response.data[0].get("queue_number") is not None:
-            next_number = response.data[0]["queue_number"] + 1
-        
-        data = {
-            "input_image_url": input_image_path,
-            "status": "pending",
-            "queue_number": next_number
-        }
+        data = {"input_image_url": input_image_path}
         
         # 하위 호환성: style_type과 style_types 모두 지원
         if style_types:
             # 4-cut 모드: style_types 배열 저장
             data["style_types"] = style_types
             # 첫 번째 스타일을 style_type에도 저장 (하위 호환성)
-            data["style_type"] = style_types[0] if style_types else None
+            data["style_type"] = style_types[0]
         elif style_type:
             # 기존 단일 스타일 모드
             data["style_type"] = style_type
             # style_types는 null로 유지
         
-        response = supabase.table("booth_requests").insert(data).execute()
-        if response.data:
-            return response.data[0]
-        return None
+        with span("db.insert"):
+            return get_queue_allocator().create_request(data)
     except Exception as e:
         print(f"DB 삽입 오류: {e}")
         raise e
 
-def get_pending_requests():
+def get_pending_requests(limit: int = None):
     """
-    상태가 'pending'인 모든 요청을 생성 시간순으로 가져옵니다.
+    상태가 'pending'인 요청을 생성 시간순으로 가져옵니다.
+    limit을 지정하면 가장 오래된 요청부터 최대 limit개만 가져옵니다.
     """
     try:
-        response = supabase.table("booth_requests")\
+        query = get_supabase().table("booth_requests")\
             .select("*")\
             .eq("status", "pending")\
-            .order("created_at", desc=False)\
-            .execute()
+            .order("created_at", desc=False)
+        if limit:
+            query = query.limit(limit)
+        response = query.execute()
         return response.data
     except Exception as e:
         print(f"조회 오류: {e}")
         return []
 
+# 선점할 수 있는 상태 (실패한 요청은 관리자가 재시도할 때 선점)
+CLAIMABLE_STATUSES = ["pending", "failed"]
+# processing 상태로 이 시간(초) 넘게 결과가 없으면 중단된 것으로 보고 다시 선점 허용 (started_at 필요)
+CLAIM_STALE_SECONDS = int(os.getenv("CLAIM_STALE_SECONDS", "900"))
+
+def claim_request(request_id: str):
+    """
+    pending 또는 failed 상태인 요청을 processing으로 전환하여 선점합니다.
+    조건부 update 한 번으로 처리하므로 여러 워커/관리자가 동시에 시도해도
+    한 곳만 성공합니다.
+    
+    Returns:
+        선점에 성공하면 갱신된 레코드, 이미 다른 곳에서 가져갔으면 None
+    """
+    try:
+        with span("db.claim"):
+            response = get_supabase().table("booth_requests")\
+                .update({"status": "processing"})\
+                .eq("id", request_id)\
+                .in_("status", CLAIMABLE_STATUSES)\
+                .execute()
+        if response.data:
+            return response.data[0]
+        return None
+    except Exception as e:
+        print(f"선점 오류: {e}")
+        raise e
+
+def reclaim_stale_request(request_id: str, stale_seconds: int = CLAIM_STALE_SECONDS):
+    """
+    결과 없이 stale_seconds 넘게 processing에 머문 요청(워커/관리자 세션 중단)을 다시 선점합니다.
+    started_at을 지금으로 바꾸는 조건부 update 한 번으로 처리하므로 여러 관리자가 동시에 시도해도 한 곳만 성공합니다.
+    (migration_add_generation_times.sql 필요, 컬럼이 없으면 None)
+    
+    Returns:
+        선점에 성공하면 갱신된 레코드, 아직 진행 중이거나 다른 곳에서 가져갔으면 None
+    """
+    now = datetime.now(timezone.utc)
+    try:
+        with span("db.reclaim"):
+            response = get_supabase().table("booth_requests")\
+                .update({"started_at": now.isoformat()})\
+                .eq("id", request_id)\
+                .eq("status", "processing")\
+                .is_("output_image_url", "null")\
+                .lt("started_at", (now - timedelta(seconds=stale_seconds)).isoformat())\
+                .execute()
+        if response.data:
+            return response.data[0]
+        return None
+    except Exception as e:
+        if "42703" in str(e):
+            print("⚠️ started_at 컬럼이 없어 중단된 요청을 다시 선점할 수 없습니다. 마이그레이션을 실행하세요.")
+            return None
+        print(f"선점 오류: {e}")
+        raise e
+
 def get_all_active_requests():
     """
-    삭제되지 않은 모든 요청(pending, processing, completed)을 생성 시간순으로 가져옵니다.
+    삭제되지 않은 모든 요청(pending, processing, completed, failed)을 생성 시간순으로 가져옵니다.
+    failed 요청은 저장된 셀을 재사용하여 재시도할 수 있도록 함께 표시합니다.
     """
     try:
-        response = supabase.table("booth_requests")\
+        response = get_supabase().table("booth_requests")\
             .select("*")\
-            .in_("status", ["pending", "processing", "completed"])\
+            .in_("status", ["pending", "processing", "completed", "failed"])\
             .order("created_at", desc=False)\
             .execute()
         return response.data
@@ -141,6 +237,127 @@ def get_all_active_requests():
         print(f"조회 오류: {e}")
         return []
 
+# 관리자 대기열 목록에 필요한 컬럼 (cell_results 등 큰 컬럼은 선택 시 get_request로 조회)
+# started_at은 처리 중인 요청의 예상 완료 시각 계산용 (migration_add_generation_times.sql 실행 전에는 빼고 조회)
+QUEUE_LIST_COLUMNS = (
+    "id, created_at, updated_at, started_at, status, style_type, style_types, queue_number, "
+    "input_image_url, output_image_url, download_image_url"
+)
+# started_at/generated_at 컬럼이 없는 DB (migration_add_generation_times.sql 실행 전)
+_generation_times_missing = False
+
+def get_requests_updated_since(since: str = None, columns: str = QUEUE_LIST_COLUMNS):
+    """
+    updated_at이 since 이후(같은 시각 포함)인 요청을 updated_at 순으로 가져옵니다.
+    since가 없으면 전체를 가져옵니다. (migration_add_updated_at.sql 필요)
+    started_at 컬럼이 없으면 빼고 다시 조회하고, 그 밖의 오류는 호출자가 전체 조회로 대체할 수 있도록 그대로 발생시킵니다.
+    """
+    global _generation_times_missing
+    if _generation_times_missing:
+        columns = columns.replace("started_at, ", "")
+    query = get_supabase().table("booth_requests")\
+        .select(columns)\
+        .in_("status", ["pending", "processing", "completed", "failed"])\
+        .order("updated_at", desc=False)
+    if since:
+        query = query.gte("updated_at", since)
+    try:
+        with span("db.queue_delta" if since else "db.queue_full") as s:
+            rows = query.execute().data
+            s["rows"] = len(rows)
+    except Exception as e:
+        if "42703" in str(e) and "started_at" in str(e) and "started_at" in columns:
+            print("⚠️ started_at 컬럼이 없어 대기열 목록에서 제외합니다. 마이그레이션을 실행하세요.")
+            _generation_times_missing = True
+            return get_requests_updated_since(since, columns)
+        raise e
+    return rows
+
+def get_active_request_ids() -> list:
+    """
+    삭제 여부 확인용으로 남아 있는 요청 ID만 가져옵니다.
+    """
+    response = get_supabase().table("booth_requests")\
+        .select("id")\
+        .in_("status", ["pending", "processing", "completed", "failed"])\
+        .execute()
+    return [row["id"] for row in response.data]
+
+def get_request(request_id: str):
+    """
+    요청 1건의 전체 컬럼을 가져옵니다. 없으면 None.
+    """
+    try:
+        with span("db.get_request"):
+            response = get_supabase().table("booth_requests")\
+                .select("*")\
+                .eq("id", request_id)\
+                .execute()
+        return response.data[0] if response.data else None
+    except Exception as e:
+        print(f"조회 오류: {e}")
+        raise e
+
+REQUEST_STATUSES = ["pending", "processing", "completed", "failed"]
+_counts_rpc_missing = False
+
+def get_status_counts() -> dict:
+    """
+    상태별 요청 수를 서버에서 집계하여 가져옵니다. 예: {"pending": 3, "completed": 120, ...}
+    booth_request_counts RPC가 없으면(마이그레이션 전) 상태별 count 쿼리(본문 없음)로 대체합니다.
+    """
+    global _counts_rpc_missing
+    counts = {status: 0 for status in REQUEST_STATUSES}
+    try:
+        with span("db.counts", rpc=not _counts_rpc_missing):
+            if not _counts_rpc_missing:
+                try:
+                    response = get_supabase().rpc("booth_request_counts", {}).execute()
+                    for row in response.data:
+                        counts[row["status"]] = row["count"]
+                    return counts
+                except Exception as e:
+                    if "PGRST202" not in str(e):
+                        raise e
+                    print("⚠️ booth_request_counts RPC가 없어 상태별 count 쿼리로 집계합니다. 마이그레이션을 실행하세요.")
+                    _counts_rpc_missing = True
+            for status in REQUEST_STATUSES:
+                response = get_supabase().table("booth_requests")\
+                    .select("id", count="exact", head=True)\
+                    .eq("status", status)\
+                    .execute()
+                counts[status] = response.count or 0
+            return counts
+    except Exception as e:
+        print(f"집계 오류: {e}")
+        raise e
+
+def get_recent_generation_times(limit: int = 100) -> list:
+    """
+    최근 생성이 끝난 요청의 스타일과 생성 시작/완료 시각을 최신순으로 가져옵니다 (대기 시간 예측용).
+    started_at/generated_at 컬럼이 없으면(migration_add_generation_times.sql 실행 전) 빈 목록을 반환합니다.
+    """
+    global _generation_times_missing
+    if _generation_times_missing:
+        return []
+    try:
+        with span("db.generation_times") as s:
+            response = get_supabase().table("booth_requests")\
+                .select("style_type, style_types, started_at, generated_at")\
+                .not_.is_("generated_at", "null")\
+                .order("generated_at", desc=True)\
+                .limit(limit)\
+                .execute()
+            s["rows"] = len(response.data)
+        return response.data
+    except Exception as e:
+        if "42703" in str(e):
+            print("⚠️ started_at/generated_at 컬럼이 없어 기본 소요 시간으로 대기 시간을 예측합니다. 마이그레이션을 실행하세요.")
+            _generation_times_missing = True
+            return []
+        print(f"조회 오류: {e}")
+        raise e
+
 def update_request_status(request_id: str, status: str, output_url: str = None, error_msg: str = None):
     """
     요청의 상태와 결과를 업데이트합니다.
@@ -152,21 +369,66 @@ def update_request_status(request_id: str, status: str, output_url: str = None,
         if error_msg:
             data["error_message"] = error_msg
             
-        response = supabase.table("booth_requests")\
-            .update(data)\
-            .eq("id", request_id)\
-            .execute()
+        with span("db.update_status", status=status):
+            response = get_supabase().table("booth_requests")\
+                .update(data)\
+                .eq("id", request_id)\
+                .execute()
+        return response.data
+    except Exception as e:
+        print(f"업데이트 오류: {e}")
+        raise e
+
+def update_request_output(request_id: str, output_path: str, download_path: str = None, status: str = None):
+    """
+    생성 결과 파일 경로를 저장합니다. 상태는 processing으로 유지되며
+    관리자가 확인 후 "완료 표시"를 눌러야 completed로 바뀝니다.
+    download_path는 QR 다운로드용 경량 이미지 경로입니다 (download_image_url 컬럼).
+    status를 지정하면 상태 전환과 이전 오류 메시지 삭제를 같은 update 한 번으로 처리합니다.
+    """
+    data = {"output_image_url": output_path}
+    if download_path:
+        data["download_image_url"] = download_path
+    if status:
+        data["status"] = status
+        data["error_message"] = None
+    try:
+        with span("db.update_output"):
+            response = get_supabase().table("booth_requests")\
+                .update(data)\
+                .eq("id", request_id)\
+                .execute()
         return response.data
     except Exception as e:
+        # 마이그레이션 전 (download_image_url 컬럼 없음): 원본 경로만 저장
+        if download_path and "PGRST204" in str(e):
+            print("download_image_url 컬럼이 없어 원본 경로만 저장합니다. (migration_add_download_image.sql 실행 필요)")
+            return update_request_output(request_id, output_path, status=status)
         print(f"업데이트 오류: {e}")
         raise e
 
+def update_cell_results(request_id: str, cell_results: dict):
+    """
+    4-cut 셀별 생성 결과(cell_results)를 저장합니다.
+    재시도 시 completed 셀은 다시 생성하지 않고 저장된 이미지를 사용합니다.
+    """
+    try:
+        with span("db.cell_results"):
+            response = get_supabase().table("booth_requests")\
+                .update({"cell_results": cell_results})\
+                .eq("id", request_id)\
+                .execute()
+        return response.data
+    except Exception as e:
+        print(f"셀 상태 업데이트 오류: {e}")
+        raise e
+
 def delete_request(request_id: str):
     """
     요청을 삭제합니다.
     """
     try:
-        response = supabase.table("booth_requests")\
+        response = get_supabase().table("booth_requests")\
             .delete()\
             .eq("id", request_id)\
             .execute()
@@ -175,14 +437,288 @@ def delete_request(request_id: str):
         print(f"삭제 오류: {e}")
         raise e
 
-def download_image(bucket_name: str, file_path: str) -> bytes:
+# 다운로드 캐시: Storage 객체는 경로에 UUID/시각이 들어가 한 번 올린 뒤 바뀌지 않으므로 경로 기준으로 캐시
+DOWNLOAD_CACHE_ENABLED = os.getenv("DOWNLOAD_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+DOWNLOAD_CACHE_DIR = os.getenv("DOWNLOAD_CACHE_DIR", os.path.join(".cache", "downloads"))
+DOWNLOAD_CACHE_MAX_MB = int(os.getenv("DOWNLOAD_CACHE_MAX_MB", "256"))
+
+_download_cache = None
+_download_cache_lock = threading.Lock()
+_missing_thumbnails = set()
+
+def get_download_cache():
+    """프로세스 전역 다운로드 캐시(DiskLRUCache)를 반환합니다. 비활성화된 경우 None."""
+    global _download_cache
+    if not DOWNLOAD_CACHE_ENABLED:
+        return None
+    if _download_cache is None:
+        with _download_cache_lock:
+            if _download_cache is None:
+                from utils.disk_cache import DiskLRUCache
+                _download_cache = DiskLRUCache(DOWNLOAD_CACHE_DIR, DOWNLOAD_CACHE_MAX_MB * 1024 * 1024)
+    return _download_cache
+
+def download_cache_key(bucket_name: str, file_path: str) -> str:
+    return hashlib.sha256(f"{bucket_name}/{file_path}".encode()).hexdigest()
+
+def get_download_cache_stats() -> dict:
+    """다운로드 캐시 적중률 등 통계 (비활성화 시 빈 dict)."""
+    cache = get_download_cache()
+    return cache.stats() if cache else {}
+
+def download_image(bucket_name: str, file_path: str, use_cache: bool = True) -> bytes:
     """
     Supabase Storage에서 이미지를 다운로드합니다.
+    로컬 디스크 LRU 캐시(bucket/path 기준)에 있으면 네트워크 없이 반환합니다.
     """
+    cache = get_download_cache() if use_cache else None
+    key = download_cache_key(bucket_name, file_path)
+    if cache:
+        data = cache.get(key)
+        if data is not None:
+            return data
     try:
-        response = supabase.storage.from_(bucket_name).download(file_path)
-        print(f"✅ 다운로드 성공: {file_path} ({len(response)/1024:.1f}KB)")
+        with span("storage.download", bucket=bucket_name) as s:
+            response = get_supabase().storage.from_(bucket_name).download(file_path)
+            s["kb"] = round(len(response) / 1024, 1)
+        if cache:
+            cache.put(key, response)
         return response
     except Exception as e:
         print(f"다운로드 오류: {e}")
         raise e
+
+def download_thumbnail(bucket_name: str, file_path: str) -> bytes:
+    """
+    file_path의 썸네일을 다운로드합니다. 썸네일이 없는 이전 객체는 원본을 반환합니다.
+    """
+    from utils.image_processor import thumbnail_path
+    thumb_path = thumbnail_path(file_path)
+    if (bucket_name, thumb_path) not in _missing_thumbnails:
+        try:
+            return download_image(bucket_name, thumb_path)
+        except Exception as e:
+            # 썸네일이 없는 객체는 기억해 두고 다음부터 바로 원본을 받음 (일시적 오류는 다음에 다시 시도)
+            if "not found" in str(e).lower():
+                _missing_thumbnails.add((bucket_name, thumb_path))
+    return download_image(bucket_name, file_path)
+
+
+# ===== booth_requests 변경 구독 (Realtime) =====
+
+REALTIME_ENABLED = os.getenv("REALTIME_ENABLED", "true").lower() in ("1", "true", "yes")
+
+
+class ChangeFeed:
+    """
+    booth_requests 변경 알림을 받는 구독 계층의 기본 클래스 (프로세스 내 pub/sub).
+    변경이 있을 때마다 version이 1씩 증가하므로, 구독자는 마지막으로 본 version과 비교하여
+    실제로 바뀐 경우에만 화면을 갱신하면 됩니다.
+    
+    available이 False이면 알림을 신뢰할 수 없으므로 호출자는 폴링으로 대체해야 합니다.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._subscribers = []
+        self.version = 0
+        self.available = True
+        self.last_event = None
+
+    def publish(self, event: dict = None):
+        """변경 이벤트를 발행합니다. (Realtime 콜백 또는 테스트/로컬 백엔드에서 호출)"""
+        with self._cond:
+            self.version += 1
+            self.last_event = event
+            subscribers = list(self._subscribers)
+            self._cond.notify_all()
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"변경 구독 콜백 오류: {e}")
+
+    def subscribe(self, callback):
+        """변경 시 호출될 콜백을 등록하고, 등록 해제 함수를 반환합니다."""
+        with self._cond:
+            self._subscribers.append(callback)
+        
+        def unsubscribe():
+            with self._cond:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return unsubscribe
+
+    def wait_for_change(self, since_version: int, timeout: float = None) -> int:
+        """version이 since_version보다 커질 때까지 대기하고 현재 version을 반환합니다."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.version > since_version, timeout)
+            return self.version
+
+    def close(self):
+        pass
+
+
+class InProcessChangeFeed(ChangeFeed):
+    """네트워크 없이 publish()를 직접 호출하는 구독 계층 (테스트/로컬 백엔드용)."""
+
+
+class SupabaseRealtimeFeed(ChangeFeed):
+    """
+    Supabase Realtime 채널로 booth_requests의 INSERT/UPDATE/DELETE를 구독합니다.
+    Realtime 클라이언트는 비동기 전용이므로 전용 스레드의 이벤트 루프에서 실행하며,
+    연결이 끊기면 available을 False로 바꾸고 지수 백오프로 재연결합니다.
+    (테이블이 supabase_realtime publication에 포함되어 있어야 합니다: migration_enable_realtime.sql)
+    
+    Args:
+        url: Supabase 프로젝트 URL
+        key: Supabase anon key
+        max_backoff: 재연결 최대 대기 시간 (초)
+    """
+
+    CHECK_INTERVAL = 5.0
+
+    def __init__(self, url: str, key: str, max_backoff: float = 60.0):
+        super().__init__()
+        self.available = False
+        self.url = url
+        self.key = key
+        self.max_backoff = max_backoff
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="supabase-realtime", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.run(self._supervise())
+
+    async def _supervise(self):
+        from realtime import AsyncRealtimeClient, RealtimeSubscribeStates
+        
+        attempt = 0
+        while not self._closed.is_set():
+            client = AsyncRealtimeClient(
+                f"{self.url}/realtime/v1", token=self.key, params={"apikey": self.key},
+                auto_reconnect=False, max_retries=1
+            )
+            state = {"status": None}
+            
+            def on_subscribe(status, error):
+                state["status"] = status
+                if status == RealtimeSubscribeStates.SUBSCRIBED:
+                    print("📡 Realtime 구독 시작: booth_requests")
+                    self.available = True
+                    # 연결이 끊긴 동안의 변경을 놓쳤을 수 있으므로 한 번 갱신을 알림
+                    self.publish({"type": "RESYNC"})
+                else:
+                    print(f"⚠️ Realtime 구독 상태: {status} {error or ''}")
+                    self.available = False
+            
+            try:
+                channel = client.channel("booth_requests_changes")
+                channel.on_postgres_changes("*", schema="public", table="booth_requests", callback=self._on_change)
+                await channel.subscribe(on_subscribe)
+                # 구독이 유지되는 동안 주기적으로 연결 상태 확인
+                while not self._closed.is_set():
+                    await asyncio.sleep(self.CHECK_INTERVAL)
+                    if not client.is_connected or state["status"] not in (None, RealtimeSubscribeStates.SUBSCRIBED):
+                        break
+                    if state["status"] == RealtimeSubscribeStates.SUBSCRIBED:
+                        attempt = 0
+            except Exception as e:
+                print(f"⚠️ Realtime 연결 실패: {e}")
+            
+            self.available = False
+            try:
+                await client.close()
+            except Exception:
+                pass
+            if self._closed.is_set():
+                break
+            attempt += 1
+            delay = random.uniform(0, min(self.max_backoff, 2 ** attempt))
+            print(f"🔁 Realtime 재연결 대기 {delay:.1f}s (시도 {attempt})")
+            await asyncio.sleep(delay)
+
+    def _on_change(self, payload: dict):
+        data = payload.get("data", payload) if isinstance(payload, dict) else {}
+        self.publish({"type": data.get("type"), "record": data.get("record") or data.get("old_record")})
+
+    def close(self):
+        self._closed.set()
+
+
+_change_feed = None
+_change_feed_lock = threading.Lock()
+
+def get_change_feed() -> ChangeFeed:
+    """
+    프로세스 전역 변경 구독을 반환합니다.
+    REALTIME_ENABLED=false이면 알림이 오지 않는 InProcessChangeFeed(available=False)를 반환하여
+    호출자가 폴링으로 동작하도록 합니다.
+    """
+    global _change_feed
+    if _change_feed is None:
+        with _change_feed_lock:
+            if _change_feed is None:
+                if REALTIME_ENABLED:
+                    url, key = get_supabase_credentials()
+                    _change_feed = SupabaseRealtimeFeed(url, key)
+                else:
+                    _change_feed = InProcessChangeFeed()
+                    _change_feed.available = False
+    return _change_feed
+
+
+class ChangeWatcher:
+    """
+    대시보드 1개 세션의 갱신 판단기.
+    변경 구독이 살아 있으면 version이 바뀌었을 때만 갱신하고,
+    구독을 사용할 수 없으면 poll 함수로 폴링하되 변경이 없을수록 간격을 늘립니다 (지수 백오프).
+    구독 중에도 max_interval마다 한 번은 폴링하여 놓친 알림을 보완합니다.
+    
+    Args:
+        feed: ChangeFeed
+        poll: 변경 여부를 반환하는 폴링 함수 (예: QueueStore 증분 조회)
+        min_interval: 폴링 최소 간격 (초)
+        max_interval: 폴링 최대 간격 (초)
+    """
+
+    def __init__(self, feed: ChangeFeed, poll, min_interval: float = 10.0, max_interval: float = 60.0):
+        self.feed = feed
+        self.poll = poll
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.seen_version = feed.version
+        self.interval = min_interval
+        self.next_poll = time.monotonic() + min_interval
+        self._was_available = feed.available
+
+    def mark_seen(self):
+        """화면을 다시 그렸으므로 현재 version까지 반영된 것으로 표시합니다."""
+        self.seen_version = self.feed.version
+
+    def should_refresh(self) -> bool:
+        """화면을 다시 그려야 하면 True."""
+        if self.feed.version != self.seen_version:
+            self.interval = self.min_interval
+            return True
+        # 구독이 살아 있어도 publication 누락 등으로 알림이 오지 않을 수 있으므로 최대 간격으로 안전 폴링
+        now = time.monotonic()
+        if self._was_available and not self.feed.available:
+            # 구독이 끊긴 직후에는 바로 폴링 시작
+            self.interval = self.min_interval
+            self.next_poll = now
+        self._was_available = self.feed.available
+        if now < self.next_poll:
+            return False
+        try:
+            changed = self.poll()
+        except Exception as e:
+            print(f"폴링 오류: {e}")
+            changed = False
+        if self.feed.available:
+            self.interval = self.max_interval
+        else:
+            self.interval = self.min_interval if changed else min(self.max_interval, self.interval * 2)
+        self.next_poll = now + self.interval
+        return changed
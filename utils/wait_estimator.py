@@ -0,0 +1,200 @@
+# 대기 시간 예측 (최근 완료 요청의 생성 소요 시간 → 대기 중인 요청별 예상 완료 시각)
+import heapq
+import os
+import statistics
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# 샘플이 없을 때 사용할 요청 1건의 생성 소요 시간(초)
+WAIT_DEFAULT_SINGLE_SECONDS = float(os.getenv("WAIT_DEFAULT_SINGLE_SECONDS", "30"))
+WAIT_DEFAULT_FOUR_CUT_SECONDS = float(os.getenv("WAIT_DEFAULT_FOUR_CUT_SECONDS", "45"))
+# 스타일/4컷별로 보관할 최근 샘플 수
+WAIT_WINDOW = int(os.getenv("WAIT_WINDOW", "20"))
+# 최근 소요 시간을 DB에서 다시 가져오는 주기(초)
+WAIT_REFRESH_INTERVAL = float(os.getenv("WAIT_REFRESH_INTERVAL", "30"))
+# 동시에 처리되는 요청 수 (관리자 수동 처리 1건, 워커/일괄 처리를 돌리면 그 동시 처리 수로 설정)
+WAIT_CONCURRENCY = int(os.getenv("WAIT_CONCURRENCY", "1"))
+
+# 4컷 요청의 소요 시간 키 (단일 스타일은 스타일 이름이 키)
+FOUR_CUT_KEY = "4cut"
+# 이보다 짧거나 긴 소요 시간은 잘못 기록된 값으로 보고 무시 (재시도 시 상태와 결과가 한 번에 기록된 경우 등)
+_MIN_SAMPLE_SECONDS = 1.0
+_MAX_SAMPLE_SECONDS = 1800.0
+
+
+def latency_key(req: dict) -> str:
+    """요청의 소요 시간 키 (4컷은 FOUR_CUT_KEY, 단일 스타일은 스타일 이름)."""
+    if isinstance(req.get('style_types'), list):
+        return FOUR_CUT_KEY
+    return req.get('style_type') or FOUR_CUT_KEY
+
+
+def parse_timestamp(value) -> Optional[float]:
+    """DB 타임스탬프(ISO 8601 문자열)를 epoch 초로 변환합니다. 없거나 형식이 다르면 None."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def format_wait(seconds: float) -> str:
+    """예상 대기 시간을 화면 표시용 문자열로 만듭니다. 예: "1분 미만", "약 3분", "약 1시간 5분"."""
+    minutes = int(round(seconds / 60))
+    if minutes < 1:
+        return "1분 미만"
+    if minutes < 60:
+        return f"약 {minutes}분"
+    return f"약 {minutes // 60}시간 {minutes % 60}분"
+
+
+class WaitEstimator:
+    """
+    스타일/4컷별 최근 생성 소요 시간(중앙값)으로 대기 중인 요청의 예상 완료 시각을 계산합니다.
+    소요 시간은 WAIT_REFRESH_INTERVAL마다 최근 완료 요청의 started_at/generated_at에서 다시 계산하고,
+    예측 자체는 DB 조회 없이 목록만으로 계산하므로 매 새로고침마다 호출해도 됩니다.
+
+    Args:
+        source: get_recent_generation_times를 제공하는 객체 (기본: utils.supabase_client)
+        window: 키별로 사용할 최근 샘플 수
+        refresh_interval: 소요 시간 재계산 주기(초)
+    """
+
+    def __init__(self, source=None, window: int = WAIT_WINDOW, refresh_interval: float = WAIT_REFRESH_INTERVAL):
+        self._source = source
+        self.window = window
+        self.refresh_interval = refresh_interval
+        self._samples: Dict[str, List[float]] = {}
+        self._medians: Dict[str, float] = {}
+        self._last_refresh = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        주기가 지났으면 최근 완료 요청으로 소요 시간을 다시 계산합니다.
+
+        Returns:
+            다시 계산했으면 True
+        """
+        if not force and time.monotonic() - self._last_refresh < self.refresh_interval:
+            return False
+        with self._lock:
+            if not force and time.monotonic() - self._last_refresh < self.refresh_interval:
+                return False
+            self._last_refresh = time.monotonic()
+            source = self._source
+            if source is None:
+                from utils import supabase_client as source
+            try:
+                rows = source.get_recent_generation_times(limit=self.window * 8)
+            except Exception as e:
+                print(f"소요 시간 조회 실패 (이전 값 사용): {e}")
+                return False
+            samples: Dict[str, List[float]] = {}
+            # 최신순으로 받으므로 키별 최근 window개만 사용
+            for row in rows:
+                started, generated = parse_timestamp(row.get('started_at')), parse_timestamp(row.get('generated_at'))
+                if started is None or generated is None:
+                    continue
+                seconds = generated - started
+                if not _MIN_SAMPLE_SECONDS <= seconds <= _MAX_SAMPLE_SECONDS:
+                    continue
+                key_samples = samples.setdefault(latency_key(row), [])
+                if len(key_samples) < self.window:
+                    key_samples.append(seconds)
+            self._samples = samples
+            self._medians = {key: statistics.median(values) for key, values in samples.items()}
+            return True
+
+    def expected_seconds(self, req: dict) -> float:
+        """
+        요청 1건의 예상 생성 소요 시간.
+        해당 키의 샘플이 없으면 4컷은 스타일별 중앙값 중 가장 긴 값(병렬 생성), 그것도 없으면 기본값을 사용합니다.
+        """
+        key = latency_key(req)
+        if key in self._medians:
+            return self._medians[key]
+        if key == FOUR_CUT_KEY:
+            styles = [self._medians[s] for s in req.get('style_types') or [] if s in self._medians]
+            return max(styles) if styles else WAIT_DEFAULT_FOUR_CUT_SECONDS
+        return WAIT_DEFAULT_SINGLE_SECONDS
+
+    def estimate(self, requests: List[dict], concurrency: int = WAIT_CONCURRENCY, now: float = None) -> Dict[str, float]:
+        """
+        처리 중이거나 대기 중인 요청별로 생성이 끝나기까지 남은 시간(초)을 계산합니다.
+        처리 중인 요청이 먼저 슬롯을 차지하고, 대기 중인 요청은 생성 시간순으로 가장 먼저 비는 슬롯에 배정합니다.
+
+        Args:
+            requests: 대기열 행 목록 (status, style_type(s), created_at, started_at)
+            concurrency: 동시에 처리되는 요청 수 (처리 중인 요청이 더 많으면 그 수를 사용)
+            now: 기준 시각 (epoch 초, 기본: 현재)
+
+        Returns:
+            {request_id: 남은 초} (결과가 이미 나온 요청과 완료/실패 요청은 제외)
+        """
+        now = time.time() if now is None else now
+        in_flight = [r for r in requests if r.get('status') == 'processing' and not r.get('output_image_url')]
+        pending = sorted(
+            (r for r in requests if r.get('status') == 'pending'),
+            key=lambda r: (r.get('created_at') or "", r['id'])
+        )
+        slots = max(1, concurrency, len(in_flight))
+
+        etas: Dict[str, float] = {}
+        free_at = []
+        for req in in_flight:
+            expected = self.expected_seconds(req)
+            # started_at이 없으면(마이그레이션 전) 절반쯤 진행된 것으로 봄. updated_at은 셀 결과 기록 등으로 바뀌므로 사용하지 않음
+            started = parse_timestamp(req.get('started_at'))
+            # 예상보다 오래 걸리는 요청은 곧 끝나는 것으로 보지 않고 최소 10%를 남겨 둠
+            remaining = expected * 0.5 if started is None else max(expected * 0.1, expected - (now - started))
+            etas[req['id']] = remaining
+            free_at.append(remaining)
+        free_at.extend([0.0] * (slots - len(free_at)))
+        heapq.heapify(free_at)
+
+        for req in pending:
+            finish = heapq.heappop(free_at) + self.expected_seconds(req)
+            etas[req['id']] = finish
+            heapq.heappush(free_at, finish)
+        return etas
+
+    def estimate_new(self, req: dict, pending_ahead: int, in_flight: int, concurrency: int = WAIT_CONCURRENCY) -> float:
+        """
+        방금 등록한 요청의 예상 대기 시간 (대기열 목록 없이 상태별 개수만으로 계산, 제출 화면용).
+        앞선 요청은 이 요청과 같은 종류라고 가정하고, 처리 중인 요청은 절반쯤 진행된 것으로 봅니다.
+
+        Args:
+            req: 등록한 요청
+            pending_ahead: 이 요청보다 먼저 대기 중인 요청 수
+            in_flight: 처리 중인 요청 수
+            concurrency: 동시에 처리되는 요청 수
+        """
+        expected = self.expected_seconds(req)
+        slots = max(1, concurrency)
+        free_at = [expected * 0.5] * min(in_flight, slots) + [0.0] * max(0, slots - in_flight)
+        heapq.heapify(free_at)
+        for _ in range(pending_ahead):
+            heapq.heappush(free_at, heapq.heappop(free_at) + expected)
+        return heapq.heappop(free_at) + expected
+
+    def stats(self) -> Dict[str, dict]:
+        """키별 샘플 수와 중앙값 (사이드바 표시용)."""
+        return {key: {"samples": len(self._samples[key]), "median_s": round(median, 1)} for key, median in self._medians.items()}
+
+
+_estimator = None
+_estimator_lock = threading.Lock()
+
+
+def get_wait_estimator() -> WaitEstimator:
+    """프로세스 전역 WaitEstimator를 반환합니다 (최초 호출 시 생성, 관리자/방문자 페이지가 공유)."""
+    global _estimator
+    if _estimator is None:
+        with _estimator_lock:
+            if _estimator is None:
+                _estimator = WaitEstimator()
+    return _estimator
@@ -0,0 +1,219 @@
+"""
+헤드리스 생성 워커.
+
+관리자 버튼 없이 booth_requests의 pending 요청을 선점해 4컷 파이프라인을 실행합니다.
+대시보드는 결과 검토와 인쇄만 담당합니다.
+
+    python -m utils.worker --concurrency 3
+    python -m utils.worker --fake --fake-requests 8   # 네트워크 없이 가짜 백엔드로 구동
+"""
+import argparse
+import asyncio
+import functools
+import io
+import os
+import random
+from typing import List, Optional
+
+from PIL import Image
+
+from utils.pipeline import GenerateStream, process_request
+
+DEFAULT_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "2"))
+DEFAULT_POLL_INTERVAL = float(os.getenv("WORKER_POLL_INTERVAL", "3"))
+
+# --fake 모드에서 무작위로 고르는 스타일 (gemini_client를 import하지 않기 위해 별도 정의)
+FAKE_STYLES = ["lego", "anime", "pixel", "clay", "business", "figure"]
+
+
+class BoothWorker:
+    """
+    pending 요청을 폴링/선점하여 최대 concurrency개까지 동시에 처리합니다.
+
+    Args:
+        backend: fetch_pending/claim/download/upload/set_output/update_status를 제공하는 객체
+        generate_stream: generate_styles_as_completed 호환 생성 함수
+        concurrency: 동시에 처리할 요청 수
+        poll_interval: 대기열이 비었을 때 다시 조회하기까지의 간격(초)
+        max_retries: 스타일별 재시도 횟수
+        max_requests: 선점할 최대 요청 수 (None이면 제한 없음, 관리자 일괄 처리용)
+    """
+
+    def __init__(
+        self,
+        backend,
+        generate_stream: GenerateStream,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        max_retries: int = 3,
+        max_requests: Optional[int] = None
+    ):
+        self.backend = backend
+        self.generate_stream = generate_stream
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.max_retries = max_retries
+        self.max_requests = max_requests
+        self.claimed = 0
+        self.processed = 0
+        self.failed = 0
+        self._active = set()
+        self._stopping = False
+
+    def stop(self):
+        """새 요청 선점을 멈춥니다. 처리 중인 요청은 끝까지 진행됩니다."""
+        self._stopping = True
+
+    async def _process(self, req: dict) -> str:
+        """요청 1건을 처리하고 결과 파일 경로를 반환합니다."""
+        return await process_request(req, self.backend, self.generate_stream, self.max_retries)
+
+    async def _handle(self, req: dict):
+        queue_num = req.get('queue_number', 0)
+        try:
+            print(f"🛠️ [{queue_num:03d}] 처리 시작")
+            output_path = await self._process(req)
+            self.processed += 1
+            print(f"✅ [{queue_num:03d}] 생성 완료 → {output_path} (검토 대기)")
+        except Exception as e:
+            self.failed += 1
+            print(f"❌ [{queue_num:03d}] 처리 실패: {e}")
+            error_msg = str(e)
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(
+                    None, functools.partial(self.backend.update_status, req['id'], "failed", error_msg=error_msg)
+                )
+            except Exception as update_error:
+                print(f"실패 상태 기록 오류: {update_error}")
+
+    async def _claim_batch(self) -> List[dict]:
+        """빈 슬롯 수만큼 pending 요청을 선점합니다."""
+        free_slots = self.concurrency - len(self._active)
+        if self.max_requests is not None:
+            free_slots = min(free_slots, self.max_requests - self.claimed)
+        if free_slots <= 0:
+            return []
+        loop = asyncio.get_running_loop()
+        candidates = await loop.run_in_executor(None, self.backend.fetch_pending, free_slots * 2)
+        claimed = []
+        for req in candidates:
+            if len(claimed) >= free_slots:
+                break
+            row = await loop.run_in_executor(None, self.backend.claim, req['id'])
+            if row:
+                claimed.append(row)
+                self.claimed += 1
+        return claimed
+
+    async def run(self, stop_when_idle: bool = False):
+        """
+        워커 메인 루프.
+
+        Args:
+            stop_when_idle: True이면 대기열과 처리 중인 작업이 모두 비었을 때 종료합니다.
+        """
+        print(f"🚀 워커 시작 (동시 처리 {self.concurrency}건, 폴링 {self.poll_interval}s)")
+        while not self._stopping:
+            try:
+                claimed = await self._claim_batch()
+            except Exception as e:
+                print(f"대기열 조회 오류: {e}")
+                claimed = []
+
+            for req in claimed:
+                task = asyncio.create_task(self._handle(req))
+                self._active.add(task)
+                task.add_done_callback(self._active.discard)
+
+            if not claimed:
+                if stop_when_idle and not self._active:
+                    break
+                # 슬롯이 찼으면 하나가 끝날 때까지, 비었으면 폴링 간격만큼 대기
+                if self._active:
+                    await asyncio.wait(self._active, timeout=self.poll_interval, return_when=asyncio.FIRST_COMPLETED)
+                else:
+                    await asyncio.sleep(self.poll_interval)
+
+        if self._active:
+            await asyncio.gather(*self._active)
+        print(f"📊 워커 종료: 완료 {self.processed}건, 실패 {self.failed}건")
+
+
+async def fake_generate_styles_as_completed(
+    input_image: Image.Image,
+    style_types: List[str],
+    max_retries: int = 3,
+    latency: float = 0.5
+):
+    """
+    네트워크 없이 사용할 가짜 생성 함수 (generate_styles_as_completed와 동일하게 완료 순서대로 yield).
+    스타일마다 색조를 바꾼 2:3 이미지를 latency 초 근처의 지연 후 돌려줍니다.
+    """
+    async def fake_one(style: str):
+        await asyncio.sleep(random.uniform(latency * 0.5, latency * 1.5))
+        base = input_image.convert('RGB').resize((512, 768))
+        tint = Image.new('RGB', base.size, _style_color(style))
+        return style, Image.blend(base, tint, 0.5), None
+
+    for next_done in asyncio.as_completed([fake_one(style) for style in style_types]):
+        yield await next_done
+
+
+def _style_color(style: str):
+    rng = random.Random(style)
+    return (rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255))
+
+
+def _make_fake_backend(num_requests: int):
+    from utils.backends import LocalBackend
+
+    backend = LocalBackend()
+    for i in range(num_requests):
+        img = Image.new('RGB', (1200, 1600), _style_color(f"input-{i}"))
+        buf = io.BytesIO()
+        img.save(buf, format='PNG')
+        backend.add_request(buf.getvalue(), style_types=random.sample(FAKE_STYLES, 4))
+    return backend
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="AI Photo Booth 헤드리스 생성 워커")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="동시에 처리할 요청 수")
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL, help="대기열 조회 간격(초)")
+    parser.add_argument("--max-retries", type=int, default=3, help="스타일별 재시도 횟수")
+    parser.add_argument("--once", action="store_true", help="대기열이 비면 종료")
+    parser.add_argument("--fake", action="store_true", help="메모리 백엔드 + 가짜 생성기로 실행 (네트워크 불필요)")
+    parser.add_argument("--fake-requests", type=int, default=8, help="--fake 모드에서 미리 넣을 요청 수")
+    parser.add_argument("--fake-latency", type=float, default=0.5, help="--fake 모드의 스타일당 평균 지연(초)")
+    args = parser.parse_args(argv)
+
+    if args.fake:
+        backend = _make_fake_backend(args.fake_requests)
+
+        def generate_stream(image, style_types, max_retries=3):
+            return fake_generate_styles_as_completed(image, style_types, max_retries, latency=args.fake_latency)
+        stop_when_idle = True
+    else:
+        from utils.backends import SupabaseBackend
+        from utils.gemini_client import generate_styles_as_completed
+
+        backend = SupabaseBackend()
+        generate_stream = generate_styles_as_completed
+        stop_when_idle = args.once
+
+    worker = BoothWorker(
+        backend,
+        generate_stream,
+        concurrency=args.concurrency,
+        poll_interval=args.poll_interval,
+        max_retries=args.max_retries
+    )
+    try:
+        asyncio.run(worker.run(stop_when_idle=stop_when_idle))
+    except KeyboardInterrupt:
+        print("워커 중지")
+
+
+if __name__ == "__main__":
+    main()